@@ -10,7 +10,7 @@ def testit(script, data, minconf, n=3):
 
 data_files = ['retail.txt']
 conf_ranges = [(0.001, 0.01)]
-programs = ['p_rmtid_apriori.py', 'rmtid_apriori.py', 'apriori.py']
+programs = ['p_rmtid_apriori.py', 'rmtid_apriori.py', 'apriori.py', 'fpgrowth.py']
 
 for file, (start, stop) in zip(data_files, conf_ranges):
     for MS in np.arange(start, stop, (stop - start) / 10)[::-1]:
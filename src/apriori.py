@@ -18,10 +18,22 @@ Reference Materials:
 """
 
 import argparse
+from array import array
 from collections import Counter
+import heapq
 from itertools import product
+import os
+import tempfile
 from time import ctime
 
+from incidence import DEFAULT_MEMORY_BUDGET, IncidenceMatrix, fits
+from instrument import DEFAULT_PROFILE_FILE, NULL_INSTRUMENT, open_instrument
+from itemsets import CandidateTrie, PairCounter, apriori_gen, hash_filter, hash_pairs
+from parallel_scan import load_store, parallel_first_scan
+from result_writer import FORMATS, open_writer
+from rules import mine_rules
+from transaction_store import TransactionStore, is_binary
+
 __author__ = 'Galen Seilis'
 __copyright__ = 'Copyright 2020, Assignment 1, CPSC-673-A1'
 __credits__ = ['Galen Seilis', 'Fan Jiang (Instructor)']
@@ -42,7 +54,8 @@ def get_db_size(file_name):
     algorithm.
 
     Make sure that the first line of the transaction
-    database is suitable for this purpose.
+    database is suitable for this purpose. Binary
+    databases written by convert.py are also accepted.
 
     ARGUMENTS
         file_name (str): The name of the transaction database file.
@@ -50,6 +63,8 @@ def get_db_size(file_name):
     RETURNS
         (int): Number of transactions in transaction database.
     '''
+    if is_binary(file_name):
+        return len(TransactionStore.from_binary(file_name))
     with open(file_name) as f:
         return int(f.readline().rstrip())
 
@@ -77,8 +92,14 @@ def scan_db(file_name):
     This generator yields each transaction from the
     transaction database.
 
+    A TransactionStore may be given in place of the
+    file name, in which case the transactions are
+    read from memory without being parsed again.
+    Binary databases written by convert.py are
+    mapped into a TransactionStore.
+
     ARGUMENTS
-        file_name (str): The name of the transaction database file.
+        file_name (str/TransactionStore): The name of the transaction database file.
 
     RETURNS
         generator
@@ -86,6 +107,11 @@ def scan_db(file_name):
     YIELDS
         (int, int, set[int]): Transaction from transaction database file.
     '''
+    if not isinstance(file_name, TransactionStore) and is_binary(file_name):
+        file_name = TransactionStore.from_binary(file_name)
+    if isinstance(file_name, TransactionStore):
+        yield from file_name
+        return
     with open(file_name) as f:
         for i, line in enumerate(f):
             if i != 0:
@@ -93,7 +119,7 @@ def scan_db(file_name):
             else:
                 continue
 
-def first_scan(file_name, epsilon):
+def first_scan(file_name, epsilon, buckets=None, processors=1):
     '''
     This function perfoms the first database scan
     for the apriori frequent pattern mining algorithm.
@@ -102,19 +128,35 @@ def first_scan(file_name, epsilon):
     assume that all items are candidates while later_scan
     will assume that the candidates are provided.
 
+    A binary database already holds the count of every
+    item, in which case no transactions are read. A text
+    database is parsed in parallel byte ranges when more
+    than one processor is given.
+
     ARGUMENTS
-        file_name (str): The name of the transaction database file.
+        file_name (str/TransactionStore): The name of the transaction database file.
         epsilon (float/int): Absolute minimum support threshold.
+        buckets (array[int]): If given, the DHP bucket table to hash every item pair into. (Default=None)
+        processors (int): The number of processes to parse a text database with. (Default=1)
 
     RETURNS
         (dict): A count table of each item in the database.
     '''
+    if not isinstance(file_name, TransactionStore) and is_binary(file_name):
+        file_name = TransactionStore.from_binary(file_name)
+    if isinstance(file_name, TransactionStore) and file_name.frequencies is not None and buckets is None:
+        return {k:v for (k,v) in file_name.frequencies.items() if v >= epsilon}
+    if processors > 1 and not isinstance(file_name, TransactionStore):
+        counter, _ = parallel_first_scan(file_name, processors, buckets)
+        return {k:v for (k,v) in counter.items() if v >= epsilon}
     counter = Counter()
     for i, (t_id, t_n, t_set) in enumerate(scan_db(file_name)):
-        counter += Counter(t_set)
+        counter.update(t_set)
+        if buckets is not None:
+            hash_pairs(t_set, buckets)
     return {k:v for (k,v) in counter.items() if v >= epsilon}
 
-def later_scan(file_name, candidates, epsilon):
+def later_scan(file_name, candidates, epsilon, instrument=NULL_INSTRUMENT):
     '''
     This function perfoms later database scans
     for the apriori frequent pattern mining algorithm.
@@ -123,8 +165,120 @@ def later_scan(file_name, candidates, epsilon):
     candidates as input while first_scan will assume that all
     items are candidates.
 
+    The candidates are counted with a CandidateTrie so that
+    each transaction only visits the candidates that can
+    be its subsets.
+
     ARGUMENTS
-        file_name (str): The name of the transaction database file.
+        file_name (str/TransactionStore): The name of the transaction database file.
+        candidates (dict[frozenset[int]]: Dictionary of candidates for next iteration.
+        epsilon (float/int): Absolute minimum support threshold.
+        instrument (Instrument): Records the transactions scanned and the candidates found in them. (Default=NULL_INSTRUMENT)
+
+    RETURNS
+        (dict): A count table of each given candidate in the database.
+    '''
+    trie = CandidateTrie(candidates)
+    scanned = hits = 0
+    for i, (t_id, t_n, t_set) in enumerate(scan_db(file_name)):
+        hits += trie.count(sorted(t_set))
+        scanned += 1
+    instrument.add(scanned=scanned, subset_hits=hits)
+    return trie.frequent(epsilon)
+
+def pair_scan(file_name, candidates, epsilon, instrument=NULL_INSTRUMENT):
+    '''
+    This function perfoms the k=2 database scan with
+    a PairCounter, which counts the pairs of the items
+    of the candidates directly instead of matching the
+    candidates of each transaction in a trie.
+
+    ARGUMENTS
+        file_name (str/TransactionStore): The name of the transaction database file.
+        candidates (dict[frozenset[int]]: Dictionary of candidates of size 2.
+        epsilon (float/int): Absolute minimum support threshold.
+        instrument (Instrument): Records the transactions scanned and the pairs counted in them. (Default=NULL_INSTRUMENT)
+
+    RETURNS
+        (dict): A count table of each given candidate in the database.
+    '''
+    pairs = PairCounter({item for candidate in candidates for item in candidate})
+    if not pairs.dense:
+        print(ctime(), f'WARNING: {len(pairs.index)} items are too many for a triangular array. Counting pairs in a hash table.')
+    scanned = hits = 0
+    for i, (t_id, t_n, t_set) in enumerate(scan_db(file_name)):
+        hits += pairs.count(t_set)
+        scanned += 1
+    instrument.add(scanned=scanned, subset_hits=hits)
+    return pairs.frequent(candidates, epsilon)
+
+def reducing_scan(file_name, candidates, epsilon, k, in_memory, instrument=NULL_INSTRUMENT):
+    '''
+    This function perfoms a later database scan like
+    later_scan and also writes a reduced copy of the
+    database for the next level, in the style of DHP.
+
+    An item of a transaction can only be part of a
+    frequent (k+1)-itemset contained in it if it belongs
+    to at least k of the candidates of size k contained
+    in it, so every other item is trimmed. This also
+    trims every infrequent item. Transactions left with
+    k items or fewer cannot contain a (k+1)-itemset and
+    are dropped.
+
+    ARGUMENTS
+        file_name (str/TransactionStore): The name of the transaction database file.
+        candidates (dict[frozenset[int]]: Dictionary of candidates of size k.
+        epsilon (float/int): Absolute minimum support threshold.
+        k (int): The size of the candidates.
+        in_memory (bool): Keep the reduced database in a TransactionStore rather than a temporary file.
+        instrument (Instrument): Records the transactions scanned and the candidates found in them. (Default=NULL_INSTRUMENT)
+
+    RETURNS
+        l (dict): A count table of each given candidate meeting the threshold.
+        reduced (str/TransactionStore): The reduced database, or a temporary file holding it.
+        removed (int): The number of transactions dropped from the database.
+    '''
+    trie = CandidateTrie(candidates)
+    if in_memory:
+        tids, items, offsets = array('q'), array('I'), array('Q', [0])
+    else:
+        out = tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False)
+        out.write(f"{'':<20}\n") # The transaction count is written once it is known.
+    kept = removed = hits = 0
+    for i, (t_id, t_n, t_set) in enumerate(scan_db(file_name)):
+        t_set = sorted(t_set)
+        item_hits = {}
+        hits += trie.count(t_set, item_hits)
+        trimmed = [item for item in t_set if item_hits.get(item, 0) >= k]
+        if len(trimmed) <= k:
+            removed += 1
+            continue
+        kept += 1
+        if in_memory:
+            tids.append(t_id)
+            items.extend(trimmed)
+            offsets.append(len(items))
+        else:
+            out.write(f"{t_id}\t{len(trimmed)}\t{' '.join(map(str, trimmed))}\n")
+    if in_memory:
+        reduced = TransactionStore(tids, items, offsets)
+    else:
+        out.seek(0)
+        out.write(f'{kept:<20}')
+        out.close()
+        reduced = out.name
+    instrument.add(scanned=kept + removed, subset_hits=hits)
+    return trie.frequent(epsilon), reduced, removed
+
+def naive_later_scan(file_name, candidates, epsilon):
+    '''
+    This function is the reference implementation of
+    later_scan which checks every candidate against
+    every transaction with frozenset.issubset.
+
+    ARGUMENTS
+        file_name (str/TransactionStore): The name of the transaction database file.
         candidates (dict[frozenset[int]]: Dictionary of candidates for next iteration.
         epsilon (float/int): Absolute minimum support threshold.
 
@@ -144,6 +298,10 @@ def candidate_generation(l, k):
     to construct all the candidate itemsets for
     the next C table.
 
+    This is the reference implementation which unions
+    every pair of itemsets and does not prune. The
+    apriori function uses itemsets.apriori_gen instead.
+
     ARGUMENTS
         l (dict): The previous L table.
         k (int): The size of the itemsets. Also the iteration number.
@@ -171,66 +329,229 @@ def candidate_generation(l, k):
                 continue
     return candidates
 
-def apriori(file_name, epsilon):
+def build_matrix(file_name, L1, backend, memory_budget):
+    '''
+    This function builds the item-incidence matrix of
+    the frequent items for the NumPy counting backend,
+    when it is selected and fits in the memory budget.
+
+    ARGUMENTS
+        file_name (str/TransactionStore): The name of the transaction database file.
+        L1 (dict[int:int]): A count table of each frequent item.
+        backend (str): 'trie', 'numpy', or 'auto'.
+        memory_budget (int): The number of bytes the NumPy backend may use.
+
+    RETURNS
+        (IncidenceMatrix): The matrix, or None to count with the CandidateTrie.
+    '''
+    if backend == 'trie':
+        return None
+    db_size = len(file_name) if isinstance(file_name, TransactionStore) else get_db_size(file_name)
+    if not fits(db_size, len(L1), memory_budget):
+        if backend == 'numpy':
+            print(ctime(), 'WARNING: NumPy is missing or the incidence matrix exceeds the memory budget. Counting with the trie.')
+        return None
+    print(ctime(), 'Building the item-incidence matrix.')
+    matrix = IncidenceMatrix(scan_db(file_name), db_size, L1, memory_budget)
+    print(ctime(), f'Built a {len(L1)} x {db_size} incidence matrix using {matrix.nbytes} bytes.\n')
+    return matrix
+
+def apriori(file_name, epsilon, in_memory=False, backend='auto', memory_budget=DEFAULT_MEMORY_BUDGET, reduce=False, n_buckets=0, processors=1, writer=None, instrument=NULL_INSTRUMENT):
     '''
     This function performs the classic Apriori frequent pattern
     mining algorithm.
 
     ARGUMENTS
-        file_name (str): The input data file name of transactions.
+        file_name (str/TransactionStore): The input data file name of transactions, or transactions already in memory.
         epsilon (float/int): Absolute minimum support threshold.
+        in_memory (bool): Parse the database once into a TransactionStore. (Default=False)
+        backend (str): 'trie', 'numpy', or 'auto' to use NumPy when the incidence matrix fits. (Default='auto')
+        memory_budget (int): The number of bytes the NumPy backend may use. (Default=256 MiB)
+        reduce (bool): Trim items and transactions between levels with reducing_scan. (Default=False)
+        n_buckets (int): The size of the DHP bucket table used to filter pairs, or 0 to skip it. (Default=0)
+        processors (int): The number of processes to parse the text input with. (Default=1)
+        writer (ResultWriter): If given, each level is written as soon as it is found and dropped once the next is. (Default=None)
+        instrument (Instrument): Records the phases and counters of each level. (Default=NULL_INSTRUMENT)
 
     RETURNS
-        L (dict[int:dict[frozenset[int]:int]]): Dictionary of all frequent patterns found by the algorithm.   
+        L (dict[int:dict[frozenset[int]:int]]): Dictionary of all frequent patterns found by the algorithm, or only the last level when a writer is given.
     '''
-    print(ctime(), 'Searching for k=1 frequent patterns.')
-    L = {1:first_scan(file_name, epsilon)} # L_1
-    print(ctime(), f"Apriori found {len(L[1])} new frequent patterns.\n")
+    with instrument.level(1):
+        with instrument.phase('load'):
+            if isinstance(file_name, TransactionStore):
+                print(ctime(), f'Mining {len(file_name)} transactions held in memory.')
+            elif is_binary(file_name):
+                print(ctime(), 'Mapping binary transactions into memory.')
+                file_name = TransactionStore.from_binary(file_name)
+            elif in_memory:
+                print(ctime(), 'Loading transactions into memory.')
+                file_name = TransactionStore.from_file(file_name) if processors == 1 else load_store(file_name, processors)
+                print(ctime(), f'Loaded {len(file_name)} transactions using {file_name.nbytes} bytes.\n')
+        print(ctime(), 'Searching for k=1 frequent patterns.')
+        buckets = array('Q', bytes(8 * n_buckets)) if n_buckets else None
+        with instrument.phase('count'):
+            L = {1:first_scan(file_name, epsilon, buckets, processors)} # L_1
+        instrument.add(frequent=len(L[1]))
+        if writer is not None:
+            with instrument.phase('write'):
+                writer.write_level(1, L[1])
+        print(ctime(), f"Apriori found {len(L[1])} new frequent patterns.\n")
+        with instrument.phase('index'):
+            matrix = None if reduce else build_matrix(file_name, L[1], backend, memory_budget)
+    db = file_name
     k = 2
     while True:
-        candidates = candidate_generation(L[k-1], k)
-        if not candidates:
-            break
-        else:
-            print(ctime(), f'Searching for k={k} frequent patterns.')
-            candidates = later_scan(file_name, candidates, epsilon)
+        with instrument.level(k):
+            with instrument.phase('generate'):
+                candidates, pruned = apriori_gen(L[k-1], k)
+            instrument.add(generated=len(candidates) + pruned, pruned=pruned)
             if not candidates:
-                print(ctime(), f"Apriori found {len(candidates)} new frequent pattern(s).\n")
                 break
             else:
-                print(ctime(), f"Apriori found {len(candidates)} new frequent pattern(s).\n")
-                L[k] = candidates
-                k += 1
+                print(ctime(), f'Searching for k={k} frequent patterns.')
+                print(ctime(), f'Pruned {pruned} candidate(s) with an infrequent subset.')
+                if k == 2 and buckets is not None:
+                    with instrument.phase('filter'):
+                        candidates, hashed = hash_filter(candidates, buckets, epsilon)
+                    instrument.add(hash_pruned=hashed)
+                    print(ctime(), f'Pruned {hashed} of {hashed + len(candidates)} pair(s) ({hashed / max(hashed + len(candidates), 1):.1%}) in infrequent hash buckets.')
+                instrument.add(counted=len(candidates))
+                with instrument.phase('count'):
+                    if reduce:
+                        candidates, reduced, removed = reducing_scan(db, candidates, epsilon, k, isinstance(file_name, TransactionStore), instrument)
+                        if isinstance(db, str) and db is not file_name:
+                            os.remove(db)
+                        db = reduced
+                        size = db.nbytes if isinstance(db, TransactionStore) else os.path.getsize(db)
+                        instrument.add(removed=removed)
+                        print(ctime(), f'Reduction removed {removed} transaction(s), leaving {size} bytes.')
+                    elif k == 2:
+                        candidates = pair_scan(file_name, candidates, epsilon, instrument)
+                    elif matrix is not None:
+                        candidates, _ = matrix.count(candidates, epsilon)
+                        instrument.add(scanned=len(matrix.tids))
+                    else:
+                        candidates = later_scan(file_name, candidates, epsilon, instrument)
+                instrument.add(frequent=len(candidates))
+                if not candidates:
+                    print(ctime(), f"Apriori found {len(candidates)} new frequent pattern(s).\n")
+                    break
+                else:
+                    print(ctime(), f"Apriori found {len(candidates)} new frequent pattern(s).\n")
+                    L[k] = candidates
+                    if writer is not None:
+                        with instrument.phase('write'):
+                            writer.write_level(k, candidates)
+                        del L[k-1]
+                    k += 1
+    if isinstance(db, str) and db is not file_name:
+        os.remove(db)
     return L
 
-def write_rules(file_out, rules):
+def top_k(file_name, n_top, min_length=1, in_memory=False):
+    '''
+    This function finds the n_top most frequent itemsets
+    of at least min_length items without a minimum
+    support threshold.
+
+    The internal threshold starts at the n_top-th largest
+    support of a single item, which is exact when
+    min_length is 1 and an estimate otherwise. The levels
+    are then mined as in apriori. The supports of the
+    n_top best itemsets of at least min_length items found
+    so far are kept in a min-heap, and the threshold is
+    raised to the smallest of them once the heap is full.
+    Since every subset of an itemset is at least as
+    frequent, only itemsets meeting the current threshold
+    are joined into the next level's candidates. Levels
+    shorter than min_length cannot raise the threshold,
+    but they are still bounded by the estimate.
+
+    When fewer than n_top itemsets of at least min_length
+    items meet the estimate, the threshold is halved and
+    the levels are mined again, down to a support of 1.
+
+    Itemsets tied with the n_top-th support are all kept,
+    so the result is every itemset of at least min_length
+    items meeting the final threshold.
+
+    ARGUMENTS
+        file_name (str/TransactionStore): The input data file name of transactions.
+        n_top (int): The number of itemsets to find.
+        min_length (int): The fewest items of an itemset in the result. (Default=1)
+        in_memory (bool): Parse the database once into a TransactionStore. (Default=False)
+
+    RETURNS
+        L (dict[int:dict[frozenset[int]/int:int]]): Dictionary of the most frequent patterns of each size.
+        epsilon (int): The final support threshold.
+    '''
+    if not isinstance(file_name, TransactionStore) and is_binary(file_name):
+        file_name = TransactionStore.from_binary(file_name)
+    elif in_memory and not isinstance(file_name, TransactionStore):
+        print(ctime(), 'Loading transactions into memory.')
+        file_name = TransactionStore.from_file(file_name)
+        print(ctime(), f'Loaded {len(file_name)} transactions using {file_name.nbytes} bytes.\n')
+    print(ctime(), 'Searching for k=1 frequent patterns.')
+    items = first_scan(file_name, 1)
+    supports = heapq.nlargest(n_top, items.values())
+    epsilon = supports[-1] if supports else 1
+    while True:
+        print(ctime(), f'Mining at an estimated support threshold of {epsilon}.')
+        best = []
+
+        def raise_threshold(level, k):
+            nonlocal epsilon
+            if k < min_length:
+                return
+            for support in level.values():
+                if len(best) < n_top:
+                    heapq.heappush(best, support)
+                elif support > best[0]:
+                    heapq.heapreplace(best, support)
+            if len(best) == n_top and best[0] > epsilon:
+                epsilon = best[0]
+                print(ctime(), f'Raised the support threshold to {epsilon}.')
+
+        estimate = epsilon
+        L = {1:{k:v for (k,v) in items.items() if v >= epsilon}}
+        raise_threshold(L[1], 1)
+        L[1] = {k:v for (k,v) in L[1].items() if v >= epsilon}
+        print(ctime(), f"Top-k found {len(L[1])} new frequent patterns.\n")
+        k = 2
+        while L[k-1]:
+            candidates, pruned = apriori_gen(L[k-1], k)
+            if not candidates:
+                break
+            print(ctime(), f'Searching for k={k} frequent patterns at a support of {epsilon}.')
+            candidates = pair_scan(file_name, candidates, epsilon) if k == 2 else later_scan(file_name, candidates, epsilon)
+            raise_threshold(candidates, k)
+            L[k] = {c:v for (c,v) in candidates.items() if v >= epsilon}
+            print(ctime(), f"Top-k found {len(L[k])} new frequent pattern(s).\n")
+            k += 1
+        if len(best) == n_top or estimate == 1:
+            break
+        epsilon = max(estimate // 2, 1)
+        print(ctime(), f'Found {len(best)} of {n_top} itemset(s) of at least {min_length} item(s). Halving the threshold.\n')
+    L = {k:{c:v for (c,v) in level.items() if v >= epsilon} for (k, level) in L.items() if k >= min_length}
+    return {k:level for (k, level) in L.items() if level}, epsilon
+
+def write_rules(file_out, rules, fmt='text'):
     '''
     This function writes the discovered
-    frequent patterns into a text file.
+    frequent patterns into a file.
 
     ARGUMENTS
         file_out (str): The output file name of frequent patterns.
         rules (dict[int:dict[frozenset[int]:int]]): Dictionary of all frequent patterns found by the algorithm.
+        fmt (str): 'text', 'jsonl', or 'binary'. (Default='text')
 
     RETURNS
         None
     '''
-    with open(file_out, 'w') as file:
-        count = 0
-        lines = []
+    with open_writer(file_out, fmt) as writer:
         for (k, ruleset) in rules.items():
-            for (itemset, support) in ruleset.items():
-                count += 1
-                if isinstance(itemset, int):
-                    itemstr = str(itemset)
-                else:
-                    itemstr = str(set(itemset)).replace('{', '').replace('}', '')
-                line = f'{itemstr} : {support}\n'
-                lines.append(line)
-        file.write(f'|FPs| = {count}\n')
-        print(f'|FPs| = {count}\n')
-        for i, line in enumerate(lines):
-            file.write(line)
+            writer.write_level(k, ruleset)
+    print(f'|FPs| = {writer.count}\n')
 
 if __name__ == "__main__":
     
@@ -245,14 +566,39 @@ if __name__ == "__main__":
     required = parser.add_argument_group('required arguments')
     required.add_argument("-i", "--in_file", type=str, required=True, help="Input data file.")
     parser.add_argument("-o", "--out_file", type=str, default="MiningResults.txt", help="Output results file. (default='MiningResults.txt')")
+    parser.add_argument("-f", "--format", type=str, choices=FORMATS, default='text', help="Output results format. Patterns are written as each level is found. (default='text')")
+    parser.add_argument("--min_conf", type=float, default=None, help="Minimum confidence of the association rules generated from the results, or unset to skip them. (default=None)")
+    parser.add_argument("--rules_file", type=str, default="AssociationRules.txt", help="Output association rules file. (default='AssociationRules.txt')")
     parser.add_argument("-m", "--min_supp", type=float, default=0.5, help="Minimum support threshold as a float between 0 and 1. (default=0.5)")
+    parser.add_argument("-k", "--top_k", type=int, default=None, help="Find the k most frequent itemsets instead of those meeting --min_supp. (default=None)")
+    parser.add_argument("--min_length", type=int, default=1, help="The fewest items of an itemset found with --top_k. (default=1)")
+    parser.add_argument("--in_memory", "--in-memory", action="store_true", help="Parse the input once and keep it in memory between scans. (default=False)")
+    parser.add_argument("--backend", type=str, choices=['auto', 'trie', 'numpy'], default='auto', help="Support counting backend. 'auto' uses NumPy when the item-incidence matrix fits in the memory budget. (default='auto')")
+    parser.add_argument("--reduce", action="store_true", help="Trim infrequent items and short transactions between levels, counting with the trie. (default=False)")
+    parser.add_argument("--memory_budget", type=int, default=DEFAULT_MEMORY_BUDGET // 2**20, help="Memory budget of the NumPy backend in MiB. (default=256)")
+    parser.add_argument("--buckets", type=int, default=0, help="Size of the DHP hash bucket table used to prune pairs before k=2 counting, or 0 to disable it. (default=0)")
+    parser.add_argument("-p", "--processors", type=int, default=1, help="The number of processes used to parse a text input in the first scan. (default=1)")
+    parser.add_argument("--stats", type=str, default=None, help="JSON Lines file to append the phase timings and counters of each level to. (default=None)")
+    parser.add_argument("--profile_level", type=int, default=None, help="Level to run under cProfile. (default=None)")
+    parser.add_argument("--profile_file", type=str, default=DEFAULT_PROFILE_FILE, help="Profile output file, where {k} is replaced by the level. (default='level_{k}.prof')")
     args = parser.parse_args()
     
     # Check validity of CLI arguments
     assert 0 <= args.min_supp <= 1
+    assert args.min_conf is None or 0 <= args.min_conf <= 1
+    assert args.top_k is None or args.top_k > 0
+    assert args.min_length > 0
     epsilon = args.min_supp * get_db_size(args.in_file)
     print(ctime(), 'Starting\n')
-    rules = apriori(args.in_file, epsilon)
-    print(ctime(), 'Writing rules to file...')
-    write_rules(args.out_file, rules)
+    if args.top_k is not None:
+        rules, epsilon = top_k(args.in_file, args.top_k, args.min_length, args.in_memory)
+        print(ctime(), f'The top {args.top_k} itemset(s) have a support of at least {epsilon}.')
+        print(ctime(), 'Writing rules to file...')
+        write_rules(args.out_file, rules, args.format)
+    else:
+        with open_instrument('apriori', args.stats, args.profile_level, args.profile_file) as instrument, open_writer(args.out_file, args.format) as writer:
+            apriori(args.in_file, epsilon, args.in_memory, args.backend, args.memory_budget * 2**20, args.reduce, args.buckets, args.processors, writer=writer, instrument=instrument)
+        print(f'|FPs| = {writer.count}\n')
+    if args.min_conf is not None:
+        mine_rules(args.out_file, args.rules_file, args.min_conf)
     print(ctime(), 'Finished\n')
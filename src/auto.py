@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+#-*- coding:utf-8 - *-
+
+"""
+This CLI tool profiles a transaction database and runs whichever of the 'apriori' frequent patten mining scripts a cost model predicts to be fastest.
+
+GNU General Public License v3.0
+Permissions of this strong copyleft license are conditioned on making available complete source code of licensed works and modifications,
+which include larger works using a licensed work, under the same license.
+Copyright and license notices must be preserved.
+Contributors provide an express grant of patent rights.
+
+Reference Materials:
+[1] Hastie, T., Tibshirani, R. and Friedman, J. (2009) The Elements of Statistical Learning, Section 3.4.1.
+[2] Zheng, Z., Kohavi, R. and Mason, L. (2001) Real World Performance of Association Rule Algorithms.
+"""
+
+import argparse
+from collections import Counter
+import csv
+import json
+import math
+import os
+from time import ctime
+
+import apriori
+from eclat import popcount
+from incidence import DEFAULT_MEMORY_BUDGET, fits
+import p_rmtid_apriori
+from result_writer import FORMATS, open_writer
+import rmtid_apriori
+from rules import mine_rules
+
+__author__ = 'Galen Seilis'
+__copyright__ = 'Copyright 2020, Assignment 1, CPSC-673-A1'
+__credits__ = ['Galen Seilis', 'Fan Jiang (Instructor)']
+__license__ = 'GNU General Public License v3.0'
+__version__ = '0.1.0'
+__maintainer__ = 'Galen Seilis'
+__email__ = 'seilis@unbc.ca'
+__status__ = 'School Project'
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+DEFAULT_PERFORMANCE_FILE = os.path.join(ROOT, 'results', 'performance_results.csv')
+DEFAULT_DATA_DIR = os.path.join(ROOT, 'data')
+
+ENGINES = ['apriori', 'rmtid_apriori', 'p_rmtid_apriori']
+FEATURES = ['log_transactions', 'log_avg_length', 'log_l1', 'pair_density']
+RIDGE = 0.1
+MIN_DATASETS = 2 # datasets an engine needs results on before its model is trusted
+PARALLEL_WORK = 5 * 10**6 # pair updates at k=2 that pay for starting a pool
+ITEMS_PER_PROCESSOR = 10**6 # items of the database per worker of p_rmtid_apriori
+PARALLEL_PARSE_BYTES = 64 * 2**20 # text input size at which the first scan is parsed in parallel
+MAX_PROFILE_ITEMS = 8192 # distinct items whose co-occurrences are profiled, about 8 MiB of bitsets
+
+def scan_profile(file_name):
+    '''
+    This function profiles a transaction database in one
+    pass, without storing any transaction.
+
+    The pair density is the density of the item
+    co-occurrence graph of plot_as_nx.py: the number of
+    distinct pairs of items found together in at least
+    one transaction divided by the number of possible
+    pairs. The items seen with each item are kept as a
+    bitset over the items in order of appearance.
+
+    The bitsets take memory quadratic in the number of
+    distinct items, so they are dropped once more than
+    MAX_PROFILE_ITEMS items have been seen, and the pair
+    density is left as None.
+
+    ARGUMENTS
+        file_name (str): The name of the transaction database file.
+
+    RETURNS
+        stats (dict): The 'transactions', 'avg_length', 'max_length', 'items' and 'pair_density' of the database,
+                      where 'pair_density' is None beyond MAX_PROFILE_ITEMS items.
+        counts (Counter): The count of each item.
+    '''
+    counts = Counter()
+    ids = {}
+    neighbours = {}
+    n = total = longest = 0
+    for t_id, t_n, t_set in apriori.scan_db(file_name):
+        length = len(t_set)
+        counts.update(t_set)
+        n += 1
+        total += length
+        longest = max(longest, length)
+        if neighbours is None:
+            continue
+        mask = 0
+        for item in t_set:
+            mask |= 1 << ids.setdefault(item, len(ids))
+        if len(ids) > MAX_PROFILE_ITEMS:
+            print(ctime(), f'Stopped profiling pairs after {MAX_PROFILE_ITEMS} distinct items; the pair density is left unknown.')
+            ids = neighbours = None
+            continue
+        for item in t_set:
+            neighbours[item] = neighbours.get(item, 0) | mask
+    density = None
+    if neighbours is not None:
+        # Every bitset holds its own item, which is not a pair.
+        pairs = sum(popcount(mask) - 1 for mask in neighbours.values()) // 2
+        possible = len(counts) * (len(counts) - 1) // 2
+        density = pairs / possible if possible else 0.0
+    stats = {'transactions':n, 'avg_length':total / max(n, 1), 'max_length':longest, 'items':len(counts),
+             'pair_density':density}
+    return stats, counts
+
+def profile(file_name, min_supp, scanned=None):
+    '''
+    ARGUMENTS
+        file_name (str): The name of the transaction database file.
+        min_supp (float): Relative minimum support threshold.
+        scanned (tuple[dict, Counter]): The result of scan_profile, if the file was already scanned. (Default=None)
+
+    RETURNS
+        (dict): The statistics of scan_profile along with 'l1', the number of frequent items at the threshold.
+    '''
+    stats, counts = scanned if scanned is not None else scan_profile(file_name)
+    epsilon = min_supp * stats['transactions']
+    return {**stats, 'l1':sum(1 for c in counts.values() if c >= epsilon)}
+
+def features(stats):
+    '''
+    ARGUMENTS
+        stats (dict): A profile of a database at a threshold.
+
+    RETURNS
+        (list[float]): An intercept followed by the FEATURES of the profile, or None when the pair density is unknown.
+    '''
+    if stats.get('pair_density') is None:
+        return None
+    return [1.0, math.log(max(stats['transactions'], 1)), math.log(max(stats['avg_length'], 1)),
+            math.log(1 + stats['l1']), stats['pair_density']]
+
+def solve(A, b):
+    '''
+    This function solves a small linear system by
+    Gaussian elimination with partial pivoting.
+
+    ARGUMENTS
+        A (list[list[float]]): A square matrix.
+        b (list[float]): The right hand side.
+
+    RETURNS
+        (list[float]): The solution x of A x = b.
+    '''
+    n = len(b)
+    M = [row[:] + [b[i]] for (i, row) in enumerate(A)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(M[r][col]))
+        M[col], M[pivot] = M[pivot], M[col]
+        for r in range(col + 1, n):
+            factor = M[r][col] / M[col][col]
+            for c in range(col, n + 1):
+                M[r][c] -= factor * M[col][c]
+    x = [0.0] * n
+    for r in reversed(range(n)):
+        x[r] = (M[r][n] - sum(M[r][c] * x[c] for c in range(r + 1, n))) / M[r][r]
+    return x
+
+class CostModel:
+    '''
+    A model of the run time of each engine, fitted by
+    ridge regression of the log run time on the FEATURES
+    of the profile of each benchmarked run.
+
+    An engine is only modelled once it has results on
+    at least MIN_DATASETS datasets, since the features of
+    a single dataset only vary with the threshold.
+
+    ATTRIBUTES
+        weights (dict[str:list[float]]): The fitted weights of each modelled engine.
+        runs (dict[str:int]): The number of runs each engine was fitted on.
+        datasets (dict[str:set[str]]): The datasets each engine has results on.
+    '''
+
+    def __init__(self):
+        self.weights = {}
+        self.runs = {}
+        self.datasets = {}
+
+    def fit(self, rows):
+        '''
+        ARGUMENTS
+            rows (iterable[tuple[str, str, dict, float]]): The engine, dataset, profile and run time of each run.
+
+        RETURNS
+            (CostModel): The fitted model.
+        '''
+        samples = {}
+        for engine, dataset, stats, run_time in rows:
+            x = features(stats)
+            if x is None:
+                continue
+            samples.setdefault(engine, []).append((x, math.log(max(run_time, 1e-6))))
+            self.datasets.setdefault(engine, set()).add(dataset)
+        for engine, pairs in samples.items():
+            self.runs[engine] = len(pairs)
+            if len(self.datasets[engine]) < MIN_DATASETS:
+                continue
+            width = len(pairs[0][0])
+            A = [[sum(x[i] * x[j] for (x, y) in pairs) + (RIDGE if i == j and i else 0.0) for j in range(width)] for i in range(width)]
+            b = [sum(x[i] * y for (x, y) in pairs) for i in range(width)]
+            self.weights[engine] = solve(A, b)
+        return self
+
+    def predict(self, engine, stats):
+        '''
+        ARGUMENTS
+            engine (str): The name of the engine.
+            stats (dict): A profile of a database at a threshold.
+
+        RETURNS
+            (float): The predicted run time in seconds, or None when the engine is not modelled or the pair density is unknown.
+        '''
+        x = features(stats)
+        if engine not in self.weights or x is None:
+            return None
+        return math.exp(sum(w * v for (w, v) in zip(self.weights[engine], x)))
+
+def performance_rows(performance_file, data_dir):
+    '''
+    This generator reads the runs of a CSV file with the
+    columns program, data_file, min_sup and run_time,
+    profiling each data file found in data_dir once.
+    Runs on data files that cannot be found are skipped.
+
+    ARGUMENTS
+        performance_file (str): The CSV file of run times.
+        data_dir (str): The directory holding the data files.
+
+    RETURNS
+        generator
+
+    YIELDS
+        (str, str, dict, float): The engine, dataset, profile and run time of each run.
+    '''
+    scanned = {}
+    with open(performance_file) as f:
+        for row in csv.DictReader(f):
+            engine = row['program'].replace('.py', '')
+            data_file = os.path.join(data_dir, row['data_file'])
+            if engine not in ENGINES:
+                continue
+            if data_file not in scanned:
+                scanned[data_file] = scan_profile(data_file) if os.path.exists(data_file) else None
+                if scanned[data_file] is None:
+                    print(ctime(), f'Skipping the runs on {row["data_file"]}, which is not in {data_dir}.')
+            if scanned[data_file] is not None:
+                yield engine, row['data_file'], profile(data_file, float(row['min_sup']), scanned[data_file]), float(row['run_time'])
+
+def benchmark_rows(benchmark_file):
+    '''
+    This generator reads the runs of a benchmark.py
+    results file that recorded a profile.
+
+    ARGUMENTS
+        benchmark_file (str): A JSON Lines file of benchmark results.
+
+    RETURNS
+        generator
+
+    YIELDS
+        (str, str, dict, float): The engine, dataset, profile and run time of each run.
+    '''
+    with open(benchmark_file) as f:
+        for line in f:
+            record = json.loads(line)
+            if record.get('engine') in ENGINES and 'profile' in record and 'wall_time' in record:
+                yield record['engine'], record['dataset'], record['profile'], record['wall_time']
+
+def choose(stats, model, file_bytes, processors, memory_budget=DEFAULT_MEMORY_BUDGET):
+    '''
+    This function chooses the engine, the representation
+    of the transactions and the degree of parallelism of
+    a run, along with the reasons for each choice.
+
+    The engine with the lowest predicted run time is
+    chosen when every candidate engine is modelled. A
+    parallel engine is only a candidate when more than
+    one processor is available. Without a model, the
+    parallel engine is chosen when the work of counting
+    pairs is large enough to pay for starting a pool, and
+    apriori otherwise, which the recorded run times favour
+    on small and sparse inputs.
+
+    ARGUMENTS
+        stats (dict): The profile of the database at the threshold.
+        model (CostModel): The fitted cost model.
+        file_bytes (int): The size of the input file.
+        processors (int): The number of processors available.
+        memory_budget (int): The number of bytes the transactions and the incidence matrix may use. (Default=256 MiB)
+
+    RETURNS
+        choice (dict): The 'engine', 'in_memory', 'backend' and 'processors' to run with, and the 'method' of choosing the engine, 'model' or 'rule'.
+        reasons (list[str]): Why each choice was made.
+    '''
+    reasons = []
+    candidates = ENGINES if processors > 1 else [e for e in ENGINES if e != 'p_rmtid_apriori']
+    if processors <= 1:
+        reasons.append('p_rmtid_apriori is left out since only one processor is available.')
+    predictions = {e:model.predict(e, stats) for e in candidates}
+    if all(p is not None for p in predictions.values()):
+        engine = min(predictions, key=predictions.get)
+        method = 'model'
+        ranking = ', '.join(f'{e} {p:.3f}s' for (e, p) in sorted(predictions.items(), key=lambda item: item[1]))
+        reasons.append(f'{engine} has the lowest predicted run time ({ranking}).')
+    else:
+        missing = [e for (e, p) in predictions.items() if p is None]
+        method = 'rule'
+        pair_work = stats['transactions'] * min(stats['avg_length'], stats['l1']) ** 2 / 2
+        if stats.get('pair_density') is None:
+            reasons.append(f"The pair density of more than {MAX_PROFILE_ITEMS} distinct items was not profiled, so the engine is chosen by a fixed rule instead of by predicted run times.")
+        else:
+            reasons.append(f"No cost model is fitted for {', '.join(missing)}, which have results on fewer than {MIN_DATASETS} datasets, so the engine is chosen by a fixed rule instead of by predicted run times.")
+        if 'p_rmtid_apriori' in candidates and pair_work >= PARALLEL_WORK:
+            engine = 'p_rmtid_apriori'
+            reasons.append(f'p_rmtid_apriori is chosen since about {pair_work:.0f} pair updates at k=2 pay for starting a pool.')
+        else:
+            engine = 'apriori'
+            reasons.append(f'apriori is chosen since about {pair_work:.0f} pair updates at k=2 do not pay for starting a pool.')
+    store_bytes = stats['transactions'] * 16 + round(stats['transactions'] * stats['avg_length']) * 4
+    in_memory = engine != 'p_rmtid_apriori' and store_bytes <= memory_budget // 2
+    if engine == 'p_rmtid_apriori':
+        workers = max(2, min(processors, math.ceil(stats['transactions'] * stats['avg_length'] / ITEMS_PER_PROCESSOR)))
+        reasons.append(f'The transactions are parsed once into shared memory and counted by {workers} of {processors} processors.')
+    else:
+        workers = processors if file_bytes >= PARALLEL_PARSE_BYTES else 1
+        if in_memory:
+            reasons.append(f'The transactions are parsed once and kept in memory, since they take about {store_bytes} bytes of the {memory_budget} byte budget.')
+        else:
+            reasons.append(f'The transactions are read from the file on every level, since they would take about {store_bytes} bytes.')
+        reasons.append(f'The first scan is parsed by {workers} process(es) for a {file_bytes} byte input.')
+    backend = 'numpy' if engine != 'p_rmtid_apriori' and fits(stats['transactions'], stats['l1'], memory_budget) else 'trie'
+    if engine != 'p_rmtid_apriori':
+        reasons.append(f"Candidates are counted with {'the NumPy incidence matrix, which fits the budget' if backend == 'numpy' else 'the candidate trie, since NumPy is missing or the incidence matrix does not fit the budget'}.")
+    return {'engine':engine, 'method':method, 'in_memory':in_memory, 'backend':backend, 'processors':workers}, reasons
+
+def auto(file_name, min_supp, model, processors=len(os.sched_getaffinity(0)), memory_budget=DEFAULT_MEMORY_BUDGET, writer=None, dry_run=False):
+    '''
+    This function profiles a database, chooses how to
+    mine it, logs the choice and its reasons, and runs it.
+
+    ARGUMENTS
+        file_name (str): The input data file name of transactions.
+        min_supp (float): Relative minimum support threshold.
+        model (CostModel): The fitted cost model.
+        processors (int): The number of processors available. (Default=len(os.sched_getaffinity(0)))
+        memory_budget (int): The number of bytes the transactions and the incidence matrix may use. (Default=256 MiB)
+        writer (ResultWriter): If given, each level is written as soon as it is found. (Default=None)
+        dry_run (bool): Only profile and choose. (Default=False)
+
+    RETURNS
+        L (dict[int:dict[frozenset[int]:int]]): Dictionary of all frequent patterns found by the chosen engine, or None on a dry run.
+        choice (dict): The 'engine', 'method', 'in_memory', 'backend' and 'processors' chosen.
+    '''
+    print(ctime(), f'Profiling {file_name}.')
+    stats = profile(file_name, min_supp)
+    print(ctime(), 'Profile: ' + ', '.join(f'{k}={v:.4g}' if isinstance(v, float) else f'{k}={v}' for (k, v) in stats.items()) + '.')
+    choice, reasons = choose(stats, model, os.path.getsize(file_name), processors, memory_budget)
+    print(ctime(), f"Chose {choice['engine']} {'from the predicted run times of the cost model' if choice['method'] == 'model' else 'by a fixed rule, without a usable cost model prediction'}.")
+    print(ctime(), f"Running it with in_memory={choice['in_memory']}, backend={choice['backend']} and processors={choice['processors']}.")
+    for reason in reasons:
+        print(ctime(), f'Because: {reason}')
+    print()
+    if dry_run:
+        return None, choice
+    epsilon = min_supp * stats['transactions']
+    if choice['engine'] == 'p_rmtid_apriori':
+        L = p_rmtid_apriori.apriori(file_name, epsilon, choice['processors'], writer=writer)
+    else:
+        engine = apriori if choice['engine'] == 'apriori' else rmtid_apriori
+        L = engine.apriori(file_name, epsilon, choice['in_memory'], choice['backend'], memory_budget, processors=choice['processors'], writer=writer)
+    return L, choice
+
+if '__main__' == __name__:
+    # Prepare command line parser
+    parser = argparse.ArgumentParser()
+    parser.description = '''A CLI that chooses between apriori, rmtid_apriori and p_rmtid_apriori for a given input and threshold.
+    The input is profiled in one pass for its number of transactions, their average and longest lengths, the number of distinct items,
+    the density of item pairs and the number of frequent items at the threshold. A cost model fitted on recorded run times predicts
+    the run time of each engine from the profile, or a fixed rule chooses when too few runs are recorded to fit it, and the choice of engine, representation and parallelism is logged with its reasons.
+    This program expects an input text file with a particular format.
+    The first line of the input file should be the number of transactions in the transaction database.
+    All subsequent lines are expected to have a tab-delimited format where the first column is the transaction ID,
+    the second column is the number of items in the transaction, and the third column is a space-delimited set of items.
+    Failure to format the input file correctly may result in errors or unexpected behaviour.'''
+    required = parser.add_argument_group('required arguments')
+    required.add_argument("-i", "--in_file", type=str, required=True, help="Input data file.")
+    parser.add_argument("-o", "--out_file", type=str, default="MiningResults.txt", help="Output results file. (default='MiningResults.txt')")
+    parser.add_argument("-f", "--format", type=str, choices=FORMATS, default='text', help="Output results format. (default='text')")
+    parser.add_argument("--min_conf", type=float, default=None, help="Minimum confidence of the association rules generated from the results, or unset to skip them. (default=None)")
+    parser.add_argument("--rules_file", type=str, default="AssociationRules.txt", help="Output association rules file. (default='AssociationRules.txt')")
+    parser.add_argument("-m", "--min_supp", type=float, default=0.5, help="Minimum support threshold as a float between 0 and 1. (default=0.5)")
+    parser.add_argument("-p", "--processors", type=int, default=len(os.sched_getaffinity(0)), help="The number of processors available. (default=len(os.sched_getaffinity(0)))")
+    parser.add_argument("--memory_budget", type=int, default=DEFAULT_MEMORY_BUDGET // 2**20, help="Memory budget of the transactions and the incidence matrix in MiB. (default=256)")
+    parser.add_argument("--performance_file", type=str, default=DEFAULT_PERFORMANCE_FILE, help="CSV file of recorded run times with the columns program, data_file, min_sup and run_time. (default=results/performance_results.csv)")
+    parser.add_argument("--data_dir", type=str, default=DEFAULT_DATA_DIR, help="Directory of the data files named in the performance file. (default=data)")
+    parser.add_argument("--benchmarks", type=str, nargs='*', default=[], help="JSON Lines results of benchmark.py to fit the cost model on as well. (default=None)")
+    parser.add_argument("--dry_run", action="store_true", help="Only profile the input and log the choice. (default=False)")
+    args = parser.parse_args()
+
+    # Check validity of CLI arguments
+    assert 0 <= args.min_supp <= 1
+    assert args.min_conf is None or 0 <= args.min_conf <= 1
+    assert args.processors > 0
+    print(ctime(), 'Starting\n')
+    rows = list(performance_rows(args.performance_file, args.data_dir)) if os.path.exists(args.performance_file) else []
+    for benchmark_file in args.benchmarks:
+        rows += benchmark_rows(benchmark_file)
+    model = CostModel().fit(rows)
+    for engine in ENGINES:
+        print(ctime(), f"The cost model of {engine} {'was fitted' if engine in model.weights else 'could not be fitted'} on {model.runs.get(engine, 0)} run(s) over {len(model.datasets.get(engine, ()))} dataset(s).")
+    if not model.weights:
+        print(ctime(), f'No cost model was fitted, so the engine is chosen by a fixed rule. Give --benchmarks with runs on at least {MIN_DATASETS} datasets to fit one.')
+    if args.dry_run:
+        auto(args.in_file, args.min_supp, model, args.processors, args.memory_budget * 2**20, dry_run=True)
+    else:
+        with open_writer(args.out_file, args.format) as writer:
+            auto(args.in_file, args.min_supp, model, args.processors, args.memory_budget * 2**20, writer=writer)
+        print(f'|FPs| = {writer.count}\n')
+        if args.min_conf is not None:
+            mine_rules(args.out_file, args.rules_file, args.min_conf)
+    print(ctime(), 'Finished\n')
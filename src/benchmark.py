@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+#-*- coding:utf-8 - *-
+
+"""
+This CLI tool benchmarks the frequent patten mining scripts in-process on real or synthetic transaction databases.
+
+GNU General Public License v3.0
+Permissions of this strong copyleft license are conditioned on making available complete source code of licensed works and modifications,
+which include larger works using a licensed work, under the same license.
+Copyright and license notices must be preserved.
+Contributors provide an express grant of patent rights.
+
+Reference Materials:
+[1] Agrawal, R. and Srikant, R. (1994) Fast Algorithms for Mining Association Rules, Section 2.4.3.
+[2] https://docs.python.org/3/library/resource.html
+[3] https://docs.python.org/3/library/time.html#time.perf_counter
+"""
+
+import argparse
+import contextlib
+import hashlib
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import sys
+import tempfile
+from time import ctime, perf_counter, time
+
+import apriori
+from auto import profile, scan_profile
+import eclat
+import fpgrowth
+import p_rmtid_apriori
+from instrument import NULL_INSTRUMENT, Instrument, MemorySink, peak_rss
+from quest_gen import parse_name, write_dataset
+import rmtid_apriori
+import son
+
+__author__ = 'Galen Seilis'
+__copyright__ = 'Copyright 2020, Assignment 1, CPSC-673-A1'
+__credits__ = ['Galen Seilis', 'Fan Jiang (Instructor)']
+__license__ = 'GNU General Public License v3.0'
+__version__ = '0.1.0'
+__maintainer__ = 'Galen Seilis'
+__email__ = 'seilis@unbc.ca'
+__status__ = 'School Project'
+
+PROCESSORS = len(os.sched_getaffinity(0))
+
+ENGINES = {
+    'apriori':lambda file_name, epsilon, instrument: apriori.apriori(file_name, epsilon, instrument=instrument),
+    'rmtid_apriori':lambda file_name, epsilon, instrument: rmtid_apriori.apriori(file_name, epsilon, instrument=instrument),
+    'p_rmtid_apriori':lambda file_name, epsilon, instrument: p_rmtid_apriori.apriori(file_name, epsilon, PROCESSORS, instrument=instrument),
+    'eclat':lambda file_name, epsilon, instrument: eclat.eclat(file_name, epsilon),
+    'fpgrowth':lambda file_name, epsilon, instrument: fpgrowth.fpgrowth(file_name, epsilon),
+    'son':lambda file_name, epsilon, instrument: son.son(file_name, epsilon, son.PoolExecutor(PROCESSORS), PROCESSORS),
+}
+LEVELWISE = {'apriori', 'rmtid_apriori', 'p_rmtid_apriori'}
+
+def dataset_path(dataset, data_dir, seed=0):
+    '''
+    This function resolves a dataset to a file, generating
+    a synthetic database when given an IBM Quest style name
+    such as 'T10I4D1K'. Generated databases are kept in
+    data_dir and reused by later runs.
+
+    ARGUMENTS
+        dataset (str): A transaction database file or a Quest dataset name.
+        data_dir (str): The directory of generated databases.
+        seed (int): The seed of the generator. (Default=0)
+
+    RETURNS
+        (str): The transaction database file.
+    '''
+    if os.path.exists(dataset):
+        return dataset
+    params = parse_name(dataset)
+    file_name = os.path.join(data_dir, f'{dataset}_s{seed}.txt')
+    if not os.path.exists(file_name):
+        os.makedirs(data_dir, exist_ok=True)
+        print(ctime(), f'Generating {dataset} into {file_name}.')
+        write_dataset(file_name + '.tmp', seed=seed, **params)
+        os.replace(file_name + '.tmp', file_name)
+    return file_name
+
+def digest(L):
+    '''
+    ARGUMENTS
+        L (dict[int:dict[frozenset[int]/int:int]]): Dictionary of all frequent patterns.
+
+    RETURNS
+        (str): A hash of the patterns and their supports that does not depend on their order.
+    '''
+    patterns = sorted((sorted([itemset]) if isinstance(itemset, int) else sorted(itemset), int(support)) for level in L.values() for (itemset, support) in level.items())
+    return hashlib.sha1(json.dumps(patterns).encode()).hexdigest()
+
+def run_engine(engine, file_name, epsilon, conn):
+    '''
+    This function runs one engine in a forked child of the
+    benchmark, so the modules are already imported and the
+    peak resident set size belongs to this run alone. The
+    output of the engine is discarded. The Apriori scripts
+    also report the level records of their instrument.
+
+    ARGUMENTS
+        engine (str): The name of the engine in ENGINES.
+        file_name (str): The transaction database file.
+        epsilon (float/int): Absolute minimum support threshold.
+        conn (multiprocessing.connection.Connection): Where to send the measurements.
+
+    RETURNS
+        None
+    '''
+    try:
+        sink = MemorySink()
+        instrument = Instrument(engine, [sink]) if engine in LEVELWISE else NULL_INSTRUMENT
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            begin = perf_counter()
+            L = ENGINES[engine](file_name, epsilon, instrument)
+            wall_time = perf_counter() - begin
+        if engine in LEVELWISE:
+            # A level is a pass when it counted anything; the last one may have had no candidates left.
+            levels = [{'k':r['k'], 'phases':r['phases'], **r['counters']} for r in sink.records]
+            passes = sum(1 for r in sink.records if r['k'] == 1 or r['counters'].get('counted'))
+        else:
+            levels = [{'k':k, 'frequent':len(L[k])} for k in sorted(L)]
+            passes = None
+        conn.send({'wall_time':wall_time, 'peak_rss_kib':peak_rss(), 'patterns':sum(len(l) for l in L.values()),
+                   'passes':passes, 'levels':levels, 'digest':digest(L)})
+    except Exception as e:
+        conn.send({'error':f'{type(e).__name__}: {e}'})
+    finally:
+        conn.close()
+
+def measure(engine, file_name, epsilon):
+    '''
+    ARGUMENTS
+        engine (str): The name of the engine in ENGINES.
+        file_name (str): The transaction database file.
+        epsilon (float/int): Absolute minimum support threshold.
+
+    RETURNS
+        (dict): The measurements of one run.
+    '''
+    context = multiprocessing.get_context('fork')
+    parent, child = context.Pipe(duplex=False)
+    process = context.Process(target=run_engine, args=(engine, file_name, epsilon, child))
+    process.start()
+    child.close()
+    try:
+        result = parent.recv()
+    except EOFError:
+        result = {'error':'the run exited without reporting'}
+    process.join()
+    return result
+
+def benchmark(engines, datasets, min_supps, repeats, out_file, data_dir, seed=0):
+    '''
+    This function runs every engine on every dataset at
+    every threshold, appending one JSON line per run to
+    the output file. Each record also holds the profile
+    of the dataset at its threshold, which auto.py fits
+    its cost model on.
+
+    ARGUMENTS
+        engines (list[str]): The names of the engines in ENGINES.
+        datasets (list[str]): Transaction database files or Quest dataset names.
+        min_supps (list[float]): The relative minimum support thresholds.
+        repeats (int): The number of runs of each combination.
+        out_file (str): The output JSON Lines file of results.
+        data_dir (str): The directory of generated databases.
+        seed (int): The seed of the generator. (Default=0)
+
+    RETURNS
+        (list[dict]): The record of every run.
+    '''
+    records = []
+    environment = {'python':platform.python_version(), 'platform':platform.platform(), 'processors':PROCESSORS}
+    with open(out_file, 'a') as f:
+        for dataset in datasets:
+            file_name = dataset_path(dataset, data_dir, seed)
+            n = apriori.get_db_size(file_name)
+            scanned = scan_profile(file_name)
+            for min_supp in min_supps:
+                stats = profile(file_name, min_supp, scanned)
+                for engine in engines:
+                    for repeat in range(repeats):
+                        result = measure(engine, file_name, min_supp * n)
+                        record = {'engine':engine, 'dataset':dataset, 'min_supp':min_supp, 'repeat':repeat, 'timestamp':time(), **environment, 'profile':stats, **result}
+                        f.write(json.dumps(record) + '\n')
+                        f.flush()
+                        records.append(record)
+                        if 'error' in result:
+                            print(ctime(), f"{engine} on {dataset} at {min_supp}: {result['error']}")
+                        else:
+                            print(ctime(), f"{engine} on {dataset} at {min_supp}: {result['wall_time']:.4f}s, {result['peak_rss_kib']} KiB, {result['patterns']} pattern(s).")
+    return records
+
+def summarize(records):
+    '''
+    ARGUMENTS
+        records (iterable[dict]): The records of benchmark runs.
+
+    RETURNS
+        (dict[tuple[str, str, float]:dict]): The median wall time, largest peak RSS and result digests of each (engine, dataset, min_supp).
+    '''
+    groups = {}
+    for record in records:
+        if 'error' in record:
+            continue
+        groups.setdefault((record['engine'], record['dataset'], record['min_supp']), []).append(record)
+    return {key:{'wall_time':statistics.median(r['wall_time'] for r in runs),
+                 'peak_rss_kib':max(r['peak_rss_kib'] for r in runs),
+                 'digests':{r['digest'] for r in runs}} for (key, runs) in groups.items()}
+
+def compare(records, baseline_file, tolerance=0.2, noise=0.01):
+    '''
+    This function compares runs against a saved baseline
+    of earlier runs and reports the combinations whose
+    median wall time or peak RSS grew by more than the
+    tolerance, or whose frequent patterns changed.
+
+    ARGUMENTS
+        records (list[dict]): The records of the new runs.
+        baseline_file (str): A JSON Lines file of earlier results.
+        tolerance (float): The allowed relative growth. (Default=0.2)
+        noise (float): Wall time differences in seconds too small to count. (Default=0.01)
+
+    RETURNS
+        (list[str]): A description of every regression.
+    '''
+    with open(baseline_file) as f:
+        baseline = summarize(json.loads(line) for line in f if line.strip())
+    regressions = []
+    for key, current in summarize(records).items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        name = '{} on {} at {}'.format(*key)
+        if current['digests'] != base['digests']:
+            regressions.append(f'{name}: the frequent patterns differ from the baseline.')
+        if current['wall_time'] > base['wall_time'] * (1 + tolerance) and current['wall_time'] - base['wall_time'] > noise:
+            regressions.append(f"{name}: wall time {current['wall_time']:.4f}s against {base['wall_time']:.4f}s.")
+        if current['peak_rss_kib'] > base['peak_rss_kib'] * (1 + tolerance):
+            regressions.append(f"{name}: peak RSS {current['peak_rss_kib']} KiB against {base['peak_rss_kib']} KiB.")
+    return regressions
+
+if '__main__' == __name__:
+    # Prepare command line parser
+    parser = argparse.ArgumentParser()
+    parser.description = '''A CLI that benchmarks the frequent pattern mining engines in-process.
+    Each run is forked from the benchmark with every module already imported, so interpreter startup is not timed,
+    and records the wall time, the peak resident set size, the number of candidates and frequent patterns of each level,
+    and a digest of the result. Datasets are transaction database files or IBM Quest style names such as T10I4D1K,
+    which are generated reproducibly. Results are appended to a JSON Lines file, which can later serve as a baseline.'''
+    required = parser.add_argument_group('required arguments')
+    required.add_argument("-d", "--datasets", type=str, nargs='+', required=True, help="Transaction database files or Quest dataset names such as T10I4D1K.")
+    parser.add_argument("-e", "--engines", type=str, nargs='+', choices=list(ENGINES), default=list(ENGINES), help="Engines to benchmark. (default=all)")
+    parser.add_argument("-m", "--min_supp", type=float, nargs='+', default=[0.01], help="Minimum support thresholds as floats between 0 and 1. (default=0.01)")
+    parser.add_argument("-r", "--repeats", type=int, default=3, help="Runs of each combination. (default=3)")
+    parser.add_argument("-o", "--out_file", type=str, default="benchmark_results.jsonl", help="Output JSON Lines results file, appended to. (default='benchmark_results.jsonl')")
+    parser.add_argument("--data_dir", type=str, default=os.path.join(tempfile.gettempdir(), 'quest'), help="Directory of generated datasets. (default=<temp>/quest)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the dataset generator. (default=0)")
+    parser.add_argument("--baseline", type=str, default=None, help="JSON Lines results of an earlier run to compare against. (default=None)")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Relative growth of the median wall time or peak RSS reported as a regression. (default=0.2)")
+    args = parser.parse_args()
+
+    # Check validity of CLI arguments
+    assert all(0 <= m <= 1 for m in args.min_supp)
+    assert args.repeats > 0
+    print(ctime(), 'Starting\n')
+    records = benchmark(args.engines, args.datasets, args.min_supp, args.repeats, args.out_file, args.data_dir, args.seed)
+    if args.baseline:
+        regressions = compare(records, args.baseline, args.tolerance)
+        for regression in regressions:
+            print(ctime(), 'REGRESSION', regression)
+        print(ctime(), f'Found {len(regressions)} regression(s) against {args.baseline}.\n')
+        if regressions:
+            sys.exit(1)
+    print(ctime(), 'Finished\n')
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+#-*- coding:utf-8 - *-
+
+"""
+This CLI tool converts transaction databases between the text format and the binary format of the frequent patten mining scripts.
+
+GNU General Public License v3.0
+Permissions of this strong copyleft license are conditioned on making available complete source code of licensed works and modifications,
+which include larger works using a licensed work, under the same license.
+Copyright and license notices must be preserved.
+Contributors provide an express grant of patent rights.
+
+Reference Materials:
+[1] https://docs.python.org/3/library/mmap.html
+[2] https://numpy.org/doc/stable/reference/generated/numpy.frombuffer.html
+"""
+
+import argparse
+from time import ctime
+
+from transaction_store import TransactionStore, is_binary
+
+__author__ = 'Galen Seilis'
+__copyright__ = 'Copyright 2020, Assignment 1, CPSC-673-A1'
+__credits__ = ['Galen Seilis', 'Fan Jiang (Instructor)']
+__license__ = 'GNU General Public License v3.0'
+__version__ = '0.1.0'
+__maintainer__ = 'Galen Seilis'
+__email__ = 'seilis@unbc.ca'
+__status__ = 'School Project'
+
+def convert(file_in, file_out, to=None):
+    '''
+    This function converts a transaction database from
+    the text format to the binary format or back.
+
+    ARGUMENTS
+        file_in (str): The input transaction database file.
+        file_out (str): The output transaction database file.
+        to (str): Either 'binary' or 'text'. (Default=the opposite of the input)
+
+    RETURNS
+        None
+    '''
+    binary = is_binary(file_in)
+    if to is None:
+        to = 'text' if binary else 'binary'
+    store = TransactionStore.from_binary(file_in) if binary else TransactionStore.from_file(file_in)
+    print(ctime(), f'Read {len(store)} transactions from {file_in}.')
+    if to == 'binary':
+        store.to_binary(file_out)
+    else:
+        store.to_text(file_out)
+    print(ctime(), f'Wrote {len(store)} transactions to {file_out} in the {to} format.')
+
+if '__main__' == __name__:
+    # Prepare command line parser
+    parser = argparse.ArgumentParser()
+    parser.description = '''A CLI that converts a transaction database between the text and binary formats.
+    The text format has the number of transactions on its first line, followed by one tab-delimited line per transaction
+    holding the transaction ID, the number of items, and a space-delimited set of items.
+    The binary format holds the transaction IDs, the sorted items of every transaction, their offsets, and the count of every item.
+    It can be given to any of the mining scripts in place of a text file and is mapped into memory without being parsed.'''
+    required = parser.add_argument_group('required arguments')
+    required.add_argument("-i", "--in_file", type=str, required=True, help="Input data file.")
+    required.add_argument("-o", "--out_file", type=str, required=True, help="Output data file.")
+    parser.add_argument("-t", "--to", type=str, choices=['binary', 'text'], default=None, help="Output format. (default=the opposite of the input format)")
+    args = parser.parse_args()
+
+    convert(args.in_file, args.out_file, args.to)
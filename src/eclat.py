@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+#-*- coding:utf-8 - *-
+
+"""
+This CLI tool is a Python implementation of the vertical 'eclat' frequent patten mining algorithm.
+
+GNU General Public License v3.0
+Permissions of this strong copyleft license are conditioned on making available complete source code of licensed works and modifications,
+which include larger works using a licensed work, under the same license.
+Copyright and license notices must be preserved.
+Contributors provide an express grant of patent rights.
+
+Reference Materials:
+[1] Zaki, M. J. (2000) Scalable Algorithms for Association Mining.
+[2] http://rasbt.github.io/mlxtend/user_guide/frequent_patterns/apriori/
+[3] Zaki, M. J. and Hsiao, C. (2002) CHARM: An Efficient Algorithm for Closed Itemset Mining.
+[4] Burdick, D., Calimlim, M. and Gehrke, J. (2001) MAFIA: A Maximal Frequent Itemset Algorithm for Transactional Databases.
+"""
+
+import argparse
+from array import array
+from time import ctime
+
+from apriori import get_db_size, scan_db, write_rules
+from result_writer import FORMATS
+from rules import mine_rules
+
+__author__ = 'Galen Seilis'
+__copyright__ = 'Copyright 2020, Assignment 1, CPSC-673-A1'
+__credits__ = ['Galen Seilis', 'Fan Jiang (Instructor)']
+__license__ = 'GNU General Public License v3.0'
+__version__ = '0.1.0'
+__maintainer__ = 'Galen Seilis'
+__email__ = 'seilis@unbc.ca'
+__status__ = 'School Project'
+
+try:
+    popcount = int.bit_count
+except AttributeError: # Python < 3.10
+    def popcount(bits):
+        return bin(bits).count('1')
+
+def vertical_scan(file_name, epsilon):
+    '''
+    This function performs the only database scan
+    of the eclat algorithm. It turns the horizontal
+    transaction database into a vertical one where
+    each item maps to the set of transactions that
+    contain it.
+
+    The set of transactions is stored as a bitset in
+    a Python integer, where bit i is set when the i-th
+    transaction of the file contains the item. The rows
+    of each item are collected first and its bitset is
+    built once from bytes, since OR-ing one bit at a time
+    into a growing integer copies it on every incidence.
+
+    ARGUMENTS
+        file_name (str): The name of the transaction database file.
+        epsilon (float/int): Absolute minimum support threshold.
+
+    RETURNS
+        (dict[int:int]): The bitset of each frequent item.
+    '''
+    rows = {}
+    n = 0
+    for row, (t_id, t_n, t_set) in enumerate(scan_db(file_name)):
+        for item in t_set:
+            if item not in rows:
+                rows[item] = array('I')
+            rows[item].append(row)
+        n = row + 1
+    tidsets = {}
+    for item, item_rows in rows.items():
+        if len(item_rows) >= epsilon:
+            buf = bytearray((n + 7) // 8)
+            for row in item_rows:
+                buf[row >> 3] |= 1 << (row & 7)
+            tidsets[item] = int.from_bytes(buf, 'little')
+    return tidsets
+
+def extend(prefix, klass, epsilon, L):
+    '''
+    This function mines every frequent extension of
+    a prefix depth-first by intersecting the bitsets
+    of its equivalence class.
+
+    ARGUMENTS
+        prefix (tuple[int]): The itemset shared by the equivalence class.
+        klass (list[tuple[int, int, int]]): The (item, bitset, support) extensions of the prefix.
+        epsilon (float/int): Absolute minimum support threshold.
+        L (dict[int:dict[frozenset[int]:int]]): Dictionary of frequent patterns to add to.
+
+    RETURNS
+        None
+    '''
+    for i, (item_i, bits_i, support_i) in enumerate(klass):
+        itemset = prefix + (item_i,)
+        if len(itemset) == 1:
+            L.setdefault(1, {})[item_i] = support_i
+        else:
+            L.setdefault(len(itemset), {})[frozenset(itemset)] = support_i
+        suffix = []
+        for item_j, bits_j, support_j in klass[i+1:]:
+            bits = bits_i & bits_j
+            support = popcount(bits)
+            if support >= epsilon:
+                suffix.append((item_j, bits, support))
+        if suffix:
+            extend(itemset, suffix, epsilon, L)
+
+def charm_extend(klass, epsilon, closed):
+    '''
+    This function mines the closed extensions of an
+    equivalence class depth-first in the style of CHARM.
+    Two itemsets with equal bitsets are merged, and an
+    itemset whose bitset is contained in another's takes
+    on its items, so the non-closed itemsets between them
+    are never enumerated.
+
+    ARGUMENTS
+        klass (list[tuple[frozenset[int], int, int]]): The (itemset, bitset, support) members of the class.
+        epsilon (float/int): Absolute minimum support threshold.
+        closed (dict[int:tuple[frozenset[int], int]]): The (itemset, support) of each closed bitset found, to add to.
+
+    RETURNS
+        None
+    '''
+    removed = set()
+    for i, (itemset_i, bits_i, support_i) in enumerate(klass):
+        if i in removed:
+            continue
+        children = []
+        for j in range(i + 1, len(klass)):
+            if j in removed:
+                continue
+            itemset_j, bits_j, support_j = klass[j]
+            bits = bits_i & bits_j
+            if bits == bits_i:
+                # Every transaction of itemset_i also holds itemset_j.
+                itemset_i = itemset_i | itemset_j
+                if bits == bits_j:
+                    removed.add(j)
+                continue
+            support = popcount(bits)
+            if support < epsilon:
+                continue
+            if bits == bits_j:
+                removed.add(j)
+            children.append((itemset_j, bits, support))
+        if children:
+            children = sorted(((itemset_i | itemset_j, bits, support) for (itemset_j, bits, support) in children), key=lambda x: x[2])
+            charm_extend(children, epsilon, closed)
+        # The closure of a bitset is unique, so itemsets reaching the same bitset belong together.
+        itemset, _ = closed.get(bits_i, (frozenset(), support_i))
+        closed[bits_i] = (itemset | itemset_i, support_i)
+
+def maximal_extend(head, bits, support, tail, epsilon, maximal, local):
+    '''
+    This function mines the maximal extensions of a head
+    itemset depth-first in the style of MAFIA. Tail items
+    held by every transaction of the head are moved into
+    the head, and a branch is skipped outright when the
+    head together with its whole tail is already contained
+    in a maximal itemset.
+
+    Itemsets are bitmasks over the positions of the
+    frequent items, so subset checks are single ANDs, and
+    each branch only checks the maximal itemsets which
+    contain its head.
+
+    ARGUMENTS
+        head (int): The bitmask of the head itemset.
+        bits (int): The bitset of the transactions holding the head.
+        support (int): The support of the head.
+        tail (list[tuple[int, int]]): The (item position, bitset) of each possible extension.
+        epsilon (float/int): Absolute minimum support threshold.
+        maximal (dict[int:int]): The support of each maximal itemset mask found, to add to.
+        local (list[int]): The maximal itemset masks found so far which contain the head.
+
+    RETURNS
+        (list[int]): The maximal itemset masks found in the branch.
+    '''
+    extensions = []
+    for position, item_bits in tail:
+        joined = bits & item_bits
+        if joined == bits:
+            head |= 1 << position
+            continue
+        joined_support = popcount(joined)
+        if joined_support >= epsilon:
+            extensions.append((position, item_bits, joined_support))
+    local = [mask for mask in local if mask & head == head]
+    hut = head
+    for position, item_bits, joined_support in extensions:
+        hut |= 1 << position
+    if any(hut & mask == hut for mask in local):
+        return []
+    if not extensions:
+        if local:
+            return []
+        maximal[head] = support
+        return [head]
+    found = []
+    extensions.sort(key=lambda x: x[2])
+    for i, (position, item_bits, joined_support) in enumerate(extensions):
+        rest = [(p, b) for (p, b, _) in extensions[i+1:]]
+        branch = maximal_extend(head | 1 << position, bits & item_bits, joined_support, rest, epsilon, maximal, [mask for mask in local if mask >> position & 1])
+        local.extend(branch)
+        found.extend(branch)
+    return found
+
+def eclat(file_name, epsilon, mode='all'):
+    '''
+    This function performs the Eclat frequent pattern
+    mining algorithm.
+
+    ARGUMENTS
+        file_name (str): The input data file name of transactions.
+        epsilon (float/int): Absolute minimum support threshold.
+        mode (str): 'all', or 'closed' or 'maximal' to mine only those itemsets. (Default='all')
+
+    RETURNS
+        L (dict[int:dict[frozenset[int]:int]]): Dictionary of all frequent patterns found by the algorithm.
+    '''
+    print(ctime(), 'Building vertical tidsets.')
+    tidsets = vertical_scan(file_name, epsilon)
+    print(ctime(), f"Eclat found {len(tidsets)} frequent item(s).\n")
+    # Extending the least frequent items first keeps the intersections small.
+    klass = sorted(((item, bits, popcount(bits)) for (item, bits) in tidsets.items()), key=lambda x: (x[2], x[0]))
+    L = {1:{}}
+    print(ctime(), f'Searching for {mode} frequent patterns depth-first.')
+    if mode == 'closed':
+        closed = {}
+        charm_extend([(frozenset([item]), bits, support) for (item, bits, support) in klass], epsilon, closed)
+        for itemset, support in closed.values():
+            if len(itemset) == 1:
+                L[1][next(iter(itemset))] = support
+            else:
+                L.setdefault(len(itemset), {})[itemset] = support
+    elif mode == 'maximal':
+        maximal = {}
+        if klass:
+            n = get_db_size(file_name)
+            maximal_extend(0, (1 << n) - 1, n, [(position, bits) for (position, (item, bits, support)) in enumerate(klass)], epsilon, maximal, [])
+        for mask, support in maximal.items():
+            itemset = frozenset(klass[position][0] for position in range(mask.bit_length()) if mask >> position & 1)
+            if len(itemset) == 1:
+                L[1][next(iter(itemset))] = support
+            else:
+                L.setdefault(len(itemset), {})[itemset] = support
+    else:
+        extend((), klass, epsilon, L)
+    print(ctime(), f"Eclat found {sum(len(l) for l in L.values())} {mode} frequent pattern(s).\n")
+    return L
+
+if '__main__' == __name__:
+    # Prepare command line parser
+    parser = argparse.ArgumentParser()
+    parser.description = '''A CLI that performs the Eclat frequent pattern learning algorithm.
+    This program expects an input text file with a particular format.
+    The first line of the input file should be the number of transactions in the transaction database.
+    All subsequent lines are expected to have a tab-delimited format where the first column is the transaction ID,
+    the second column is the number of items in the transaction, and the third column is a space-delimited set of items.
+    Failure to format the input file correctly may result in errors or unexpected behaviour.'''
+    required = parser.add_argument_group('required arguments')
+    required.add_argument("-i", "--in_file", type=str, required=True, help="Input data file.")
+    parser.add_argument("-o", "--out_file", type=str, default="MiningResults.txt", help="Output results file. (default='MiningResults.txt')")
+    parser.add_argument("-f", "--format", type=str, choices=FORMATS, default='text', help="Output results format. (default='text')")
+    parser.add_argument("--min_conf", type=float, default=None, help="Minimum confidence of the association rules generated from the results, or unset to skip them. (default=None)")
+    parser.add_argument("--rules_file", type=str, default="AssociationRules.txt", help="Output association rules file. (default='AssociationRules.txt')")
+    parser.add_argument("-m", "--min_supp", type=float, default=0.5, help="Minimum support threshold as a float between 0 and 1. (default=0.5)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--closed", action="store_const", dest="mode", const="closed", default="all", help="Mine only closed itemsets, from which the support of every frequent itemset can be recovered. (default=False)")
+    mode.add_argument("--maximal", action="store_const", dest="mode", const="maximal", help="Mine only maximal itemsets. (default=False)")
+    args = parser.parse_args()
+
+    # Check validity of CLI arguments
+    assert 0 <= args.min_supp <= 1
+    assert args.min_conf is None or 0 <= args.min_conf <= 1
+    if args.mode == 'maximal' and args.min_conf is not None:
+        parser.error('--min_conf needs the support of every subset of a rule, which --maximal does not keep; use --closed instead.')
+    epsilon = args.min_supp * get_db_size(args.in_file)
+    print(ctime(), 'Starting\n')
+    rules = eclat(args.in_file, epsilon, args.mode)
+    print(ctime(), 'Writing rules to file...')
+    write_rules(args.out_file, rules, args.format)
+    if args.min_conf is not None:
+        mine_rules(args.out_file, args.rules_file, args.min_conf, args.mode == 'closed')
+    print(ctime(), 'Finished\n')
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+#-*- coding:utf-8 - *-
+
+"""
+This CLI tool is a Python implementation of the 'FP-growth' frequent patten mining algorithm.
+
+GNU General Public License v3.0
+Permissions of this strong copyleft license are conditioned on making available complete source code of licensed works and modifications,
+which include larger works using a licensed work, under the same license.
+Copyright and license notices must be preserved.
+Contributors provide an express grant of patent rights.
+
+Reference Materials:
+[1] Han, J., Pei, J. and Yin, Y. (2000) Mining Frequent Patterns without Candidate Generation.
+[2] http://rasbt.github.io/mlxtend/user_guide/frequent_patterns/fpgrowth/
+"""
+
+import argparse
+from collections import Counter
+from time import ctime
+
+from apriori import first_scan, get_db_size, scan_db, write_rules
+from result_writer import FORMATS
+from rules import mine_rules
+
+__author__ = 'Galen Seilis'
+__copyright__ = 'Copyright 2020, Assignment 1, CPSC-673-A1'
+__credits__ = ['Galen Seilis', 'Fan Jiang (Instructor)']
+__license__ = 'GNU General Public License v3.0'
+__version__ = '0.1.0'
+__maintainer__ = 'Galen Seilis'
+__email__ = 'seilis@unbc.ca'
+__status__ = 'School Project'
+
+class FPNode:
+    '''
+    A node of an FP-tree.
+
+    ATTRIBUTES
+        item (int): The item of the node, or None for the root.
+        count (int): The number of transactions sharing the path to this node.
+        parent (FPNode): The parent node.
+        children (dict[int:FPNode]): The child nodes by item.
+    '''
+    __slots__ = ('item', 'count', 'parent', 'children')
+
+    def __init__(self, item, parent):
+        self.item = item
+        self.count = 0
+        self.parent = parent
+        self.children = {}
+
+class FPTree:
+    '''
+    A frequent pattern tree. Each transaction is
+    inserted as a path of its frequent items in a
+    fixed order, so transactions sharing a prefix
+    share nodes.
+
+    ATTRIBUTES
+        root (FPNode): The root of the tree.
+        header (dict[int:list[FPNode]]): Every node of each item.
+    '''
+
+    def __init__(self):
+        self.root = FPNode(None, None)
+        self.header = {}
+
+    def insert(self, items, count=1):
+        '''
+        ARGUMENTS
+            items (list[int]): The frequent items of a transaction in tree order.
+            count (int): The number of times to insert the transaction. (Default=1)
+
+        RETURNS
+            None
+        '''
+        node = self.root
+        for item in items:
+            child = node.children.get(item)
+            if child is None:
+                child = FPNode(item, node)
+                node.children[item] = child
+                self.header.setdefault(item, []).append(child)
+            child.count += count
+            node = child
+
+    def prefix_paths(self, item):
+        '''
+        This method returns the conditional pattern base
+        of an item, which is the path from the root to
+        each of its nodes.
+
+        ARGUMENTS
+            item (int): An item in the tree.
+
+        RETURNS
+            (list[tuple[list[int], int]]): Each path in tree order with its count.
+        '''
+        paths = []
+        for node in self.header[item]:
+            path = []
+            parent = node.parent
+            while parent.item is not None:
+                path.append(parent.item)
+                parent = parent.parent
+            if path:
+                path.reverse()
+                paths.append((path, node.count))
+        return paths
+
+def build_tree(file_name, L1):
+    '''
+    This function performs the second and last
+    database scan, inserting the frequent items of
+    every transaction into an FP-tree in descending
+    order of support.
+
+    ARGUMENTS
+        file_name (str): The name of the transaction database file.
+        L1 (dict[int:int]): A count table of each frequent item.
+
+    RETURNS
+        (FPTree): The FP-tree of the transaction database.
+    '''
+    rank = {item:r for (r, item) in enumerate(sorted(L1, key=lambda i: (-L1[i], i)))}
+    tree = FPTree()
+    for t_id, t_n, t_set in scan_db(file_name):
+        items = sorted((i for i in t_set if i in rank), key=rank.__getitem__)
+        if items:
+            tree.insert(items)
+    return tree
+
+def mine_tree(tree, suffix, epsilon, L):
+    '''
+    This function recursively mines an FP-tree by
+    building a conditional FP-tree for every item
+    and appending the item to the suffix.
+
+    ARGUMENTS
+        tree (FPTree): The (conditional) FP-tree to mine.
+        suffix (tuple[int]): The itemset the tree is conditioned on.
+        epsilon (float/int): Absolute minimum support threshold.
+        L (dict[int:dict[frozenset[int]:int]]): Dictionary of frequent patterns to add to.
+
+    RETURNS
+        None
+    '''
+    for item, nodes in tree.header.items():
+        support = sum(node.count for node in nodes)
+        if support < epsilon:
+            continue
+        itemset = suffix + (item,)
+        if len(itemset) == 1:
+            L.setdefault(1, {})[item] = support
+        else:
+            L.setdefault(len(itemset), {})[frozenset(itemset)] = support
+        paths = tree.prefix_paths(item)
+        counts = Counter()
+        for path, count in paths:
+            for i in path:
+                counts[i] += count
+        frequent = {i for (i, c) in counts.items() if c >= epsilon}
+        if not frequent:
+            continue
+        conditional = FPTree()
+        for path, count in paths:
+            path = [i for i in path if i in frequent]
+            if path:
+                conditional.insert(path, count)
+        mine_tree(conditional, itemset, epsilon, L)
+
+def fpgrowth(file_name, epsilon):
+    '''
+    This function performs the FP-growth frequent pattern
+    mining algorithm. It reads the database exactly twice
+    and does not generate candidates.
+
+    ARGUMENTS
+        file_name (str): The input data file name of transactions.
+        epsilon (float/int): Absolute minimum support threshold.
+
+    RETURNS
+        L (dict[int:dict[frozenset[int]:int]]): Dictionary of all frequent patterns found by the algorithm.
+    '''
+    print(ctime(), 'Searching for k=1 frequent patterns.')
+    L1 = first_scan(file_name, epsilon)
+    print(ctime(), f"FP-growth found {len(L1)} new frequent pattern(s).\n")
+    print(ctime(), 'Building the FP-tree.')
+    tree = build_tree(file_name, L1)
+    print(ctime(), 'Mining the FP-tree.')
+    L = {1:{}}
+    mine_tree(tree, (), epsilon, L)
+    print(ctime(), f"FP-growth found {sum(len(l) for l in L.values())} frequent pattern(s).\n")
+    return L
+
+if '__main__' == __name__:
+    # Prepare command line parser
+    parser = argparse.ArgumentParser()
+    parser.description = '''A CLI that performs the FP-growth frequent pattern learning algorithm.
+    This program expects an input text file with a particular format.
+    The first line of the input file should be the number of transactions in the transaction database.
+    All subsequent lines are expected to have a tab-delimited format where the first column is the transaction ID,
+    the second column is the number of items in the transaction, and the third column is a space-delimited set of items.
+    Failure to format the input file correctly may result in errors or unexpected behaviour.'''
+    required = parser.add_argument_group('required arguments')
+    required.add_argument("-i", "--in_file", type=str, required=True, help="Input data file.")
+    parser.add_argument("-o", "--out_file", type=str, default="MiningResults.txt", help="Output results file. (default='MiningResults.txt')")
+    parser.add_argument("-f", "--format", type=str, choices=FORMATS, default='text', help="Output results format. (default='text')")
+    parser.add_argument("--min_conf", type=float, default=None, help="Minimum confidence of the association rules generated from the results, or unset to skip them. (default=None)")
+    parser.add_argument("--rules_file", type=str, default="AssociationRules.txt", help="Output association rules file. (default='AssociationRules.txt')")
+    parser.add_argument("-m", "--min_supp", type=float, default=0.5, help="Minimum support threshold as a float between 0 and 1. (default=0.5)")
+    args = parser.parse_args()
+
+    # Check validity of CLI arguments
+    assert 0 <= args.min_supp <= 1
+    assert args.min_conf is None or 0 <= args.min_conf <= 1
+    epsilon = args.min_supp * get_db_size(args.in_file)
+    print(ctime(), 'Starting\n')
+    rules = fpgrowth(args.in_file, epsilon)
+    print(ctime(), 'Writing rules to file...')
+    write_rules(args.out_file, rules, args.format)
+    if args.min_conf is not None:
+        mine_rules(args.out_file, args.rules_file, args.min_conf)
+    print(ctime(), 'Finished\n')
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+#-*- coding:utf-8 - *-
+
+"""
+This module holds a NumPy support counting backend over a packed item-incidence matrix for the 'apriori' frequent patten mining scripts.
+
+GNU General Public License v3.0
+Permissions of this strong copyleft license are conditioned on making available complete source code of licensed works and modifications,
+which include larger works using a licensed work, under the same license.
+Copyright and license notices must be preserved.
+Contributors provide an express grant of patent rights.
+
+Reference Materials:
+[1] https://numpy.org/doc/stable/reference/generated/numpy.packbits.html
+[2] https://numpy.org/doc/stable/reference/generated/numpy.bitwise_count.html
+"""
+
+from array import array
+
+try:
+    import numpy as np
+except ImportError: # NumPy is optional; the drivers fall back to the CandidateTrie.
+    np = None
+
+__author__ = 'Galen Seilis'
+__copyright__ = 'Copyright 2020, Assignment 1, CPSC-673-A1'
+__credits__ = ['Galen Seilis', 'Fan Jiang (Instructor)']
+__license__ = 'GNU General Public License v3.0'
+__version__ = '0.1.0'
+__maintainer__ = 'Galen Seilis'
+__email__ = 'seilis@unbc.ca'
+__status__ = 'School Project'
+
+DEFAULT_MEMORY_BUDGET = 256 * 2**20 # bytes
+INCIDENCE_BYTES = 48 # bytes taken by each incidence while the matrix is filled
+
+def matrix_nbytes(n_transactions, n_items):
+    '''
+    ARGUMENTS
+        n_transactions (int): The number of transactions.
+        n_items (int): The number of frequent items.
+
+    RETURNS
+        (int): The size in bytes of the packed incidence matrix.
+    '''
+    return n_items * ((n_transactions + 7) // 8)
+
+def fits(n_transactions, n_items, memory_budget=DEFAULT_MEMORY_BUDGET):
+    '''
+    This function decides whether the incidence matrix
+    backend can be used, which requires NumPy and a
+    matrix no larger than half of the memory budget so
+    that the other half is left for counting batches.
+
+    ARGUMENTS
+        n_transactions (int): The number of transactions.
+        n_items (int): The number of frequent items.
+        memory_budget (int): The number of bytes the backend may use. (Default=256 MiB)
+
+    RETURNS
+        (bool): Whether the backend is available and the matrix fits.
+    '''
+    return np is not None and n_items > 0 and matrix_nbytes(n_transactions, n_items) <= memory_budget // 2
+
+def popcount(bits):
+    '''
+    ARGUMENTS
+        bits (numpy.ndarray[uint8]): Packed bitsets, one per row.
+
+    RETURNS
+        (numpy.ndarray[int64]): The number of set bits in each row.
+    '''
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(bits).sum(axis=1, dtype=np.int64)
+    return np.unpackbits(bits, axis=1).sum(axis=1, dtype=np.int64)
+
+class IncidenceMatrix:
+    '''
+    A packed bit matrix with one row per frequent item
+    and one bit per transaction, set when the transaction
+    contains the item.
+
+    The support of a candidate is the popcount of the AND
+    of the rows of its items, which is computed for whole
+    batches of candidates at once.
+
+    The matrix is allocated once and filled one block of
+    transactions at a time. The (row, column) pairs of a
+    block and the temporaries of setting their bits take
+    about INCIDENCE_BYTES per incidence, so a block holds
+    as many incidences as fit in the half of the memory
+    budget left for counting.
+
+    ATTRIBUTES
+        index (dict[int:int]): The row of each frequent item.
+        tids (array[int]): The transaction identifier of each bit.
+        bits (numpy.ndarray[uint8]): The packed matrix, of shape (items, ceil(transactions / 8)).
+        memory_budget (int): The number of bytes the backend may use.
+    '''
+
+    def __init__(self, transactions, n_transactions, items, memory_budget=DEFAULT_MEMORY_BUDGET):
+        '''
+        ARGUMENTS
+            transactions (iterable[tuple[int, int, set[int]]]): The transactions of the database.
+            n_transactions (int): The number of transactions.
+            items (iterable[int]): The frequent items.
+            memory_budget (int): The number of bytes the backend may use. (Default=256 MiB)
+        '''
+        self.index = {item:i for (i, item) in enumerate(sorted(items))}
+        self.memory_budget = memory_budget
+        self.tids = array('q')
+        self.bits = np.zeros((len(self.index), (n_transactions + 7) // 8), dtype=np.uint8)
+        block = max(1, (memory_budget // 2) // INCIDENCE_BYTES)
+        rows = array('I')
+        columns = array('I')
+        first = 0
+        index = self.index
+        for column, (t_id, t_n, t_set) in enumerate(transactions):
+            self.tids.append(t_id)
+            for item in t_set:
+                row = index.get(item)
+                if row is not None:
+                    rows.append(row)
+                    columns.append(column - first)
+            if len(rows) >= block:
+                self._fill(rows, columns, first)
+                rows, columns = array('I'), array('I')
+                first = column + 1
+        self._fill(rows, columns, first)
+
+    def _fill(self, rows, columns, first):
+        '''
+        This method sets the bits of a block of incidences.
+
+        ARGUMENTS
+            rows (array[int]): The row of each incidence.
+            columns (array[int]): The column of each incidence, counted from first.
+            first (int): The column of the first transaction of the block.
+
+        RETURNS
+            None
+        '''
+        if not rows:
+            return
+        rows = np.frombuffer(rows, dtype=np.uint32)
+        columns = np.frombuffer(columns, dtype=np.uint32).astype(np.intp) + first
+        np.bitwise_or.at(self.bits, (rows, columns >> 3), np.uint8(128) >> (columns & 7).astype(np.uint8))
+
+    @property
+    def nbytes(self):
+        return self.bits.nbytes
+
+    def count(self, candidates, epsilon):
+        '''
+        This method counts the support of every candidate
+        with vectorized ANDs and popcounts, in batches sized
+        so that their intermediate bitsets fit in half of
+        the memory budget.
+
+        ARGUMENTS
+            candidates (dict[frozenset[int]]): Dictionary of candidates of equal size.
+            epsilon (float/int): Absolute minimum support threshold.
+
+        RETURNS
+            l (dict): A count table of each candidate meeting the threshold.
+            useful (set[int]): The transaction identifiers containing at least one candidate.
+        '''
+        order = list(candidates)
+        l = {}
+        hits = np.zeros(self.bits.shape[1], dtype=np.uint8)
+        if not order:
+            return l, set()
+        rows = np.array([sorted(self.index[item] for item in c) for c in order], dtype=np.intp)
+        batch = max(1, (self.memory_budget // 2) // max(2 * self.bits.shape[1], 1))
+        if not hasattr(np, 'bitwise_count'):
+            # unpackbits expands every byte of a batch to eight.
+            batch = max(1, batch // 8)
+        for start in range(0, len(order), batch):
+            block = rows[start:start + batch]
+            acc = self.bits[block[:, 0]]
+            for j in range(1, block.shape[1]):
+                acc &= self.bits[block[:, j]]
+            hits |= np.bitwise_or.reduce(acc, axis=0)
+            for c, support in zip(order[start:start + batch], popcount(acc).tolist()):
+                if support >= epsilon:
+                    l[c] = support
+        useful = np.flatnonzero(np.unpackbits(hits)[:len(self.tids)])
+        return l, {self.tids[i] for i in useful.tolist()}
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+#-*- coding:utf-8 - *-
+
+"""
+This CLI tool incrementally updates the frequent patterns of a growing transaction database in the style of 'FUP'.
+
+GNU General Public License v3.0
+Permissions of this strong copyleft license are conditioned on making available complete source code of licensed works and modifications,
+which include larger works using a licensed work, under the same license.
+Copyright and license notices must be preserved.
+Contributors provide an express grant of patent rights.
+
+Reference Materials:
+[1] Cheung, D. W., Han, J., Ng, V. T. and Wong, C. Y. (1996) Maintenance of Discovered Association Rules in Large Databases: An Incremental Updating Technique.
+[2] Thomas, S., Bodagala, S., Alsabti, K. and Ranka, S. (1997) An Efficient Algorithm for the Incremental Updation of Association Rules in Large Databases.
+"""
+
+import argparse
+from collections import Counter
+import json
+import os
+from time import ctime
+
+from apriori import scan_db, write_rules
+from itemsets import CandidateTrie, apriori_gen
+from result_writer import FORMATS
+from rules import mine_rules
+from transaction_store import TransactionStore, is_binary
+
+__author__ = 'Galen Seilis'
+__copyright__ = 'Copyright 2020, Assignment 1, CPSC-673-A1'
+__credits__ = ['Galen Seilis', 'Fan Jiang (Instructor)']
+__license__ = 'GNU General Public License v3.0'
+__version__ = '0.1.0'
+__maintainer__ = 'Galen Seilis'
+__email__ = 'seilis@unbc.ca'
+__status__ = 'School Project'
+
+STATE_VERSION = 1
+
+def load_state(file_name):
+    '''
+    This function reads the state saved by save_state,
+    or returns an empty state when the file is missing.
+
+    ARGUMENTS
+        file_name (str): The name of the state file.
+
+    RETURNS
+        (dict): The 'min_supp', 'n_transactions', 'sources' and 'counts' of the state,
+                where 'counts' maps every frequent and negative border itemset to its support.
+    '''
+    if not os.path.exists(file_name):
+        return {'min_supp':None, 'n_transactions':0, 'sources':[], 'counts':{}}
+    with open(file_name) as f:
+        state = json.load(f)
+    if state.get('version') != STATE_VERSION:
+        raise ValueError(f'{file_name} is not a version {STATE_VERSION} incremental mining state.')
+    counts = {}
+    for items, support in state['frequent'] + state['border']:
+        counts[frozenset(items)] = support
+    return {'min_supp':state['min_supp'], 'n_transactions':state['n_transactions'], 'sources':state['sources'], 'counts':counts}
+
+def save_state(file_name, min_supp, n_transactions, sources, L, border):
+    '''
+    This function saves the frequent itemsets and the
+    negative border with their supports, along with the
+    files they were counted over. The file is replaced
+    atomically so an interrupted run keeps the old state.
+
+    ARGUMENTS
+        file_name (str): The name of the state file.
+        min_supp (float): Relative minimum support threshold.
+        n_transactions (int): The number of transactions counted.
+        sources (list[str]): The transaction database files counted.
+        L (dict[int:dict[frozenset[int]/int:int]]): Dictionary of all frequent patterns.
+        border (dict[frozenset[int]:int]): The support of each itemset of the negative border.
+
+    RETURNS
+        None
+    '''
+    frequent = [[sorted([itemset]) if isinstance(itemset, int) else sorted(itemset), support] for level in L.values() for (itemset, support) in level.items()]
+    state = {'version':STATE_VERSION, 'min_supp':min_supp, 'n_transactions':n_transactions, 'sources':sources,
+             'frequent':frequent, 'border':[[sorted(itemset), support] for (itemset, support) in border.items()]}
+    with open(file_name + '.tmp', 'w') as f:
+        json.dump(state, f)
+    os.replace(file_name + '.tmp', file_name)
+
+def count_sources(sources, candidates):
+    '''
+    This function counts candidates of equal size over
+    every transaction database file of the state.
+
+    ARGUMENTS
+        sources (list[str]): The transaction database files.
+        candidates (dict[frozenset[int]]): Dictionary of candidates of equal size.
+
+    RETURNS
+        (dict[frozenset[int]:int]): The count of each candidate.
+    '''
+    trie = CandidateTrie(candidates)
+    for source in sources:
+        for t_id, t_n, t_set in scan_db(source):
+            trie.count(sorted(t_set))
+    return trie.counts
+
+def update(state, delta, min_supp):
+    '''
+    This function updates the frequent itemsets and the
+    negative border of a state with new transactions.
+
+    Level by level, the candidates are generated from
+    the updated frequent itemsets. A candidate that was
+    frequent or in the negative border already has its
+    old support, so only its count over the new
+    transactions is added. Only candidates that were
+    neither are counted over the old transactions as
+    well, which is the only time those are read again.
+    The infrequent candidates of each level make up the
+    new negative border.
+
+    Given an empty state, this mines the new
+    transactions from scratch.
+
+    ARGUMENTS
+        state (dict): The state returned by load_state.
+        delta (TransactionStore): The new transactions.
+        min_supp (float): Relative minimum support threshold.
+
+    RETURNS
+        L (dict[int:dict[frozenset[int]/int:int]]): Dictionary of all frequent patterns after the update.
+        border (dict[frozenset[int]:int]): The support of each itemset of the negative border.
+        rescanned (int): The number of candidates counted over the old transactions.
+    '''
+    known = state['counts']
+    sources = state['sources']
+    epsilon = min_supp * (state['n_transactions'] + len(delta))
+    items = Counter()
+    for t_id, t_n, t_set in delta:
+        items.update(t_set)
+    for itemset, support in known.items():
+        if len(itemset) == 1:
+            items[next(iter(itemset))] += support
+    L = {1:{k:v for (k,v) in items.items() if v >= epsilon}}
+    border = {frozenset([k]):v for (k,v) in items.items() if v < epsilon}
+    print(ctime(), f"Found {len(L[1])} frequent item(s) after the update.")
+    rescanned = 0
+    k = 2
+    while L[k-1]:
+        candidates, _ = apriori_gen(L[k-1], k)
+        if not candidates:
+            break
+        counts = CandidateTrie(candidates)
+        for t_id, t_n, t_set in delta:
+            counts.count(sorted(t_set))
+        counts = counts.counts
+        unknown = {c:0 for c in candidates if c not in known}
+        if unknown and sources:
+            print(ctime(), f'Counting {len(unknown)} new candidate(s) of size {k} over the old transactions.')
+            for c, support in count_sources(sources, unknown).items():
+                counts[c] += support
+            rescanned += len(unknown)
+        for c in candidates:
+            counts[c] += known.get(c, 0)
+        L[k] = {c:v for (c,v) in counts.items() if v >= epsilon}
+        border.update((c, v) for (c, v) in counts.items() if v < epsilon)
+        print(ctime(), f"Found {len(L[k])} frequent pattern(s) of size {k} from {len(candidates) - len(unknown)} known and {len(unknown)} new candidate(s).")
+        k += 1
+    if not L[k-1] and k > 2:
+        del L[k-1]
+    return L, border, rescanned
+
+def incremental(delta_file, state_file, min_supp=None):
+    '''
+    This function applies a file of new transactions to
+    a saved mining state and saves the updated state.
+
+    ARGUMENTS
+        delta_file (str): The file of new transactions.
+        state_file (str): The name of the state file, created when missing.
+        min_supp (float): Relative minimum support threshold. (Default=the threshold of the state)
+
+    RETURNS
+        L (dict[int:dict[frozenset[int]/int:int]]): Dictionary of all frequent patterns after the update.
+    '''
+    state = load_state(state_file)
+    if state['min_supp'] is not None and min_supp is not None and min_supp != state['min_supp']:
+        raise ValueError(f"{state_file} was mined at min_supp={state['min_supp']}, not {min_supp}.")
+    min_supp = state['min_supp'] if state['min_supp'] is not None else min_supp
+    if min_supp is None:
+        raise ValueError('A new state needs a minimum support threshold.')
+    delta_file = os.path.abspath(delta_file)
+    if delta_file in state['sources']:
+        raise ValueError(f'{delta_file} has already been counted in {state_file}.')
+    print(ctime(), f"Loaded a state of {state['n_transactions']} transaction(s) from {len(state['sources'])} file(s).")
+    delta = TransactionStore.from_binary(delta_file) if is_binary(delta_file) else TransactionStore.from_file(delta_file)
+    print(ctime(), f'Read {len(delta)} new transaction(s).\n')
+    L, border, rescanned = update(state, delta, min_supp)
+    print(ctime(), f"Updated to {sum(len(l) for l in L.values())} frequent pattern(s) and a negative border of {len(border)}, counting {rescanned} candidate(s) over the old transactions.\n")
+    save_state(state_file, min_supp, state['n_transactions'] + len(delta), state['sources'] + [delta_file], L, border)
+    return L
+
+if '__main__' == __name__:
+    # Prepare command line parser
+    parser = argparse.ArgumentParser()
+    parser.description = '''A CLI that incrementally updates frequent patterns as transactions are appended to a database.
+    Each run reads a file of new transactions in the usual text or binary format and a state file holding the frequent itemsets,
+    the negative border and their supports. The old transactions are only read again for itemsets that newly become candidates.
+    The updated frequent patterns are written to the output file and the state file is updated for the next increment.
+    The first run, without a state file, mines the given transactions from scratch.'''
+    required = parser.add_argument_group('required arguments')
+    required.add_argument("-i", "--in_file", type=str, required=True, help="Input file of new transactions.")
+    required.add_argument("-s", "--state", type=str, required=True, help="State file, created on the first run.")
+    parser.add_argument("-o", "--out_file", type=str, default="MiningResults.txt", help="Output results file. (default='MiningResults.txt')")
+    parser.add_argument("-f", "--format", type=str, choices=FORMATS, default='text', help="Output results format. (default='text')")
+    parser.add_argument("--min_conf", type=float, default=None, help="Minimum confidence of the association rules generated from the results, or unset to skip them. (default=None)")
+    parser.add_argument("--rules_file", type=str, default="AssociationRules.txt", help="Output association rules file. (default='AssociationRules.txt')")
+    parser.add_argument("-m", "--min_supp", type=float, default=None, help="Minimum support threshold as a float between 0 and 1. (default=the threshold of the state)")
+    args = parser.parse_args()
+
+    # Check validity of CLI arguments
+    assert args.min_supp is None or 0 <= args.min_supp <= 1
+    assert args.min_conf is None or 0 <= args.min_conf <= 1
+    print(ctime(), 'Starting\n')
+    rules = incremental(args.in_file, args.state, args.min_supp)
+    print(ctime(), 'Writing rules to file...')
+    write_rules(args.out_file, rules, args.format)
+    if args.min_conf is not None:
+        mine_rules(args.out_file, args.rules_file, args.min_conf)
+    print(ctime(), 'Finished\n')
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+#-*- coding:utf-8 - *-
+
+"""
+This module holds the per-level instrumentation shared by the 'apriori' frequent patten mining scripts.
+
+GNU General Public License v3.0
+Permissions of this strong copyleft license are conditioned on making available complete source code of licensed works and modifications,
+which include larger works using a licensed work, under the same license.
+Copyright and license notices must be preserved.
+Contributors provide an express grant of patent rights.
+
+Reference Materials:
+[1] https://docs.python.org/3/library/time.html#time.perf_counter
+[2] https://docs.python.org/3/library/resource.html
+[3] https://docs.python.org/3/library/profile.html
+[4] https://jsonlines.org/
+"""
+
+from contextlib import contextmanager, nullcontext
+import cProfile
+import json
+import resource
+from time import ctime, perf_counter
+
+__author__ = 'Galen Seilis'
+__copyright__ = 'Copyright 2020, Assignment 1, CPSC-673-A1'
+__credits__ = ['Galen Seilis', 'Fan Jiang (Instructor)']
+__license__ = 'GNU General Public License v3.0'
+__version__ = '0.1.0'
+__maintainer__ = 'Galen Seilis'
+__email__ = 'seilis@unbc.ca'
+__status__ = 'School Project'
+
+DEFAULT_PROFILE_FILE = 'level_{k}.prof'
+
+def peak_rss():
+    '''
+    RETURNS
+        (int): The peak resident set size in KiB of this process or of any of its finished children.
+    '''
+    return max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+
+class JsonLinesSink:
+    '''
+    A sink that appends each level record to a JSON
+    Lines file as soon as the level ends.
+
+    ATTRIBUTES
+        file_out (str): The output file name of level records.
+    '''
+
+    def __init__(self, file_out):
+        '''
+        ARGUMENTS
+            file_out (str): The output file name of level records.
+        '''
+        self.file_out = file_out
+        self.file = open(file_out, 'a')
+
+    def emit(self, record):
+        self.file.write(json.dumps(record) + '\n')
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+class MemorySink:
+    '''
+    A sink that keeps every level record in a list.
+
+    ATTRIBUTES
+        records (list[dict]): The level records in the order they ended.
+    '''
+
+    def __init__(self):
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+    def close(self):
+        pass
+
+class Instrument:
+    '''
+    A recorder of where the time of each level goes.
+
+    A driver opens a level with level(k) and times each
+    of its phases, such as candidate generation or
+    counting, with phase(name). Counters of the level,
+    such as the candidates generated or the transactions
+    removed, are added with add. When the level ends, its
+    record is passed to every sink. A record holds the
+    driver, k, the wall time of the level, the seconds of
+    each phase, the counters and the peak resident set
+    size so far.
+
+    When profile_level is given, that level alone runs
+    under cProfile and its statistics are dumped to
+    profile_file, which can be opened with snakeviz.
+
+    ATTRIBUTES
+        driver (str): The name of the mining script.
+        sinks (list): The sinks given every level record.
+        profile_level (int): The level to profile, or None.
+        profile_file (str): The profile output file, with '{k}' standing for the level.
+        record (dict): The record of the level in progress.
+    '''
+
+    enabled = True
+
+    def __init__(self, driver, sinks, profile_level=None, profile_file=DEFAULT_PROFILE_FILE):
+        '''
+        ARGUMENTS
+            driver (str): The name of the mining script.
+            sinks (list): The sinks given every level record.
+            profile_level (int): The level to profile. (Default=None)
+            profile_file (str): The profile output file, with '{k}' standing for the level. (Default='level_{k}.prof')
+        '''
+        self.driver = driver
+        self.sinks = sinks
+        self.profile_level = profile_level
+        self.profile_file = profile_file
+        self.record = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @contextmanager
+    def level(self, k):
+        '''
+        This method records one level of the mining run.
+
+        ARGUMENTS
+            k (int): The size of the patterns of the level.
+        '''
+        self.record = {'driver':self.driver, 'k':k, 'phases':{}, 'counters':{}}
+        profile = cProfile.Profile() if k == self.profile_level else None
+        begin = perf_counter()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield self.record
+        finally:
+            if profile is not None:
+                profile.disable()
+                profile.dump_stats(self.profile_file.format(k=k))
+                print(ctime(), f'Wrote the profile of k={k} to {self.profile_file.format(k=k)}.')
+            self.record['wall_time'] = perf_counter() - begin
+            self.record['peak_rss_kib'] = peak_rss()
+            for sink in self.sinks:
+                sink.emit(self.record)
+
+    @contextmanager
+    def phase(self, name):
+        '''
+        This method adds the time spent in a phase of the
+        current level to its record.
+
+        ARGUMENTS
+            name (str): The name of the phase.
+        '''
+        phases = self.record['phases']
+        begin = perf_counter()
+        try:
+            yield
+        finally:
+            phases[name] = phases.get(name, 0.0) + perf_counter() - begin
+
+    def add(self, **counters):
+        '''
+        This method adds to the counters of the current level.
+
+        ARGUMENTS
+            counters (int): The amount to add to each named counter.
+
+        RETURNS
+            None
+        '''
+        total = self.record['counters']
+        for name, n in counters.items():
+            total[name] = total.get(name, 0) + n
+
+    def close(self):
+        '''
+        This method closes every sink.
+
+        RETURNS
+            None
+        '''
+        for sink in self.sinks:
+            sink.close()
+
+class NullInstrument:
+    '''
+    The instrument of a run that is not recorded. Every
+    method does nothing, so the drivers may call them
+    unconditionally at no measurable cost.
+    '''
+
+    enabled = False
+    _context = nullcontext()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def level(self, k):
+        return self._context
+
+    def phase(self, name):
+        return self._context
+
+    def add(self, **counters):
+        pass
+
+    def close(self):
+        pass
+
+NULL_INSTRUMENT = NullInstrument()
+
+def open_instrument(driver, stats_file=None, profile_level=None, profile_file=DEFAULT_PROFILE_FILE):
+    '''
+    ARGUMENTS
+        driver (str): The name of the mining script.
+        stats_file (str): A JSON Lines file to append the level records to. (Default=None)
+        profile_level (int): The level to profile. (Default=None)
+        profile_file (str): The profile output file, with '{k}' standing for the level. (Default='level_{k}.prof')
+
+    RETURNS
+        (Instrument/NullInstrument): An instrument, or NULL_INSTRUMENT when nothing is to be recorded.
+    '''
+    if stats_file is None and profile_level is None:
+        return NULL_INSTRUMENT
+    sinks = [] if stats_file is None else [JsonLinesSink(stats_file)]
+    return Instrument(driver, sinks, profile_level, profile_file)
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+#-*- coding:utf-8 - *-
+
+"""
+This module holds the itemset machinery shared by the 'apriori' frequent patten mining scripts.
+
+GNU General Public License v3.0
+Permissions of this strong copyleft license are conditioned on making available complete source code of licensed works and modifications,
+which include larger works using a licensed work, under the same license.
+Copyright and license notices must be preserved.
+Contributors provide an express grant of patent rights.
+
+Reference Materials:
+[1] Agrawal, R. and Srikant, R. (1994) Fast Algorithms for Mining Association Rules.
+[2] Bodon, F. (2003) A fast APRIORI implementation.
+[3] Leskovec, J., Rajaraman, A. and Ullman, J. (2014) Mining of Massive Datasets, Section 6.2.
+"""
+
+from array import array
+from collections import Counter
+
+__author__ = 'Galen Seilis'
+__copyright__ = 'Copyright 2020, Assignment 1, CPSC-673-A1'
+__credits__ = ['Galen Seilis', 'Fan Jiang (Instructor)']
+__license__ = 'GNU General Public License v3.0'
+__version__ = '0.1.0'
+__maintainer__ = 'Galen Seilis'
+__email__ = 'seilis@unbc.ca'
+__status__ = 'School Project'
+
+DEFAULT_TRIANGLE_CELLS = 2**25 # 128 MiB of 4-byte counts
+
+class CandidateTrie:
+    '''
+    A prefix trie over the sorted candidate itemsets
+    of a single level of the apriori algorithm.
+
+    Every candidate of size k is stored as a path of
+    k items in increasing order, and the last node of
+    each path holds the candidate itself. A transaction
+    is counted by walking only the branches whose items
+    it contains, so it never visits a candidate that
+    cannot be one of its subsets.
+
+    ATTRIBUTES
+        k (int): The size of every candidate in the trie.
+        root (dict): The root node of the trie.
+        counts (dict[frozenset[int]:int]): A count table of each candidate.
+    '''
+
+    def __init__(self, candidates):
+        '''
+        ARGUMENTS
+            candidates (dict[frozenset[int]]): Dictionary of candidates of equal size.
+        '''
+        self.counts = dict.fromkeys(candidates, 0)
+        self.k = len(next(iter(self.counts))) if self.counts else 0
+        self.root = {}
+        for candidate in self.counts:
+            items = sorted(candidate)
+            node = self.root
+            for item in items[:-1]:
+                node = node.setdefault(item, {})
+            node[items[-1]] = candidate
+
+    def __len__(self):
+        return len(self.counts)
+
+    def reset(self):
+        '''
+        This method sets the count of every candidate
+        back to zero so the trie can be reused.
+
+        RETURNS
+            None
+        '''
+        self.counts = dict.fromkeys(self.counts, 0)
+
+    def count(self, items, item_hits=None):
+        '''
+        This method adds one to the count of every
+        candidate that is a subset of the transaction.
+
+        ARGUMENTS
+            items (list[int]): The sorted items of the transaction.
+            item_hits (dict[int:int]): If given, counts how many contained candidates hold each item. (Default=None)
+
+        RETURNS
+            (int): The number of candidates contained in the transaction.
+        '''
+        if self.k == 0 or len(items) < self.k:
+            return 0
+        return self._walk(self.root, items, 0, 1, item_hits)
+
+    def _walk(self, node, items, start, depth, item_hits):
+        counts = self.counts
+        hits = 0
+        if depth == self.k:
+            for i in range(start, len(items)):
+                candidate = node.get(items[i])
+                if candidate is not None:
+                    counts[candidate] += 1
+                    hits += 1
+                    if item_hits is not None:
+                        for item in candidate:
+                            item_hits[item] = item_hits.get(item, 0) + 1
+            return hits
+        for i in range(start, len(items) - self.k + depth):
+            child = node.get(items[i])
+            if child is not None:
+                hits += self._walk(child, items, i + 1, depth + 1, item_hits)
+        return hits
+
+    def frequent(self, epsilon):
+        '''
+        ARGUMENTS
+            epsilon (float/int): Absolute minimum support threshold.
+
+        RETURNS
+            (dict): A count table of each candidate meeting the threshold.
+        '''
+        return {k:v for (k,v) in self.counts.items() if v >= epsilon}
+
+class PairCounter:
+    '''
+    A direct counter of item pairs for the k=2 level.
+
+    The items are recoded to dense ids 0..n-1 and the
+    count of the pair (i, j) with i < j is kept in a flat
+    triangular array at i*(2n-i-1)/2 + j-i-1, so counting
+    a transaction only enumerates the pairs of its items.
+    When the triangle would exceed max_cells counts, a
+    sparse hash count of the pairs seen is used instead.
+
+    ATTRIBUTES
+        index (dict[int:int]): The dense id of each item.
+        dense (bool): Whether the triangular array is used.
+        counts (array[int]/Counter): The triangular array or the sparse count.
+    '''
+
+    def __init__(self, items, max_cells=DEFAULT_TRIANGLE_CELLS):
+        '''
+        ARGUMENTS
+            items (iterable[int]): The items whose pairs are counted.
+            max_cells (int): The largest triangle to allocate. (Default=2**25)
+        '''
+        self.index = {item:i for (i, item) in enumerate(sorted(items))}
+        n = len(self.index)
+        cells = n * (n - 1) // 2
+        self.dense = cells <= max_cells
+        self._bases = [i * (2 * n - i - 1) // 2 - i - 1 for i in range(n)]
+        self.reset()
+
+    def reset(self):
+        '''
+        This method sets every pair count back to zero.
+
+        RETURNS
+            None
+        '''
+        n = len(self.index)
+        self.counts = array('I', bytes(4 * (n * (n - 1) // 2))) if self.dense else Counter()
+
+    def count(self, t_set):
+        '''
+        This method adds one to the count of every pair
+        of counted items in the transaction.
+
+        ARGUMENTS
+            t_set (set[int]): The items of the transaction.
+
+        RETURNS
+            (int): The number of pairs counted in the transaction.
+        '''
+        index = self.index
+        ids = sorted(index[item] for item in t_set if item in index)
+        counts = self.counts
+        bases = self._bases
+        if self.dense:
+            for x, i in enumerate(ids):
+                base = bases[i]
+                for j in ids[x+1:]:
+                    counts[base + j] += 1
+        else:
+            n = len(index)
+            for x, i in enumerate(ids):
+                for j in ids[x+1:]:
+                    counts[i * n + j] += 1
+        return len(ids) * (len(ids) - 1) // 2
+
+    def support(self, a, b):
+        '''
+        ARGUMENTS
+            a (int): An item.
+            b (int): Another item.
+
+        RETURNS
+            (int): The count of the pair.
+        '''
+        i, j = sorted((self.index[a], self.index[b]))
+        if self.dense:
+            return self.counts[self._bases[i] + j]
+        return self.counts[i * len(self.index) + j]
+
+    def frequent(self, candidates, epsilon):
+        '''
+        ARGUMENTS
+            candidates (dict[frozenset[int]]): Dictionary of candidates of size 2.
+            epsilon (float/int): Absolute minimum support threshold.
+
+        RETURNS
+            (dict): A count table of each candidate meeting the threshold.
+        '''
+        l = {}
+        for candidate in candidates:
+            support = self.support(*candidate)
+            if support >= epsilon:
+                l[candidate] = support
+        return l
+
+def apriori_gen(l, k):
+    '''
+    This function constructs the candidate itemsets of
+    size k from the previous L table with the classic
+    Apriori-gen join and prune steps.
+
+    The join step sorts the itemsets of L_{k-1} and only
+    joins pairs which share their first k-2 items. The
+    prune step drops every joined itemset that has a
+    (k-1)-subset missing from L_{k-1}, since such an
+    itemset cannot be frequent.
+
+    ARGUMENTS
+        l (dict): The previous L table.
+        k (int): The size of the itemsets. Also the iteration number.
+
+    RETURNS
+        candidates (dict): A table of the candidates for the next iteration of
+                           the apriori algorithm.
+        pruned (int): The number of joined itemsets removed by the prune step.
+    '''
+    if k == 2:
+        items = sorted(l)
+        candidates = {frozenset((a, b)):0 for i, a in enumerate(items) for b in items[i+1:]}
+        return candidates, 0
+    index = set(l)
+    itemsets = sorted(tuple(sorted(itemset)) for itemset in l)
+    candidates = {}
+    pruned = 0
+    i = 0
+    while i < len(itemsets):
+        prefix = itemsets[i][:-1]
+        j = i + 1
+        while j < len(itemsets) and itemsets[j][:-1] == prefix:
+            j += 1
+        block = itemsets[i:j]
+        for a, x in enumerate(block):
+            for y in block[a+1:]:
+                joined = x + y[-1:]
+                # The subsets dropping either of the last two items are x and y.
+                if all(frozenset(joined[:m] + joined[m+1:]) in index for m in range(k - 2)):
+                    candidates[frozenset(joined)] = 0
+                else:
+                    pruned += 1
+        i = j
+    return candidates, pruned
+
+def pair_bucket(a, b, n_buckets):
+    '''
+    ARGUMENTS
+        a (int): The smaller item of the pair.
+        b (int): The larger item of the pair.
+        n_buckets (int): The size of the bucket table.
+
+    RETURNS
+        (int): The bucket of the pair.
+    '''
+    return ((a * 0x9E3779B1) ^ b) % n_buckets
+
+def hash_pairs(t_set, buckets):
+    '''
+    This function adds one to the bucket of every item
+    pair of a transaction, as in the first pass of DHP.
+
+    ARGUMENTS
+        t_set (set[int]): The items of the transaction.
+        buckets (array[int]): The bucket count table to add to.
+
+    RETURNS
+        None
+    '''
+    n_buckets = len(buckets)
+    items = sorted(t_set)
+    for i, a in enumerate(items):
+        h = a * 0x9E3779B1
+        for b in items[i+1:]:
+            buckets[(h ^ b) % n_buckets] += 1
+
+def hash_filter(candidates, buckets, epsilon):
+    '''
+    This function drops every candidate pair whose bucket
+    count is below the threshold. The count of a bucket
+    is at least the support of every pair hashed to it,
+    so no frequent pair is dropped.
+
+    ARGUMENTS
+        candidates (dict[frozenset[int]]): Dictionary of candidates of size 2.
+        buckets (array[int]): The bucket count table filled by first_scan.
+        epsilon (float/int): Absolute minimum support threshold.
+
+    RETURNS
+        candidates (dict): The candidates in a frequent bucket.
+        pruned (int): The number of candidates dropped.
+    '''
+    n_buckets = len(buckets)
+    kept = {}
+    for candidate in candidates:
+        a, b = sorted(candidate)
+        if buckets[pair_bucket(a, b, n_buckets)] >= epsilon:
+            kept[candidate] = 0
+    return kept, len(candidates) - len(kept)
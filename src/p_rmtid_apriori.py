@@ -18,11 +18,23 @@ Reference Materials:
 """
 
 import argparse
-from collections import Counter, ChainMap
+from array import array
+from collections import Counter
 from itertools import product
 import os
-from time import ctime
-from multiprocessing import Pool
+import pickle
+import struct
+from time import ctime, perf_counter
+from multiprocessing import Barrier, Pool
+from multiprocessing.shared_memory import SharedMemory
+
+from instrument import DEFAULT_PROFILE_FILE, NULL_INSTRUMENT, open_instrument
+from itemsets import CandidateTrie, PairCounter, apriori_gen, hash_filter, hash_pairs
+from parallel_scan import load_store
+from result_writer import FORMATS, open_writer
+from rules import mine_rules
+from transaction_reader import TransactionReader
+from transaction_store import TransactionStore, is_binary
 
 __author__ = 'Galen Seilis'
 __copyright__ = 'Copyright 2020, Assignment 1, CPSC-673-A1'
@@ -44,7 +56,8 @@ def get_db_size(file_name):
     algorithm.
 
     Make sure that the first line of the transaction
-    database is suitable for this purpose.
+    database is suitable for this purpose. Binary
+    databases written by convert.py are also accepted.
 
     ARGUMENTS
         file_name (str): The name of the transaction database file.
@@ -52,6 +65,8 @@ def get_db_size(file_name):
     RETURNS
         (int): Number of transactions in transaction database.
     '''
+    if is_binary(file_name):
+        return len(TransactionStore.from_binary(file_name))
     with open(file_name) as f:
         return int(f.readline().rstrip())
 
@@ -74,34 +89,66 @@ def clean_line(line):
     t_set = frozenset([int(i) for i in t_set.split(' ')])
     return t_id, t_n, t_set
 
-def first_scan(file_name, epsilon):
+def first_scan(file_name, epsilon, buckets=None):
     '''
     This function perfoms the first database scan
     for the apriori frequent pattern mining algorithm.
 
-    Compared to the function later_scan, first_scan will
-    assume that all items are candidates while later_scan
+    Compared to the function count_chunk, first_scan will
+    assume that all items are candidates while count_chunk
     will assume that the candidates are provided.
 
+    When given a TransactionStore, the transactions are
+    located by their row in the store rather than by
+    their byte offsets in the file, and the item counts
+    of a binary database are used as they are.
+
+    When given a TransactionReader, the byte offsets come
+    from its sidecar index and are only rebuilt when it
+    is stale.
+
     ARGUMENTS
-        file_name (str): The name of the transaction database file.
+        file_name (str/TransactionReader/TransactionStore): The name of the transaction database file.
         epsilon (float/int): Absolute minimum support threshold.
+        buckets (array[int]): If given, the DHP bucket table to hash every item pair into. (Default=None)
 
     RETURNS
         (dict): A count table of each item in the database.
     '''
     L1_counter = Counter()
     transactions = {}
-    with open(file_name) as file:
+    if isinstance(file_name, TransactionStore) and file_name.frequencies is not None and buckets is None:
+        transactions = {t_id:row for (row, t_id) in enumerate(file_name.tids)}
+        L1_counter = {k:v for (k,v) in file_name.frequencies.items() if v >= epsilon}
+        return L1_counter, transactions
+    if isinstance(file_name, TransactionStore):
+        for row, (t_id, t_n, t_set) in enumerate(file_name):
+            transactions[t_id] = row
+            L1_counter.update(t_set)
+            if buckets is not None:
+                hash_pairs(t_set, buckets)
+        L1_counter = {k:v for (k,v) in L1_counter.items() if v >= epsilon}
+        return L1_counter, transactions
+    if isinstance(file_name, TransactionReader):
+        transactions = file_name.offsets()
+        for (start, stop) in transactions.values():
+            t_id, t_n, t_set = clean_line(file_name.read(start, stop))
+            L1_counter.update(t_set)
+            if buckets is not None:
+                hash_pairs(t_set, buckets)
+        L1_counter = {k:v for (k,v) in L1_counter.items() if v >= epsilon}
+        return L1_counter, transactions
+    # The file is read as bytes so that the offsets hold for any line ending and encoding.
+    with open(file_name, 'rb') as file:
         offset = 0
         for i, line in enumerate(file):
             if i != 0:
-                t_id, t_n, t_set = clean_line(line)
+                t_id, t_n, t_set = clean_line(line.decode())
                 transactions[t_id] = (offset, offset + len(line))
-                offset += len(line) + 1
-                L1_counter += Counter(t_set)
-            else:
-                offset += len(line) + 1
+                L1_counter.update(t_set)
+                if buckets is not None:
+                    hash_pairs(t_set, buckets)
+            offset += len(line)
     L1_counter = {k:v for (k,v) in L1_counter.items() if v >= epsilon}
     return L1_counter, transactions
 
@@ -119,11 +166,9 @@ def read_transaction(file_name, start, stop):
     RETURNS
         line (str): String representation of transaction.
     '''
-    file = open(file_name)
-    file.seek(start)
-    line = file.read(stop - start)
-    file.close()
-    return line
+    with open(file_name, 'rb') as file:
+        file.seek(start)
+        return file.read(stop - start).decode()
 
 def candidate_generation(l, k):
     '''
@@ -131,6 +176,10 @@ def candidate_generation(l, k):
     to construct all the candidate itemsets for
     the next C table.
 
+    This is the reference implementation which unions
+    every pair of itemsets and does not prune. The
+    apriori function uses itemsets.apriori_gen instead.
+
     ARGUMENTS
         l (dict): The previous L table.
         k (int): The size of the itemsets. Also the iteration number.
@@ -158,107 +207,346 @@ def candidate_generation(l, k):
                 continue
     return candidates
 
-def later_scan(file_name, candidates, transactions, epsilon):
+# Per-process state of the persistent pool workers, set by init_worker.
+_worker = {}
+
+def share_store(store):
     '''
-    This function perfoms later database scans
-    for the apriori frequent pattern mining algorithm.
+    This function copies the arrays of a TransactionStore
+    into shared memory blocks so that every worker of the
+    pool can read them without a copy of its own.
 
-    Compared to first_scan, later_scan will take a table of
-    candidates as input while first_scan will assume that all
-    items are candidates.
+    ARGUMENTS
+        store (TransactionStore): The parsed transaction database.
 
+    RETURNS
+        blocks (list[SharedMemory]): The shared memory blocks, to be released by the caller.
+        spec (list[tuple[str, str, int]]): The (name, typecode, length) of each block.
+    '''
+    blocks = []
+    spec = []
+    for typecode, values in (('q', store.tids), ('I', store.items), ('Q', store.offsets)):
+        data = array(typecode, values).tobytes()
+        block = SharedMemory(create=True, size=max(len(data), 1))
+        block.buf[:len(data)] = data
+        blocks.append(block)
+        spec.append((block.name, typecode, len(values)))
+    return blocks, spec
+
+def attach(name, typecode, length):
+    '''
     ARGUMENTS
-        file_name (str): The name of the transaction database file.
-        candidates (dict[frozenset[int]]: Dictionary of candidates for next iteration.
-        transactions (dict[int:tuple[int, int]]: Dictionary of transactions still being considered.
-        epsilon (float/int): Absolute minimum support threshold.
+        name (str): The name of a shared memory block.
+        typecode (str): The array typecode of its values.
+        length (int): The number of values in the block.
 
     RETURNS
-        (dict): A count table of each given candidate in the database.
+        block (SharedMemory): The attached block.
+        view (memoryview): The values of the block.
     '''
-    l = candidates.copy()
-    trans = transactions.copy()
-    for t_id, (start, stop) in transactions.items():
-        useful = False
-        t_id, t_n, t_set = clean_line(read_transaction(file_name, start, stop))
-        for candidate in candidates.keys():
-            if candidate.issubset(t_set):
-                useful = True
-                l[candidate] += 1
-        if not useful:
-            del trans[t_id]
-    return l, trans
-    
-    
+    block = SharedMemory(name=name)
+    return block, block.buf[:length * struct.calcsize(typecode)].cast(typecode)
+
+def init_worker(source, spec, alive_name, barrier):
+    '''
+    This function runs once in every worker of the pool
+    and attaches it to the shared transaction database.
+
+    ARGUMENTS
+        source (str): The binary database to map, or None to use spec.
+        spec (list[tuple[str, str, int]]): The shared memory blocks of the database.
+        alive_name (str): The shared memory block flagging transactions still considered.
+        barrier (Barrier): Holds each worker in flush_level until every worker has taken one flush.
+
+    RETURNS
+        None
+    '''
+    blocks = []
+    if source is not None:
+        store = TransactionStore.from_binary(source)
+    else:
+        views = []
+        for name, typecode, length in spec:
+            block, view = attach(name, typecode, length)
+            blocks.append(block)
+            views.append(view)
+        store = TransactionStore(*views)
+    alive = SharedMemory(name=alive_name)
+    blocks.append(alive)
+    _worker.update(store=store, alive=alive.buf, blocks=blocks, barrier=barrier, level=None)
+
+def count_chunk(level, k, n_candidates, start, stop):
+    '''
+    This function counts the candidates of a level over
+    a range of rows of the shared transaction database in
+    a pool worker. Transactions that contain no candidate
+    are flagged as removed in the shared alive block.
+
+    The candidates are read from the shared memory block
+    of the level once per worker rather than being sent
+    with every chunk. Pairs are counted with a PairCounter
+    and longer candidates with a CandidateTrie. The counter
+    is built once per worker and level and keeps counting
+    over every chunk the worker is given, so a chunk never
+    touches the whole table of candidates. The counts are
+    collected once per level with flush_level.
+
+    ARGUMENTS
+        level (str): The shared memory block holding the sorted candidates of the level.
+        k (int): The size of the candidates.
+        n_candidates (int): The number of candidates.
+        start (int): The first row of the chunk.
+        stop (int): The row after the last row of the chunk.
+
+    RETURNS
+        removed (int): The number of transactions removed from consideration.
+        hits (int): The number of candidates found in the transactions.
+        seconds (float): The time spent counting.
+    '''
+    if _worker['level'] != level:
+        block, flat = attach(level, 'I', k * n_candidates)
+        flat = array('I', flat)
+        block.close()
+        if k == 2:
+            # Pairs are looked up by their items, so no frozenset is built.
+            candidates = flat
+            counter = PairCounter(set(flat))
+        else:
+            candidates = [frozenset(flat[i:i + k]) for i in range(0, len(flat), k)]
+            counter = CandidateTrie(candidates)
+        _worker.update(level=level, k=k, candidates=candidates, counter=counter)
+    begin = perf_counter()
+    counter = _worker['counter']
+    store = _worker['store']
+    alive = _worker['alive']
+    offsets, items = store.offsets, store.items
+    removed = hits = 0
+    for row in range(start, stop):
+        if alive[row]:
+            found = counter.count(items[offsets[row]:offsets[row + 1]])
+            if not found:
+                alive[row] = 0
+                removed += 1
+            hits += found
+    return removed, hits, perf_counter() - begin
+
+def flush_level(level):
+    '''
+    This function returns the counts a worker gathered
+    over all of its chunks of a level. The driver sends
+    one flush per worker, and the barrier keeps a worker
+    from taking a second one, so every worker flushes
+    exactly once. The counter of the level is dropped
+    once its counts are read.
+
+    ARGUMENTS
+        level (str): The shared memory block name of the level.
+
+    RETURNS
+        (bytes): The count of each candidate in order, as an array('I'), or nothing when the worker counted no chunk of the level.
+    '''
+    _worker['barrier'].wait()
+    if _worker['level'] != level:
+        return b''
+    counter = _worker['counter']
+    if _worker['k'] == 2:
+        flat = _worker['candidates']
+        counts = array('I', (counter.support(flat[i], flat[i + 1]) for i in range(0, len(flat), 2)))
+    else:
+        counts = array('I', (counter.counts[c] for c in _worker['candidates']))
+    # The triangle of pairs can take 128 MiB, so it is not held into the next level.
+    _worker.update(level=None, candidates=None, counter=None)
+    return counts.tobytes()
+
+def count_task(args):
+    '''
+    This function unpacks the arguments of count_chunk
+    for Pool.imap_unordered and tags the result with the
+    worker that produced it.
 
-def apriori(file_name, epsilon, processors=len(os.sched_getaffinity(0))):
+    ARGUMENTS
+        args (tuple): The arguments of count_chunk.
+
+    RETURNS
+        (tuple): The result of count_chunk followed by the worker's process id.
+    '''
+    return count_chunk(*args) + (os.getpid(),)
+
+def schedule_chunks(offsets, alive, n_chunks):
+    '''
+    This function splits the transactions still being
+    considered into contiguous row ranges of roughly equal
+    counting cost, taking the cost of a transaction to be
+    its number of items. Removed transactions cost nothing.
+
+    ARGUMENTS
+        offsets (array[int]): The offsets of the transaction store.
+        alive (memoryview): The flag of each transaction still being considered.
+        n_chunks (int): The number of chunks to aim for.
+
+    RETURNS
+        (list[tuple[int, int]]): The (start, stop) rows of each chunk.
+    '''
+    n = len(offsets) - 1
+    total = sum(offsets[row + 1] - offsets[row] for row in range(n) if alive[row])
+    target = max(total / max(n_chunks, 1), 1)
+    chunks = []
+    start = 0
+    cost = 0
+    for row in range(n):
+        if alive[row]:
+            cost += offsets[row + 1] - offsets[row]
+            if cost >= target:
+                chunks.append((start, row + 1))
+                start = row + 1
+                cost = 0
+    if cost:
+        chunks.append((start, n))
+    return chunks
+
+def apriori(file_name, epsilon, processors=len(os.sched_getaffinity(0)), chunks_per_processor=8, n_buckets=0, writer=None, instrument=NULL_INSTRUMENT):
     '''
     This function performs the parallel modified Apriori frequent pattern
     mining algorithm.
 
+    The transactions are parsed once, in parallel byte
+    ranges of the input, and placed in shared
+    memory, and a single pool of workers attached to it
+    counts every level. Each level only sends the workers
+    its candidates, through one more shared memory block,
+    and the row ranges to count. The ranges are balanced by
+    the number of items left in them and handed out to idle
+    workers one at a time. Each worker keeps counting into
+    its own counter and sends its counts back once at the
+    end of the level.
+
     ARGUMENTS
         file_name (str): The input data file name of transactions.
         epsilon (float/int): Absolute minimum support threshold.
         processors (int): The number processors to be used. (Default=4)
+        chunks_per_processor (int): The number of cost-balanced chunks per processor on each level. (Default=8)
+        n_buckets (int): The size of the DHP bucket table used to filter pairs, or 0 to skip it. (Default=0)
+        writer (ResultWriter): If given, each level is written as soon as it is found and dropped once the next is. (Default=None)
+        instrument (Instrument): Records the phases and counters of each level. (Default=NULL_INSTRUMENT)
 
     RETURNS
-        L (dict[int:dict[frozenset[int]:int]]): Dictionary of all frequent patterns found by the algorithm.   
+        L (dict[int:dict[frozenset[int]:int]]): Dictionary of all frequent patterns found by the algorithm, or only the last level when a writer is given.
     '''
-    print(ctime(), 'Searching for k=1 frequent patterns.')
-    L1, trans = first_scan(file_name, epsilon)
-    L = {1:L1}
-    print(ctime(), f"P-RmTID found {len(L[1])} new frequent pattern(s).\n")
-    k = 2
-    while True:
-        candidates = candidate_generation(L[k-1], k)
-        if not candidates:
-            break
-        else:
-            print(ctime(), f'Searching for k={k} frequent patterns.')
-            with Pool(processors) as p:
-                trans_items = list(trans.items())
-                chunksize = round(get_db_size(file_name) / processors)
-                p_args = [(file_name, candidates, dict(trans_items[i:i + chunksize]), epsilon) for i in range(0, len(trans_items), chunksize)]
-                p_results = p.starmap(later_scan, p_args)
-            candidates = {key:value for (key, value) in sum([Counter(i[0]) for i in p_results], Counter()).items() if value >= epsilon}
-            trans = dict(ChainMap(*[i[1] for i in p_results]))
-            if not candidates:
-                print(ctime(), f"P-RmTID found {len(candidates)} new frequent pattern(s).\n")
-                break
-            else:
-                print(ctime(), f"P-RmTID found {len(candidates)} new frequent pattern(s).\n")
-                L[k] = candidates
-                k += 1
+    store = None
+    blocks = []
+    try:
+        with instrument.level(1):
+            with instrument.phase('load'):
+                if is_binary(file_name):
+                    print(ctime(), 'Mapping binary transactions into memory.')
+                    store = TransactionStore.from_binary(file_name)
+                    spec = []
+                else:
+                    print(ctime(), 'Loading transactions into shared memory.')
+                    store = load_store(file_name, processors)
+                    blocks, spec = share_store(store)
+                    print(ctime(), f'Shared {len(store)} transactions using {store.nbytes} bytes.\n')
+                n = len(store)
+                alive = SharedMemory(create=True, size=max(n, 1))
+                alive.buf[:n] = b'\x01' * n
+                blocks.append(alive)
+            print(ctime(), 'Searching for k=1 frequent patterns.')
+            buckets = array('Q', bytes(8 * n_buckets)) if n_buckets else None
+            with instrument.phase('count'):
+                L1, _ = first_scan(store, epsilon, buckets)
+            L = {1:L1}
+            instrument.add(scanned=n, frequent=len(L[1]))
+            if writer is not None:
+                with instrument.phase('write'):
+                    writer.write_level(1, L[1])
+            print(ctime(), f"P-RmTID found {len(L[1])} new frequent pattern(s).\n")
+        remaining = n
+        barrier = Barrier(processors)
+        with Pool(processors, initializer=init_worker, initargs=(store.source, spec, alive.name, barrier)) as p:
+            k = 2
+            while True:
+                with instrument.level(k):
+                    with instrument.phase('generate'):
+                        candidates, pruned = apriori_gen(L[k-1], k)
+                    instrument.add(generated=len(candidates) + pruned, pruned=pruned)
+                    if not candidates:
+                        break
+                    print(ctime(), f'Searching for k={k} frequent patterns.')
+                    print(ctime(), f'Pruned {pruned} candidate(s) with an infrequent subset.')
+                    if k == 2 and buckets is not None:
+                        with instrument.phase('filter'):
+                            candidates, hashed = hash_filter(candidates, buckets, epsilon)
+                        instrument.add(hash_pruned=hashed)
+                        print(ctime(), f'Pruned {hashed} of {hashed + len(candidates)} pair(s) ({hashed / max(hashed + len(candidates), 1):.1%}) in infrequent hash buckets.')
+                    instrument.add(counted=len(candidates), scanned=remaining)
+                    begin = perf_counter()
+                    with instrument.phase('share'):
+                        order = list(candidates)
+                        flat = array('I', (item for candidate in order for item in sorted(candidate)))
+                        level = SharedMemory(create=True, size=max(len(flat) * flat.itemsize, 1))
+                        level.buf[:len(flat) * flat.itemsize] = flat.tobytes()
+                    try:
+                        with instrument.phase('count'):
+                            chunks = schedule_chunks(store.offsets, alive.buf, processors * chunks_per_processor)
+                            p_args = [(level.name, k, len(order), start, stop) for (start, stop) in chunks]
+                            p_results = list(p.imap_unordered(count_task, p_args))
+                            flushes = p.map(flush_level, [level.name] * processors, chunksize=1)
+                    finally:
+                        level.close()
+                        level.unlink()
+                    with instrument.phase('merge'):
+                        totals = array('Q', bytes(8 * len(order)))
+                        busy = Counter()
+                        for counts in flushes:
+                            for i, c in enumerate(array('I', counts)):
+                                totals[i] += c
+                        for removed, hits, seconds, pid in p_results:
+                            remaining -= removed
+                            busy[pid] += seconds
+                            instrument.add(removed=removed, subset_hits=hits)
+                        candidates = {key:value for (key, value) in zip(order, totals) if value >= epsilon}
+                    counting = sum(busy.values())
+                    elapsed = perf_counter() - begin
+                    ipc = sum(len(pickle.dumps(args)) for args in p_args) + sum(len(pickle.dumps(result)) for result in p_results) + sum(len(pickle.dumps(counts)) for counts in flushes)
+                    print(ctime(), f'Sent {ipc} IPC bytes and {len(flat) * flat.itemsize} shared candidate bytes; {remaining} transaction(s) remain.')
+                    print(ctime(), f'Spent {elapsed:.6f}s on the level, {max(elapsed - counting / processors, 0):.6f}s of it outside counting.')
+                    print(ctime(), f'Counted {len(p_args)} chunk(s) on {len(busy)} worker(s) busy for {min(busy.values(), default=0):.6f}s to {max(busy.values(), default=0):.6f}s.')
+                    instrument.add(frequent=len(candidates))
+                    if not candidates:
+                        print(ctime(), f"P-RmTID found {len(candidates)} new frequent pattern(s).\n")
+                        break
+                    else:
+                        print(ctime(), f"P-RmTID found {len(candidates)} new frequent pattern(s).\n")
+                        L[k] = candidates
+                        if writer is not None:
+                            with instrument.phase('write'):
+                                writer.write_level(k, candidates)
+                            del L[k-1]
+                        k += 1
+    finally:
+        del store
+        for block in blocks:
+            block.close()
+            block.unlink()
     return L
 
-def write_rules(file_out, rules):
+def write_rules(file_out, rules, fmt='text'):
     '''
     This function writes the discovered
-    frequent patterns into a text file.
+    frequent patterns into a file.
 
     ARGUMENTS
         file_out (str): The output file name of frequent patterns.
         rules (dict[int:dict[frozenset[int]:int]]): Dictionary of all frequent patterns found by the algorithm.
+        fmt (str): 'text', 'jsonl', or 'binary'. (Default='text')
 
     RETURNS
         None
     '''
-    with open(file_out, 'w') as file:
-        count = 0
-        lines = []
+    with open_writer(file_out, fmt) as writer:
         for (k, ruleset) in rules.items():
-            for (itemset, support) in ruleset.items():
-                count += 1
-                if isinstance(itemset, int):
-                    itemstr = str(itemset)
-                else:
-                    itemstr = str(set(itemset)).replace('{', '').replace('}', '')
-                line = f'{itemstr} : {support}\n'
-                lines.append(line)
-        file.write(f'|FPs| = {count}\n')
-        print(f'|FPs| = {count}\n')
-        for i, line in enumerate(lines):
-            file.write(line)
+            writer.write_level(k, ruleset)
+    print(f'|FPs| = {writer.count}\n')
 
 if '__main__' == __name__:
     # Prepare command line parser
@@ -272,15 +560,25 @@ if '__main__' == __name__:
     required = parser.add_argument_group('required arguments')
     required.add_argument("-i", "--in_file", type=str, required=True, help="Input data file.")
     parser.add_argument("-o", "--out_file", type=str, default="MiningResults.txt", help="Output results file. (default='MiningResults.txt')")
+    parser.add_argument("-f", "--format", type=str, choices=FORMATS, default='text', help="Output results format. Patterns are written as each level is found. (default='text')")
+    parser.add_argument("--min_conf", type=float, default=None, help="Minimum confidence of the association rules generated from the results, or unset to skip them. (default=None)")
+    parser.add_argument("--rules_file", type=str, default="AssociationRules.txt", help="Output association rules file. (default='AssociationRules.txt')")
     parser.add_argument("-m", "--min_supp", type=float, default=0.5, help="Minimum support threshold as a float between 0 and 1. (default=0.5)")
     parser.add_argument("-p", "--processors", type=int, default=len(os.sched_getaffinity(0)), help="The number of processors to be used in parallelized steps. (default=len(os.sched_getaffinity(0)))")
+    parser.add_argument("--buckets", type=int, default=0, help="Size of the DHP hash bucket table used to prune pairs before k=2 counting, or 0 to disable it. (default=0)")
+    parser.add_argument("--stats", type=str, default=None, help="JSON Lines file to append the phase timings and counters of each level to. (default=None)")
+    parser.add_argument("--profile_level", type=int, default=None, help="Level to run under cProfile. Only the parent process is profiled. (default=None)")
+    parser.add_argument("--profile_file", type=str, default=DEFAULT_PROFILE_FILE, help="Profile output file, where {k} is replaced by the level. (default='level_{k}.prof')")
     args = parser.parse_args()
     
     # Check validity of CLI arguments
     assert 0 <= args.min_supp <= 1
+    assert args.min_conf is None or 0 <= args.min_conf <= 1
     epsilon = args.min_supp * get_db_size(args.in_file)
     print(ctime(), 'Starting\n')
-    rules = apriori(args.in_file, epsilon, args.processors)
-    print(ctime(), 'Writing rules to file...')
-    write_rules(args.out_file, rules)
+    with open_instrument('p_rmtid_apriori', args.stats, args.profile_level, args.profile_file) as instrument, open_writer(args.out_file, args.format) as writer:
+        apriori(args.in_file, epsilon, args.processors, n_buckets=args.buckets, writer=writer, instrument=instrument)
+    print(f'|FPs| = {writer.count}\n')
+    if args.min_conf is not None:
+        mine_rules(args.out_file, args.rules_file, args.min_conf)
     print(ctime(), 'Finished\n')
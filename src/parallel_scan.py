@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+#-*- coding:utf-8 - *-
+
+"""
+This module holds a parallel first database scan for the 'apriori' frequent patten mining scripts.
+
+GNU General Public License v3.0
+Permissions of this strong copyleft license are conditioned on making available complete source code of licensed works and modifications,
+which include larger works using a licensed work, under the same license.
+Copyright and license notices must be preserved.
+Contributors provide an express grant of patent rights.
+
+Reference Materials:
+[1] https://docs.python.org/3/library/multiprocessing.html
+[2] Leskovec, J., Rajaraman, A. and Ullman, J. (2014) Mining of Massive Datasets, Section 2.2.
+"""
+
+from array import array
+from collections import Counter
+from multiprocessing import Pool
+import os
+
+from itemsets import hash_pairs
+from transaction_store import TransactionStore
+
+__author__ = 'Galen Seilis'
+__copyright__ = 'Copyright 2020, Assignment 1, CPSC-673-A1'
+__credits__ = ['Galen Seilis', 'Fan Jiang (Instructor)']
+__license__ = 'GNU General Public License v3.0'
+__version__ = '0.1.0'
+__maintainer__ = 'Galen Seilis'
+__email__ = 'seilis@unbc.ca'
+__status__ = 'School Project'
+
+def partition_file(file_name, n):
+    '''
+    This function splits the transactions of a database
+    file into n byte ranges that start and stop on line
+    boundaries, leaving out the header line.
+
+    ARGUMENTS
+        file_name (str): The name of the transaction database file.
+        n (int): The number of partitions.
+
+    RETURNS
+        (list[tuple[int, int]]): The (start, stop) byte range of each non-empty partition.
+    '''
+    size = os.path.getsize(file_name)
+    with open(file_name, 'rb') as f:
+        f.readline()
+        first = f.tell()
+        bounds = [first]
+        for i in range(1, n):
+            f.seek(max(first + (size - first) * i // n - 1, bounds[-1]))
+            f.readline()
+            bounds.append(min(f.tell(), size))
+    bounds.append(size)
+    return [(start, stop) for (start, stop) in zip(bounds, bounds[1:]) if start < stop]
+
+def read_range(file_name, start, stop):
+    '''
+    This generator yields each transaction in a byte
+    range of a transaction database file along with the
+    byte range of its line.
+
+    ARGUMENTS
+        file_name (str): The name of the transaction database file.
+        start (int): File byte index to start reading.
+        stop (int): File byte index to stop reading.
+
+    RETURNS
+        generator
+
+    YIELDS
+        (int, frozenset[int], int, int): The transaction identifier, its items, and the start and stop of its line.
+    '''
+    with open(file_name, 'rb') as f:
+        f.seek(start)
+        data = f.read(stop - start)
+    position = start
+    for line in data.split(b'\n'):
+        stripped = line.rstrip()
+        if stripped:
+            t_id, t_n, t_set = stripped.split(b'\t')
+            yield int(t_id), frozenset([int(i) for i in t_set.split(b' ')]), position, position + len(stripped)
+        position += len(line) + 1
+
+def count_range(file_name, start, stop, n_buckets=0, offsets=False):
+    '''
+    This function counts the items of the transactions
+    in one byte range of the database.
+
+    ARGUMENTS
+        file_name (str): The name of the transaction database file.
+        start (int): File byte index to start reading.
+        stop (int): File byte index to stop reading.
+        n_buckets (int): The size of the DHP bucket table to fill, or 0 to skip it. (Default=0)
+        offsets (bool): Also record the byte range of every transaction. (Default=False)
+
+    RETURNS
+        counter (Counter): The count of each item in the range.
+        buckets (array[int]): The partial DHP bucket table, or None.
+        tids (array[int]): The transaction identifiers, when offsets is set.
+        bounds (array[int]): The start and stop of each transaction, when offsets is set.
+    '''
+    counter = Counter()
+    buckets = array('Q', bytes(8 * n_buckets)) if n_buckets else None
+    tids = array('q')
+    bounds = array('Q')
+    for t_id, t_set, line_start, line_stop in read_range(file_name, start, stop):
+        counter.update(t_set)
+        if buckets is not None:
+            hash_pairs(t_set, buckets)
+        if offsets:
+            tids.append(t_id)
+            bounds.append(line_start)
+            bounds.append(line_stop)
+    return counter, buckets, tids, bounds
+
+def parallel_first_scan(file_name, processors, buckets=None, offsets=False):
+    '''
+    This function counts the items of a transaction
+    database file in parallel. The file is split into
+    one newline-aligned byte range per processor, and
+    the partial counts, bucket tables and offset tables
+    of the ranges are merged in file order, giving the
+    same result as a serial scan.
+
+    ARGUMENTS
+        file_name (str): The name of the transaction database file.
+        processors (int): The number of processes to parse with.
+        buckets (array[int]): If given, the DHP bucket table to add every item pair to. (Default=None)
+        offsets (bool): Also return the byte range of every transaction. (Default=False)
+
+    RETURNS
+        counter (Counter): The count of each item in the database.
+        transactions (dict[int:tuple[int, int]]): The byte range of each transaction by id, when offsets is set.
+    '''
+    ranges = partition_file(file_name, processors)
+    n_buckets = len(buckets) if buckets is not None else 0
+    with Pool(processors) as p:
+        parts = p.starmap(count_range, [(file_name, start, stop, n_buckets, offsets) for (start, stop) in ranges])
+    counter = Counter()
+    transactions = {}
+    for part_counter, part_buckets, tids, bounds in parts:
+        counter.update(part_counter)
+        if buckets is not None:
+            for i, c in enumerate(part_buckets):
+                buckets[i] += c
+        for i, t_id in enumerate(tids):
+            transactions[t_id] = (bounds[2*i], bounds[2*i + 1])
+    return counter, transactions
+
+def parse_range(file_name, start, stop):
+    '''
+    ARGUMENTS
+        file_name (str): The name of the transaction database file.
+        start (int): File byte index to start reading.
+        stop (int): File byte index to stop reading.
+
+    RETURNS
+        (TransactionStore): The transactions of the range, with the count of each item.
+    '''
+    with open(file_name, 'rb') as f:
+        f.seek(start)
+        store = TransactionStore.from_lines(f.read(stop - start).decode().splitlines())
+    store.frequencies = Counter(store.items)
+    return store
+
+def load_store(file_name, processors):
+    '''
+    This function parses a transaction database file
+    into a TransactionStore in parallel, one newline-aligned
+    byte range per processor, and concatenates the parts
+    in file order. The count of every item is merged
+    along the way, so first_scan does not read the
+    transactions again.
+
+    ARGUMENTS
+        file_name (str): The name of the transaction database file.
+        processors (int): The number of processes to parse with.
+
+    RETURNS
+        (TransactionStore): The parsed transaction database.
+    '''
+    ranges = partition_file(file_name, processors)
+    with Pool(processors) as p:
+        parts = p.starmap(parse_range, [(file_name, start, stop) for (start, stop) in ranges])
+    tids = array('q')
+    items = array('I')
+    offsets = array('Q', [0])
+    frequencies = Counter()
+    for part in parts:
+        base = len(items)
+        tids.extend(part.tids)
+        items.extend(part.items)
+        offsets.extend(offset + base for offset in part.offsets[1:])
+        frequencies.update(part.frequencies)
+    return TransactionStore(tids, items, offsets, dict(frequencies))
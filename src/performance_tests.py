@@ -10,7 +10,7 @@ def testit(script, data, minconf, n=3):
 
 data_files = ['data.txt', '1k5L.txt', 't25i10d10k.txt', 'retail.txt', 'connect.txt']
 conf_ranges = [(0.01, 1), (0.01, 0.5), (0.01, 0.1), (0.3, 0.5), (0.9, 1)]
-programs = ['apriori.py', 'rmtid_apriori.py', 'p_rmtid_apriori.py']
+programs = ['apriori.py', 'rmtid_apriori.py', 'p_rmtid_apriori.py', 'fpgrowth.py']
 
 with open('performance_results.csv', 'w') as f:
     f.write('program,data_file,min_sup,run_time\n')
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+#-*- coding:utf-8 - *-
+
+"""
+This CLI tool generates synthetic transaction databases in the style of the IBM Quest generator for the 'apriori' frequent patten mining scripts.
+
+GNU General Public License v3.0
+Permissions of this strong copyleft license are conditioned on making available complete source code of licensed works and modifications,
+which include larger works using a licensed work, under the same license.
+Copyright and license notices must be preserved.
+Contributors provide an express grant of patent rights.
+
+Reference Materials:
+[1] Agrawal, R. and Srikant, R. (1994) Fast Algorithms for Mining Association Rules, Section 2.4.3.
+[2] https://docs.python.org/3/library/random.html
+"""
+
+import argparse
+from bisect import bisect_left
+import math
+import random
+import re
+from time import ctime
+
+__author__ = 'Galen Seilis'
+__copyright__ = 'Copyright 2020, Assignment 1, CPSC-673-A1'
+__credits__ = ['Galen Seilis', 'Fan Jiang (Instructor)']
+__license__ = 'GNU General Public License v3.0'
+__version__ = '0.1.0'
+__maintainer__ = 'Galen Seilis'
+__email__ = 'seilis@unbc.ca'
+__status__ = 'School Project'
+
+DEFAULT_ITEMS = 1000
+DEFAULT_PATTERNS = 2000
+CORRELATION = 0.5
+CORRUPTION_MEAN = 0.5
+CORRUPTION_VARIANCE = 0.1
+
+def poisson(rng, lam):
+    '''
+    ARGUMENTS
+        rng (random.Random): The random number generator.
+        lam (float): The mean of the distribution.
+
+    RETURNS
+        (int): A Poisson distributed number, using a normal approximation for large means.
+    '''
+    if lam > 30:
+        return max(0, round(rng.gauss(lam, math.sqrt(lam))))
+    limit = math.exp(-lam)
+    k = 0
+    p = rng.random()
+    while p > limit:
+        k += 1
+        p *= rng.random()
+    return k
+
+def parse_name(name):
+    '''
+    This function reads the parameters of a dataset from
+    its conventional name, such as 'T10I4D100K'. The number
+    of items and of patterns may follow as 'N' and 'L'.
+
+    ARGUMENTS
+        name (str): The name of the dataset.
+
+    RETURNS
+        (dict[str:int]): The 'T', 'I', 'D', 'N' and 'L' parameters.
+    '''
+    match = re.fullmatch(r'T(\d+)I(\d+)D(\d+)(K?)(?:N(\d+)(K?))?(?:L(\d+))?', name)
+    if match is None:
+        raise ValueError(f"{name} is not a dataset name such as 'T10I4D100K' or 'T10I4D1KN100'.")
+    t, i, d, d_k, n, n_k, l = match.groups()
+    return {'T':int(t), 'I':int(i), 'D':int(d) * (1000 if d_k else 1),
+            'N':int(n) * (1000 if n_k else 1) if n else DEFAULT_ITEMS, 'L':int(l) if l else DEFAULT_PATTERNS}
+
+def potential_patterns(rng, I, N, L):
+    '''
+    This function draws the potentially large itemsets.
+    Their sizes are Poisson distributed around I, and each
+    one takes an exponentially distributed fraction of its
+    items from the previous one to model shared items.
+    Each has an exponentially distributed weight and a
+    normally distributed corruption level.
+
+    ARGUMENTS
+        rng (random.Random): The random number generator.
+        I (int): The mean size of the patterns.
+        N (int): The number of items.
+        L (int): The number of patterns.
+
+    RETURNS
+        patterns (list[list[int]]): The items of each pattern.
+        weights (list[float]): The cumulative weight of the patterns, summing to 1.
+        corruption (list[float]): The corruption level of each pattern.
+    '''
+    patterns = []
+    previous = []
+    for l in range(L):
+        size = min(max(poisson(rng, I), 1), N)
+        shared = min(round(rng.expovariate(1 / CORRELATION) * size), size, len(previous))
+        pattern = set(rng.sample(previous, shared))
+        while len(pattern) < size:
+            pattern.add(rng.randrange(N))
+        previous = sorted(pattern)
+        patterns.append(previous)
+    weights = [rng.expovariate(1) for l in range(L)]
+    total = sum(weights)
+    cumulative = []
+    running = 0.0
+    for w in weights:
+        running += w / total
+        cumulative.append(running)
+    corruption = [min(max(rng.gauss(CORRUPTION_MEAN, math.sqrt(CORRUPTION_VARIANCE)), 0), 1) for l in range(L)]
+    return patterns, cumulative, corruption
+
+def generate(T, I, D, N=DEFAULT_ITEMS, L=DEFAULT_PATTERNS, seed=0):
+    '''
+    This generator yields the transactions of a synthetic
+    database. Each transaction has a Poisson distributed
+    size around T and is filled with weighted picks of the
+    potentially large itemsets, each of which drops items
+    while a uniform draw stays under its corruption level.
+    A pattern that overflows the transaction is added
+    anyway half of the time, and otherwise starts the
+    next transaction.
+
+    ARGUMENTS
+        T (int): The mean size of the transactions.
+        I (int): The mean size of the potentially large itemsets.
+        D (int): The number of transactions.
+        N (int): The number of items. (Default=1000)
+        L (int): The number of potentially large itemsets. (Default=2000)
+        seed (int): The seed of the random number generator. (Default=0)
+
+    RETURNS
+        generator
+
+    YIELDS
+        (list[int]): The sorted items of each transaction.
+    '''
+    rng = random.Random(seed)
+    patterns, cumulative, corruption = potential_patterns(rng, I, N, L)
+    reachable = len(set().union(*patterns))
+    carried = None
+    for d in range(D):
+        size = min(max(poisson(rng, T), 1), reachable)
+        transaction = set()
+        while len(transaction) < size:
+            if carried is not None:
+                pattern, carried = carried, None
+            else:
+                l = min(bisect_left(cumulative, rng.random()), L - 1)
+                pattern = list(patterns[l])
+                while pattern and rng.random() < corruption[l]:
+                    pattern.pop(rng.randrange(len(pattern)))
+            if len(transaction) + len(pattern) > size and transaction and rng.random() < 0.5:
+                carried = pattern
+                break
+            transaction.update(pattern)
+        yield sorted(transaction)
+
+def write_dataset(file_out, T, I, D, N=DEFAULT_ITEMS, L=DEFAULT_PATTERNS, seed=0):
+    '''
+    This function writes a synthetic database in the
+    text format read by the mining scripts.
+
+    ARGUMENTS
+        file_out (str): The output transaction database file.
+        T (int): The mean size of the transactions.
+        I (int): The mean size of the potentially large itemsets.
+        D (int): The number of transactions.
+        N (int): The number of items. (Default=1000)
+        L (int): The number of potentially large itemsets. (Default=2000)
+        seed (int): The seed of the random number generator. (Default=0)
+
+    RETURNS
+        None
+    '''
+    with open(file_out, 'w') as f:
+        f.write(f'{D}\n')
+        for t_id, items in enumerate(generate(T, I, D, N, L, seed)):
+            f.write(f"{t_id}\t{len(items)}\t{' '.join(map(str, items))}\n")
+
+if '__main__' == __name__:
+    # Prepare command line parser
+    parser = argparse.ArgumentParser()
+    parser.description = '''A CLI that generates a synthetic transaction database in the style of the IBM Quest generator.
+    The parameters may be given by name, such as T10I4D100K, or one by one. The same parameters and seed always give the same database.'''
+    required = parser.add_argument_group('required arguments')
+    required.add_argument("-o", "--out_file", type=str, required=True, help="Output data file.")
+    parser.add_argument("-n", "--name", type=str, default=None, help="Dataset name such as T10I4D100K, optionally followed by N<items> and L<patterns>. (default=None)")
+    parser.add_argument("-T", type=int, default=10, help="Mean transaction size. (default=10)")
+    parser.add_argument("-I", type=int, default=4, help="Mean size of the potentially large itemsets. (default=4)")
+    parser.add_argument("-D", type=int, default=100000, help="Number of transactions. (default=100000)")
+    parser.add_argument("-N", type=int, default=DEFAULT_ITEMS, help="Number of items. (default=1000)")
+    parser.add_argument("-L", type=int, default=DEFAULT_PATTERNS, help="Number of potentially large itemsets. (default=2000)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random number generator. (default=0)")
+    args = parser.parse_args()
+
+    params = parse_name(args.name) if args.name else {'T':args.T, 'I':args.I, 'D':args.D, 'N':args.N, 'L':args.L}
+    print(ctime(), f"Generating {params['D']} transactions with T={params['T']}, I={params['I']}, N={params['N']}, L={params['L']}.")
+    write_dataset(args.out_file, seed=args.seed, **params)
+    print(ctime(), f'Wrote {args.out_file}.')
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+#-*- coding:utf-8 - *-
+
+"""
+This module holds streaming writers and a reader of the frequent pattern files of the 'apriori' frequent patten mining scripts.
+
+GNU General Public License v3.0
+Permissions of this strong copyleft license are conditioned on making available complete source code of licensed works and modifications,
+which include larger works using a licensed work, under the same license.
+Copyright and license notices must be preserved.
+Contributors provide an express grant of patent rights.
+
+Reference Materials:
+[1] https://jsonlines.org/
+[2] https://docs.python.org/3/library/array.html
+"""
+
+from abc import ABC, abstractmethod
+from array import array
+import json
+import os
+import shutil
+import struct
+import sys
+
+__author__ = 'Galen Seilis'
+__copyright__ = 'Copyright 2020, Assignment 1, CPSC-673-A1'
+__credits__ = ['Galen Seilis', 'Fan Jiang (Instructor)']
+__license__ = 'GNU General Public License v3.0'
+__version__ = '0.1.0'
+__maintainer__ = 'Galen Seilis'
+__email__ = 'seilis@unbc.ca'
+__status__ = 'School Project'
+
+FORMATS = ['text', 'jsonl', 'binary']
+BATCH_SIZE = 65536 # patterns formatted per write
+COUNT_WIDTH = 20 # digits reserved for the pattern count in the header
+COPY_SIZE = 2**20 # bytes copied at a time behind the text header
+
+RESULTS_MAGIC = b'FPRES001'
+RESULTS_HEADER = struct.Struct('<8s8sQ') # magic, byte order, patterns
+LEVEL_HEADER = struct.Struct('<QQ') # k, patterns
+
+def sorted_items(itemset):
+    '''
+    ARGUMENTS
+        itemset (int/frozenset[int]): A frequent item or itemset.
+
+    RETURNS
+        (list[int]): The sorted items of the itemset.
+    '''
+    return [itemset] if isinstance(itemset, int) else sorted(itemset)
+
+class ResultWriter(ABC):
+    '''
+    A writer that streams the frequent patterns of each
+    level to a file as soon as the level is found, so the
+    patterns of earlier levels need not be kept in memory.
+
+    The number of patterns is only known at the end, so
+    the header is written with room for it and patched
+    when the writer is closed. The text format keeps the
+    unpadded header of the original scripts instead.
+
+    Each format subclasses it with write_header and
+    write_batch. Use open_writer to get the writer of a
+    format.
+
+    ATTRIBUTES
+        file_out (str): The output file name of frequent patterns.
+        count (int): The number of patterns written so far.
+    '''
+
+    mode = 'w'
+
+    def __init__(self, file_out):
+        '''
+        ARGUMENTS
+            file_out (str): The output file name of frequent patterns.
+        '''
+        self.file_out = file_out
+        self.count = 0
+        self.file = open(file_out, self.mode)
+        self.write_header(0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @abstractmethod
+    def write_header(self, count):
+        '''
+        This method writes the header at the position of
+        the file, padded to the same size for any count
+        when close patches it in place.
+
+        ARGUMENTS
+            count (int): The number of patterns.
+
+        RETURNS
+            None
+        '''
+
+    @abstractmethod
+    def write_batch(self, k, batch):
+        '''
+        ARGUMENTS
+            k (int): The size of the patterns.
+            batch (list[tuple[frozenset[int]/int, int]]): The (pattern, support) of each pattern of the batch.
+
+        RETURNS
+            None
+        '''
+
+    def write_level(self, k, level):
+        '''
+        This method writes the patterns of one level in
+        batches and flushes them to the file.
+
+        ARGUMENTS
+            k (int): The size of the patterns.
+            level (dict[frozenset[int]/int:int]): A count table of each frequent pattern of size k.
+
+        RETURNS
+            None
+        '''
+        patterns = list(level.items())
+        for start in range(0, len(patterns), BATCH_SIZE):
+            self.write_batch(k, patterns[start:start + BATCH_SIZE])
+        self.count += len(patterns)
+        self.file.flush()
+
+    def close(self):
+        '''
+        This method patches the number of patterns into
+        the header and closes the file.
+
+        RETURNS
+            (int): The number of patterns written.
+        '''
+        if not self.file.closed:
+            self.file.seek(0)
+            self.write_header(self.count)
+            self.file.close()
+        return self.count
+
+class TextWriter(ResultWriter):
+    '''
+    The text format of write_rules: a '|FPs| = N' header
+    followed by one 'items : support' line per pattern.
+
+    The header is not padded, so it cannot be patched in
+    place. The patterns are streamed to a temporary file
+    next to file_out instead, and copied after the header
+    when the writer is closed.
+    '''
+
+    def __init__(self, file_out):
+        '''
+        ARGUMENTS
+            file_out (str): The output file name of frequent patterns.
+        '''
+        self.file_out = file_out
+        self.count = 0
+        self.body = file_out + '.tmp'
+        self.file = open(self.body, 'w')
+
+    def write_header(self, count):
+        self.file.write(f'|FPs| = {count}\n')
+
+    def close(self):
+        '''
+        This method writes the header and then the
+        patterns to file_out and removes the temporary file.
+
+        RETURNS
+            (int): The number of patterns written.
+        '''
+        if not self.file.closed:
+            self.file.close()
+            with open(self.body) as body:
+                self.file = open(self.file_out, 'w')
+                self.write_header(self.count)
+                shutil.copyfileobj(body, self.file, COPY_SIZE)
+                self.file.close()
+            os.remove(self.body)
+        return self.count
+
+    def write_batch(self, k, batch):
+        self.file.write(''.join(f"{', '.join(map(str, sorted_items(itemset)))} : {support}\n" for (itemset, support) in batch))
+
+class JsonLinesWriter(ResultWriter):
+    '''
+    The JSON Lines format: a '{"fps": N}' header line
+    followed by one '{"k": k, "items": [...], "support": s}'
+    object per pattern.
+    '''
+
+    def write_header(self, count):
+        self.file.write('{"fps": ' + f'{count:<{COUNT_WIDTH}}' + '}\n')
+
+    def write_batch(self, k, batch):
+        self.file.write(''.join(json.dumps({'k':k, 'items':sorted_items(itemset), 'support':support}) + '\n' for (itemset, support) in batch))
+
+class BinaryWriter(ResultWriter):
+    '''
+    The columnar binary format: a header of the magic,
+    the byte order and the number of patterns, then one
+    block per batch holding k and the number of patterns,
+    the sorted items of every pattern as one array('I') and
+    their supports as one array('Q').
+    '''
+
+    mode = 'wb'
+
+    def write_header(self, count):
+        self.file.write(RESULTS_HEADER.pack(RESULTS_MAGIC, sys.byteorder.encode(), count))
+
+    def write_batch(self, k, batch):
+        items = array('I', (item for (itemset, support) in batch for item in sorted_items(itemset)))
+        supports = array('Q', (support for (itemset, support) in batch))
+        self.file.write(LEVEL_HEADER.pack(k, len(batch)))
+        self.file.write(items.tobytes())
+        self.file.write(supports.tobytes())
+
+WRITERS = {'text':TextWriter, 'jsonl':JsonLinesWriter, 'binary':BinaryWriter}
+
+def open_writer(file_out, fmt='text'):
+    '''
+    ARGUMENTS
+        file_out (str): The output file name of frequent patterns.
+        fmt (str): One of FORMATS. (Default='text')
+
+    RETURNS
+        (ResultWriter): A writer of the format.
+    '''
+    return WRITERS[fmt](file_out)
+
+def iter_results(file_in):
+    '''
+    This generator streams the patterns of a file written
+    in any of the formats, detecting the format from its
+    first bytes. Patterns come out level by level, in the
+    order they were written.
+
+    ARGUMENTS
+        file_in (str): The file name of frequent patterns.
+
+    RETURNS
+        generator
+
+    YIELDS
+        (list[int], int): The sorted items and the support of each pattern.
+    '''
+    with open(file_in, 'rb') as f:
+        magic = f.read(len(RESULTS_MAGIC))
+        if magic == RESULTS_MAGIC:
+            f.seek(0)
+            magic, byteorder, count = RESULTS_HEADER.unpack(f.read(RESULTS_HEADER.size))
+            if byteorder.rstrip(b'\0').decode() != sys.byteorder:
+                raise ValueError(f'{file_in} was written on a {byteorder.decode()}-endian machine.')
+            while True:
+                block = f.read(LEVEL_HEADER.size)
+                if not block:
+                    break
+                k, n = LEVEL_HEADER.unpack(block)
+                items = array('I')
+                items.fromfile(f, k * n)
+                supports = array('Q')
+                supports.fromfile(f, n)
+                for i, support in enumerate(supports):
+                    yield items[i * k:(i + 1) * k].tolist(), support
+            return
+    with open(file_in) as f:
+        header = f.readline()
+        if header.startswith('{'):
+            for line in f:
+                pattern = json.loads(line)
+                yield pattern['items'], pattern['support']
+            return
+        for line in f:
+            line = line.rstrip()
+            if line:
+                items, support = line.split(' : ')
+                yield [int(i) for i in items.split(', ')], int(support)
+
+def read_results(file_in):
+    '''
+    This function reads a file written in any of the
+    formats back into the dictionary of all frequent
+    patterns.
+
+    ARGUMENTS
+        file_in (str): The file name of frequent patterns.
+
+    RETURNS
+        L (dict[int:dict[frozenset[int]/int:int]]): Dictionary of all frequent patterns in the file.
+    '''
+    L = {}
+    for items, support in iter_results(file_in):
+        itemset = items[0] if len(items) == 1 else frozenset(items)
+        L.setdefault(len(items), {})[itemset] = support
+    return L
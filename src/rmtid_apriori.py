@@ -18,10 +18,20 @@ Reference Materials:
 """
 
 import argparse
+from array import array
 from collections import Counter
 from itertools import product
 from time import ctime
 
+from incidence import DEFAULT_MEMORY_BUDGET, IncidenceMatrix, fits
+from instrument import DEFAULT_PROFILE_FILE, NULL_INSTRUMENT, open_instrument
+from itemsets import CandidateTrie, PairCounter, apriori_gen, hash_filter, hash_pairs
+from parallel_scan import load_store, parallel_first_scan
+from result_writer import FORMATS, open_writer
+from rules import mine_rules
+from transaction_reader import TransactionReader
+from transaction_store import TransactionStore, is_binary
+
 __author__ = 'Galen Seilis'
 __copyright__ = 'Copyright 2020, Assignment 1, CPSC-673-A1'
 __credits__ = ['Galen Seilis', 'Fan Jiang (Instructor)']
@@ -42,7 +52,8 @@ def get_db_size(file_name):
     algorithm.
 
     Make sure that the first line of the transaction
-    database is suitable for this purpose.
+    database is suitable for this purpose. Binary
+    databases written by convert.py are also accepted.
 
     ARGUMENTS
         file_name (str): The name of the transaction database file.
@@ -50,6 +61,8 @@ def get_db_size(file_name):
     RETURNS
         (int): Number of transactions in transaction database.
     '''
+    if is_binary(file_name):
+        return len(TransactionStore.from_binary(file_name))
     with open(file_name) as f:
         return int(f.readline().rstrip())
 
@@ -72,7 +85,7 @@ def clean_line(line):
     t_set = frozenset([int(i) for i in t_set.split(' ')])
     return t_id, t_n, t_set
 
-def first_scan(file_name, epsilon):
+def first_scan(file_name, epsilon, buckets=None, processors=1):
     '''
     This function perfoms the first database scan
     for the apriori frequent pattern mining algorithm.
@@ -81,15 +94,60 @@ def first_scan(file_name, epsilon):
     assume that all items are candidates while later_scan
     will assume that the candidates are provided.
 
+    When given a TransactionStore, the transactions are
+    located by their row in the store rather than by
+    their byte offsets in the file, and the item counts
+    of a binary database are used as they are.
+
+    When given a TransactionReader, the byte offsets come
+    from its sidecar index and are only rebuilt when it
+    is stale.
+
+    With more than one processor, a text database is
+    parsed in parallel byte ranges whose item counts and
+    offset tables are merged in file order. The merged
+    offsets refresh a stale sidecar index.
+
     ARGUMENTS
-        file_name (str): The name of the transaction database file.
+        file_name (str/TransactionReader/TransactionStore): The name of the transaction database file.
         epsilon (float/int): Absolute minimum support threshold.
+        buckets (array[int]): If given, the DHP bucket table to hash every item pair into. (Default=None)
+        processors (int): The number of processes to parse a text database with. (Default=1)
 
     RETURNS
         (dict): A count table of each item in the database.
     '''
     L1_counter = Counter()
     transactions = {}
+    if isinstance(file_name, TransactionStore) and file_name.frequencies is not None and buckets is None:
+        transactions = {t_id:row for (row, t_id) in enumerate(file_name.tids)}
+        L1_counter = {k:v for (k,v) in file_name.frequencies.items() if v >= epsilon}
+        return L1_counter, transactions
+    if isinstance(file_name, TransactionStore):
+        for row, (t_id, t_n, t_set) in enumerate(file_name):
+            transactions[t_id] = row
+            L1_counter.update(t_set)
+            if buckets is not None:
+                hash_pairs(t_set, buckets)
+        L1_counter = {k:v for (k,v) in L1_counter.items() if v >= epsilon}
+        return L1_counter, transactions
+    if processors > 1 and not isinstance(file_name, TransactionStore):
+        if isinstance(file_name, TransactionReader):
+            L1_counter, transactions = parallel_first_scan(file_name.file_name, processors, buckets, offsets=True)
+            file_name.save_offsets(transactions)
+        else:
+            L1_counter, transactions = parallel_first_scan(file_name, processors, buckets, offsets=True)
+        L1_counter = {k:v for (k,v) in L1_counter.items() if v >= epsilon}
+        return L1_counter, transactions
+    if isinstance(file_name, TransactionReader):
+        transactions = file_name.offsets()
+        for (start, stop) in transactions.values():
+            t_id, t_n, t_set = clean_line(file_name.read(start, stop))
+            L1_counter.update(t_set)
+            if buckets is not None:
+                hash_pairs(t_set, buckets)
+        L1_counter = {k:v for (k,v) in L1_counter.items() if v >= epsilon}
+        return L1_counter, transactions
     with open(file_name) as file:
         offset = 0
         for i, line in enumerate(file):
@@ -97,7 +155,9 @@ def first_scan(file_name, epsilon):
                 t_id, t_n, t_set = clean_line(line)
                 transactions[t_id] = (offset, offset + len(line))
                 offset += len(line) + 1
-                L1_counter += Counter(t_set)
+                L1_counter.update(t_set)
+                if buckets is not None:
+                    hash_pairs(t_set, buckets)
             else:
                 offset += len(line) + 1
     L1_counter = {k:v for (k,v) in L1_counter.items() if v >= epsilon}
@@ -123,12 +183,38 @@ def read_transaction(file_name, start, stop):
     file.close()
     return line
 
+def fetch_transaction(file_name, position):
+    '''
+    This function parses a single transaction from
+    either the transaction database file or a
+    TransactionStore already held in memory.
+
+    ARGUMENTS
+        file_name (str/TransactionReader/TransactionStore): Transaction database filename.
+        position (tuple[int, int]/int): Byte range in the file or row in the store.
+
+    RETURNS
+        t_id (int): The transaction identifier.
+        t_n (int): The number of items in the transaction.
+        t_set (frozenset[int]/array[int]): The items in the transaction.
+    '''
+    if isinstance(file_name, TransactionStore):
+        return file_name[position]
+    start, stop = position
+    if isinstance(file_name, TransactionReader):
+        return clean_line(file_name.read(start, stop))
+    return clean_line(read_transaction(file_name, start, stop))
+
 def candidate_generation(l, k):
     '''
     This function takes the previous L table
     to construct all the candidate itemsets for
     the next C table.
 
+    This is the reference implementation which unions
+    every pair of itemsets and does not prune. The
+    apriori function uses itemsets.apriori_gen instead.
+
     ARGUMENTS
         l (dict): The previous L table.
         k (int): The size of the itemsets. Also the iteration number.
@@ -156,7 +242,7 @@ def candidate_generation(l, k):
                 continue
     return candidates
 
-def later_scan(file_name, candidates, transactions, epsilon):
+def later_scan(file_name, candidates, transactions, epsilon, instrument=NULL_INSTRUMENT):
     '''
     This function perfoms later database scans
     for the apriori frequent pattern mining algorithm.
@@ -165,10 +251,78 @@ def later_scan(file_name, candidates, transactions, epsilon):
     candidates as input while first_scan will assume that all
     items are candidates.
 
+    The candidates are counted with a CandidateTrie so that
+    each transaction only visits the candidates that can
+    be its subsets.
+
     ARGUMENTS
-        file_name (str): The name of the transaction database file.
+        file_name (str/TransactionReader/TransactionStore): The name of the transaction database file.
         candidates (dict[frozenset[int]]: Dictionary of candidates for next iteration.
-        transactions (dict[int:tuple[int, int]]: Dictionary of transactions still being considered.
+        transactions (dict[int:tuple[int, int]/int]: Dictionary of transactions still being considered.
+        epsilon (float/int): Absolute minimum support threshold.
+        instrument (Instrument): Records the candidates found in the transactions. (Default=NULL_INSTRUMENT)
+
+    RETURNS
+        (dict): A count table of each given candidate in the database.
+    '''
+    trie = CandidateTrie(candidates)
+    trans = transactions.copy()
+    total = 0
+    for t_id, position in transactions.items():
+        t_id, t_n, t_set = fetch_transaction(file_name, position)
+        hits = trie.count(sorted(t_set))
+        if not hits:
+            del trans[t_id]
+        total += hits
+    instrument.add(subset_hits=total)
+    return trie.frequent(epsilon), trans
+
+def pair_scan(file_name, candidates, transactions, epsilon, instrument=NULL_INSTRUMENT):
+    '''
+    This function perfoms the k=2 database scan with
+    a PairCounter, which counts the pairs of the items
+    of the candidates directly instead of matching the
+    candidates of each transaction in a trie.
+
+    A transaction is kept when it holds at least two of
+    the items of the candidates. Without a DHP bucket
+    filter that is exactly the transactions holding a
+    candidate; with one, a few more may be kept.
+
+    ARGUMENTS
+        file_name (str/TransactionReader/TransactionStore): The name of the transaction database file.
+        candidates (dict[frozenset[int]]: Dictionary of candidates of size 2.
+        transactions (dict[int:tuple[int, int]/int]: Dictionary of transactions still being considered.
+        epsilon (float/int): Absolute minimum support threshold.
+        instrument (Instrument): Records the pairs counted in the transactions. (Default=NULL_INSTRUMENT)
+
+    RETURNS
+        (dict): A count table of each given candidate in the database.
+    '''
+    pairs = PairCounter({item for candidate in candidates for item in candidate})
+    if not pairs.dense:
+        print(ctime(), f'WARNING: {len(pairs.index)} items are too many for a triangular array. Counting pairs in a hash table.')
+    trans = transactions.copy()
+    total = 0
+    for t_id, position in transactions.items():
+        t_id, t_n, t_set = fetch_transaction(file_name, position)
+        hits = pairs.count(t_set)
+        if not hits:
+            del trans[t_id]
+        total += hits
+    instrument.add(subset_hits=total)
+    return pairs.frequent(candidates, epsilon), trans
+
+def naive_later_scan(file_name, candidates, transactions, epsilon):
+    '''
+    This function is the reference implementation of
+    later_scan which checks every candidate against
+    every transaction with frozenset.issubset.
+
+    ARGUMENTS
+        file_name (str/TransactionReader/TransactionStore): The name of the transaction database file.
+        candidates (dict[frozenset[int]]: Dictionary of candidates for next iteration.
+        transactions (dict[int:tuple[int, int]/int]: Dictionary of transactions still being considered.
         epsilon (float/int): Absolute minimum support threshold.
 
     RETURNS
@@ -176,9 +330,9 @@ def later_scan(file_name, candidates, transactions, epsilon):
     '''
     l = candidates.copy()
     trans = transactions.copy()
-    for t_id, (start, stop) in transactions.items():
+    for t_id, position in transactions.items():
         useful = False
-        t_id, t_n, t_set = clean_line(read_transaction(file_name, start, stop))
+        t_id, t_n, t_set = fetch_transaction(file_name, position)
         for candidate in candidates.keys():
             if candidate.issubset(t_set):
                 useful = True
@@ -187,10 +341,36 @@ def later_scan(file_name, candidates, transactions, epsilon):
             del trans[t_id]
     l = {k:v for (k,v) in l.items() if v >= epsilon}
     return l, trans
-    
-    
 
-def apriori(file_name, epsilon):
+def build_matrix(file_name, transactions, L1, backend, memory_budget):
+    '''
+    This function builds the item-incidence matrix of
+    the frequent items for the NumPy counting backend,
+    when it is selected and fits in the memory budget.
+
+    ARGUMENTS
+        file_name (str/TransactionReader/TransactionStore): The name of the transaction database file.
+        transactions (dict[int:tuple[int, int]/int]: Dictionary of transactions still being considered.
+        L1 (dict[int:int]): A count table of each frequent item.
+        backend (str): 'trie', 'numpy', or 'auto'.
+        memory_budget (int): The number of bytes the NumPy backend may use.
+
+    RETURNS
+        (IncidenceMatrix): The matrix, or None to count with the CandidateTrie.
+    '''
+    if backend == 'trie':
+        return None
+    db_size = len(transactions)
+    if not fits(db_size, len(L1), memory_budget):
+        if backend == 'numpy':
+            print(ctime(), 'WARNING: NumPy is missing or the incidence matrix exceeds the memory budget. Counting with the trie.')
+        return None
+    print(ctime(), 'Building the item-incidence matrix.')
+    matrix = IncidenceMatrix((fetch_transaction(file_name, position) for position in transactions.values()), db_size, L1, memory_budget)
+    print(ctime(), f'Built a {len(L1)} x {db_size} incidence matrix using {matrix.nbytes} bytes.\n')
+    return matrix
+
+def apriori(file_name, epsilon, in_memory=False, backend='auto', memory_budget=DEFAULT_MEMORY_BUDGET, n_buckets=0, processors=1, writer=None, instrument=NULL_INSTRUMENT):
     '''
     This function performs the modified Apriori frequent pattern
     mining algorithm.
@@ -198,59 +378,97 @@ def apriori(file_name, epsilon):
     ARGUMENTS
         file_name (str): The input data file name of transactions.
         epsilon (float/int): Absolute minimum support threshold.
+        in_memory (bool): Parse the database once into a TransactionStore. (Default=False)
+        backend (str): 'trie', 'numpy', or 'auto' to use NumPy when the incidence matrix fits. (Default='auto')
+        memory_budget (int): The number of bytes the NumPy backend may use. (Default=256 MiB)
+        n_buckets (int): The size of the DHP bucket table used to filter pairs, or 0 to skip it. (Default=0)
+        processors (int): The number of processes to parse the text input with. (Default=1)
+        writer (ResultWriter): If given, each level is written as soon as it is found and dropped once the next is. (Default=None)
+        instrument (Instrument): Records the phases and counters of each level. (Default=NULL_INSTRUMENT)
 
     RETURNS
-        L (dict[int:dict[frozenset[int]:int]]): Dictionary of all frequent patterns found by the algorithm.   
+        L (dict[int:dict[frozenset[int]:int]]): Dictionary of all frequent patterns found by the algorithm, or only the last level when a writer is given.
     '''
-    print(ctime(), 'Searching for k=1 frequent patterns.')
-    L1, trans = first_scan(file_name, epsilon)
-    L = {1:L1}
-    print(ctime(), f"RmTID found {len(L[1])} new frequent pattern(s).\n")
+    with instrument.level(1):
+        with instrument.phase('load'):
+            if is_binary(file_name):
+                print(ctime(), 'Mapping binary transactions into memory.')
+                file_name = TransactionStore.from_binary(file_name)
+            elif in_memory:
+                print(ctime(), 'Loading transactions into memory.')
+                file_name = TransactionStore.from_file(file_name) if processors == 1 else load_store(file_name, processors)
+                print(ctime(), f'Loaded {len(file_name)} transactions using {file_name.nbytes} bytes.\n')
+            else:
+                file_name = TransactionReader(file_name)
+        print(ctime(), 'Searching for k=1 frequent patterns.')
+        buckets = array('Q', bytes(8 * n_buckets)) if n_buckets else None
+        with instrument.phase('count'):
+            L1, trans = first_scan(file_name, epsilon, buckets, processors)
+        L = {1:L1}
+        instrument.add(scanned=len(trans), frequent=len(L[1]))
+        if writer is not None:
+            with instrument.phase('write'):
+                writer.write_level(1, L[1])
+        print(ctime(), f"RmTID found {len(L[1])} new frequent pattern(s).\n")
+        with instrument.phase('index'):
+            matrix = build_matrix(file_name, trans, L[1], backend, memory_budget)
     k = 2
     while True:
-        candidates = candidate_generation(L[k-1], k)
-        if not candidates:
-            break
-        else:
-            print(ctime(), f'Searching for k={k} frequent patterns.')
-            candidates, trans = later_scan(file_name, candidates, trans, epsilon)
+        with instrument.level(k):
+            with instrument.phase('generate'):
+                candidates, pruned = apriori_gen(L[k-1], k)
+            instrument.add(generated=len(candidates) + pruned, pruned=pruned)
             if not candidates:
-                print(ctime(), f"RmTID found {len(candidates)} new frequent pattern(s).\n")
                 break
             else:
-                print(ctime(), f"RmTID found {len(candidates)} new frequent pattern(s).\n")
-                L[k] = candidates
-                k += 1
+                print(ctime(), f'Searching for k={k} frequent patterns.')
+                print(ctime(), f'Pruned {pruned} candidate(s) with an infrequent subset.')
+                if k == 2 and buckets is not None:
+                    with instrument.phase('filter'):
+                        candidates, hashed = hash_filter(candidates, buckets, epsilon)
+                    instrument.add(hash_pruned=hashed)
+                    print(ctime(), f'Pruned {hashed} of {hashed + len(candidates)} pair(s) ({hashed / max(hashed + len(candidates), 1):.1%}) in infrequent hash buckets.')
+                scanned = len(trans)
+                instrument.add(counted=len(candidates), scanned=scanned)
+                with instrument.phase('count'):
+                    if k == 2:
+                        candidates, trans = pair_scan(file_name, candidates, trans, epsilon, instrument)
+                    elif matrix is not None:
+                        candidates, useful = matrix.count(candidates, epsilon)
+                        trans = {t_id:position for (t_id, position) in trans.items() if t_id in useful}
+                    else:
+                        candidates, trans = later_scan(file_name, candidates, trans, epsilon, instrument)
+                instrument.add(removed=scanned - len(trans), frequent=len(candidates))
+                if not candidates:
+                    print(ctime(), f"RmTID found {len(candidates)} new frequent pattern(s).\n")
+                    break
+                else:
+                    print(ctime(), f"RmTID found {len(candidates)} new frequent pattern(s).\n")
+                    L[k] = candidates
+                    if writer is not None:
+                        with instrument.phase('write'):
+                            writer.write_level(k, candidates)
+                        del L[k-1]
+                    k += 1
     return L
 
-def write_rules(file_out, rules):
+def write_rules(file_out, rules, fmt='text'):
     '''
     This function writes the discovered
-    frequent patterns into a text file.
+    frequent patterns into a file.
 
     ARGUMENTS
         file_out (str): The output file name of frequent patterns.
         rules (dict[int:dict[frozenset[int]:int]]): Dictionary of all frequent patterns found by the algorithm.
+        fmt (str): 'text', 'jsonl', or 'binary'. (Default='text')
 
     RETURNS
         None
     '''
-    with open(file_out, 'w') as file:
-        count = 0
-        lines = []
+    with open_writer(file_out, fmt) as writer:
         for (k, ruleset) in rules.items():
-            for (itemset, support) in ruleset.items():
-                count += 1
-                if isinstance(itemset, int):
-                    itemstr = str(itemset)
-                else:
-                    itemstr = str(set(itemset)).replace('{', '').replace('}', '')
-                line = f'{itemstr} : {support}\n'
-                lines.append(line)
-        file.write(f'|FPs| = {count}\n')
-        print(f'|FPs| = {count}\n')
-        for i, line in enumerate(lines):
-            file.write(line)
+            writer.write_level(k, ruleset)
+    print(f'|FPs| = {writer.count}\n')
 
 if '__main__' == __name__:
     # Prepare command line parser
@@ -264,14 +482,28 @@ if '__main__' == __name__:
     required = parser.add_argument_group('required arguments')
     required.add_argument("-i", "--in_file", type=str, required=True, help="Input data file.")
     parser.add_argument("-o", "--out_file", type=str, default="MiningResults.txt", help="Output results file. (default='MiningResults.txt')")
+    parser.add_argument("-f", "--format", type=str, choices=FORMATS, default='text', help="Output results format. Patterns are written as each level is found. (default='text')")
+    parser.add_argument("--min_conf", type=float, default=None, help="Minimum confidence of the association rules generated from the results, or unset to skip them. (default=None)")
+    parser.add_argument("--rules_file", type=str, default="AssociationRules.txt", help="Output association rules file. (default='AssociationRules.txt')")
     parser.add_argument("-m", "--min_supp", type=float, default=0.5, help="Minimum support threshold as a float between 0 and 1. (default=0.5)")
+    parser.add_argument("--in_memory", "--in-memory", action="store_true", help="Parse the input once and keep it in memory between scans. (default=False)")
+    parser.add_argument("--backend", type=str, choices=['auto', 'trie', 'numpy'], default='auto', help="Support counting backend. 'auto' uses NumPy when the item-incidence matrix fits in the memory budget. (default='auto')")
+    parser.add_argument("--memory_budget", type=int, default=DEFAULT_MEMORY_BUDGET // 2**20, help="Memory budget of the NumPy backend in MiB. (default=256)")
+    parser.add_argument("--buckets", type=int, default=0, help="Size of the DHP hash bucket table used to prune pairs before k=2 counting, or 0 to disable it. (default=0)")
+    parser.add_argument("-p", "--processors", type=int, default=1, help="The number of processes used to parse a text input in the first scan. (default=1)")
+    parser.add_argument("--stats", type=str, default=None, help="JSON Lines file to append the phase timings and counters of each level to. (default=None)")
+    parser.add_argument("--profile_level", type=int, default=None, help="Level to run under cProfile. (default=None)")
+    parser.add_argument("--profile_file", type=str, default=DEFAULT_PROFILE_FILE, help="Profile output file, where {k} is replaced by the level. (default='level_{k}.prof')")
     args = parser.parse_args()
     
     # Check validity of CLI arguments
     assert 0 <= args.min_supp <= 1
+    assert args.min_conf is None or 0 <= args.min_conf <= 1
     epsilon = args.min_supp * get_db_size(args.in_file)
     print(ctime(), 'Starting\n')
-    rules = apriori(args.in_file, epsilon)
-    print(ctime(), 'Writing rules to file...')
-    write_rules(args.out_file, rules)
+    with open_instrument('rmtid_apriori', args.stats, args.profile_level, args.profile_file) as instrument, open_writer(args.out_file, args.format) as writer:
+        apriori(args.in_file, epsilon, args.in_memory, args.backend, args.memory_budget * 2**20, args.buckets, args.processors, writer=writer, instrument=instrument)
+    print(f'|FPs| = {writer.count}\n')
+    if args.min_conf is not None:
+        mine_rules(args.out_file, args.rules_file, args.min_conf)
     print(ctime(), 'Finished\n')
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+#-*- coding:utf-8 - *-
+
+"""
+This CLI tool generates association rules from the frequent patterns found by the 'apriori' frequent patten mining scripts.
+
+GNU General Public License v3.0
+Permissions of this strong copyleft license are conditioned on making available complete source code of licensed works and modifications,
+which include larger works using a licensed work, under the same license.
+Copyright and license notices must be preserved.
+Contributors provide an express grant of patent rights.
+
+Reference Materials:
+[1] Agrawal, R. and Srikant, R. (1994) Fast Algorithms for Mining Association Rules, Section 3.
+[2] Leskovec, J., Rajaraman, A. and Ullman, J. (2014) Mining of Massive Datasets, Section 6.1.3.
+"""
+
+import argparse
+from time import ctime
+
+from itemsets import apriori_gen
+from result_writer import BATCH_SIZE, COUNT_WIDTH, read_results
+
+__author__ = 'Galen Seilis'
+__copyright__ = 'Copyright 2020, Assignment 1, CPSC-673-A1'
+__credits__ = ['Galen Seilis', 'Fan Jiang (Instructor)']
+__license__ = 'GNU General Public License v3.0'
+__version__ = '0.1.0'
+__maintainer__ = 'Galen Seilis'
+__email__ = 'seilis@unbc.ca'
+__status__ = 'School Project'
+
+def support_index(L, closed=False):
+    '''
+    This function builds a hashed index of the support
+    of every frequent pattern, keyed by its frozenset of
+    items, including the single items of L[1].
+
+    When L only holds closed itemsets, the antecedents
+    of its rules are mostly absent from it, so their
+    supports are recovered with a ClosedIndex instead.
+
+    ARGUMENTS
+        L (dict[int:dict[frozenset[int]/int:int]]): Dictionary of all frequent patterns.
+        closed (bool): Whether L only holds the closed frequent patterns. (Default=False)
+
+    RETURNS
+        (dict[frozenset[int]:int]/ClosedIndex): The support of each frequent pattern.
+    '''
+    if closed:
+        return ClosedIndex(L)
+    index = {}
+    for level in L.values():
+        for itemset, support in level.items():
+            index[frozenset([itemset]) if isinstance(itemset, int) else itemset] = support
+    return index
+
+class ClosedIndex:
+    '''
+    An index of closed frequent itemsets that recovers
+    the support of any frequent itemset on demand. The
+    support of an itemset is the largest support of the
+    closed itemsets containing it.
+
+    ATTRIBUTES
+        patterns (list[tuple[frozenset[int], int]]): The (itemset, support) of each closed itemset.
+        postings (dict[int:int]): A bitmask of the closed itemsets holding each item.
+    '''
+
+    def __init__(self, L):
+        '''
+        ARGUMENTS
+            L (dict[int:dict[frozenset[int]/int:int]]): Dictionary of closed frequent patterns.
+        '''
+        self.patterns = []
+        self.postings = {}
+        for level in L.values():
+            for itemset, support in level.items():
+                itemset = frozenset([itemset]) if isinstance(itemset, int) else itemset
+                for item in itemset:
+                    self.postings[item] = self.postings.get(item, 0) | 1 << len(self.patterns)
+                self.patterns.append((itemset, support))
+
+    def __getitem__(self, itemset):
+        '''
+        ARGUMENTS
+            itemset (frozenset[int]/int): A frequent item or itemset.
+
+        RETURNS
+            (int): The support of the itemset.
+        '''
+        items = [itemset] if isinstance(itemset, int) else list(itemset)
+        holders = -1 if not items else self.postings.get(items[0], 0)
+        for item in items[1:]:
+            holders &= self.postings.get(item, 0)
+        if holders == -1:
+            holders = (1 << len(self.patterns)) - 1
+        support = 0
+        while holders:
+            low = holders & -holders
+            support = max(support, self.patterns[low.bit_length() - 1][1])
+            holders ^= low
+        if not support:
+            raise KeyError(itemset)
+        return support
+
+def itemset_rules(itemset, support, index, min_conf):
+    '''
+    This generator yields the confident rules of one
+    frequent itemset. The consequents are grown one item
+    at a time with apriori_gen, and only consequents whose
+    rule met the threshold are joined, since moving items
+    from the antecedent to the consequent can only lower
+    the confidence.
+
+    ARGUMENTS
+        itemset (frozenset[int]): A frequent itemset of at least two items.
+        support (int): The support of the itemset.
+        index (dict[frozenset[int]:int]/ClosedIndex): The support of each frequent pattern.
+        min_conf (float): Minimum confidence threshold.
+
+    RETURNS
+        generator
+
+    YIELDS
+        (frozenset[int], frozenset[int], int, float): The antecedent, consequent, support and confidence of a rule.
+    '''
+    consequents = {}
+    for item in itemset:
+        antecedent = itemset - {item}
+        confidence = support / index[antecedent]
+        if confidence >= min_conf:
+            consequents[item] = 0
+            yield antecedent, frozenset([item]), support, confidence
+    m = 2
+    while consequents and m < len(itemset):
+        candidates, _ = apriori_gen(consequents, m)
+        consequents = {}
+        for consequent in candidates:
+            antecedent = itemset - consequent
+            confidence = support / index[antecedent]
+            if confidence >= min_conf:
+                consequents[consequent] = 0
+                yield antecedent, consequent, support, confidence
+        m += 1
+
+def generate_rules(L, min_conf, closed=False):
+    '''
+    This generator yields every association rule X -> Y
+    between frequent patterns whose confidence,
+    support(X u Y) / support(X), meets the threshold.
+    When L only holds closed patterns, X u Y ranges over
+    the closed itemsets.
+
+    ARGUMENTS
+        L (dict[int:dict[frozenset[int]/int:int]]): Dictionary of all frequent patterns.
+        min_conf (float): Minimum confidence threshold.
+        closed (bool): Whether L only holds the closed frequent patterns. (Default=False)
+
+    RETURNS
+        generator
+
+    YIELDS
+        (frozenset[int], frozenset[int], int, float): The antecedent, consequent, support and confidence of a rule.
+    '''
+    index = support_index(L, closed)
+    for k, level in L.items():
+        if k < 2:
+            continue
+        for itemset, support in level.items():
+            yield from itemset_rules(itemset, support, index, min_conf)
+
+def write_association_rules(file_out, rules):
+    '''
+    This function streams association rules into a text
+    file with a '|Rules| = N' header, followed by one
+    'antecedent => consequent : support : confidence' line
+    per rule. The header is patched once every rule has
+    been written.
+
+    ARGUMENTS
+        file_out (str): The output file name of association rules.
+        rules (iterable[tuple[frozenset[int], frozenset[int], int, float]]): The rules to write.
+
+    RETURNS
+        (int): The number of rules written.
+    '''
+    count = 0
+    with open(file_out, 'w') as file:
+        file.write(f'|Rules| = {0:<{COUNT_WIDTH}}\n')
+        batch = []
+        for antecedent, consequent, support, confidence in rules:
+            batch.append(f"{', '.join(map(str, sorted(antecedent)))} => {', '.join(map(str, sorted(consequent)))} : {support} : {confidence:.6f}\n")
+            if len(batch) == BATCH_SIZE:
+                file.write(''.join(batch))
+                count += len(batch)
+                batch = []
+        file.write(''.join(batch))
+        count += len(batch)
+        file.seek(0)
+        file.write(f'|Rules| = {count:<{COUNT_WIDTH}}\n')
+    return count
+
+def mine_rules(file_in, file_out, min_conf, closed=False):
+    '''
+    This function generates the association rules of a
+    frequent pattern file written by any of the mining
+    scripts, in any of their output formats.
+
+    ARGUMENTS
+        file_in (str): The file name of frequent patterns.
+        file_out (str): The output file name of association rules.
+        min_conf (float): Minimum confidence threshold.
+        closed (bool): Whether the file only holds closed frequent patterns, as written by eclat.py --closed. (Default=False)
+
+    RETURNS
+        (int): The number of rules written.
+    '''
+    print(ctime(), f'Reading frequent patterns from {file_in}.')
+    L = read_results(file_in)
+    print(ctime(), f'Generating rules with confidence of at least {min_conf}.')
+    count = write_association_rules(file_out, generate_rules(L, min_conf, closed))
+    print(ctime(), f'Wrote {count} rule(s) to {file_out}.')
+    print(f'|Rules| = {count}\n')
+    return count
+
+if '__main__' == __name__:
+    # Prepare command line parser
+    parser = argparse.ArgumentParser()
+    parser.description = '''A CLI that generates association rules from a file of frequent patterns.
+    The input file is the output of any of the mining scripts, in the text, JSON Lines or binary format.
+    Every rule X => Y is written with the support of X u Y and its confidence, support(X u Y) / support(X).'''
+    required = parser.add_argument_group('required arguments')
+    required.add_argument("-i", "--in_file", type=str, required=True, help="Input frequent patterns file.")
+    parser.add_argument("-o", "--out_file", type=str, default="AssociationRules.txt", help="Output rules file. (default='AssociationRules.txt')")
+    parser.add_argument("-c", "--min_conf", type=float, default=0.5, help="Minimum confidence threshold as a float between 0 and 1. (default=0.5)")
+    parser.add_argument("--closed", action="store_true", help="The input file only holds closed itemsets, as written by eclat.py --closed. (default=False)")
+    args = parser.parse_args()
+
+    # Check validity of CLI arguments
+    assert 0 <= args.min_conf <= 1
+    print(ctime(), 'Starting\n')
+    mine_rules(args.in_file, args.out_file, args.min_conf, args.closed)
+    print(ctime(), 'Finished\n')
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+#-*- coding:utf-8 - *-
+
+"""
+This CLI tool is a Python implementation of the two-phase partitioned 'SON' frequent patten mining algorithm.
+
+GNU General Public License v3.0
+Permissions of this strong copyleft license are conditioned on making available complete source code of licensed works and modifications,
+which include larger works using a licensed work, under the same license.
+Copyright and license notices must be preserved.
+Contributors provide an express grant of patent rights.
+
+Reference Materials:
+[1] Savasere, A., Omiecinski, E. and Navathe, S. (1995) An Efficient Algorithm for Mining Association Rules in Large Databases.
+[2] Leskovec, J., Rajaraman, A. and Ullman, J. (2014) Mining of Massive Datasets, Section 6.4.
+"""
+
+import argparse
+from array import array
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import json
+from multiprocessing import Pool
+import os
+from queue import Queue
+import shlex
+import subprocess
+import sys
+from time import ctime
+
+from apriori import first_scan, get_db_size, later_scan, write_rules
+from itemsets import CandidateTrie, apriori_gen
+from parallel_scan import partition_file
+from result_writer import FORMATS
+from rules import mine_rules
+from transaction_store import TransactionStore, is_binary
+
+__author__ = 'Galen Seilis'
+__copyright__ = 'Copyright 2020, Assignment 1, CPSC-673-A1'
+__credits__ = ['Galen Seilis', 'Fan Jiang (Instructor)']
+__license__ = 'GNU General Public License v3.0'
+__version__ = '0.1.0'
+__maintainer__ = 'Galen Seilis'
+__email__ = 'seilis@unbc.ca'
+__status__ = 'School Project'
+
+def partition(file_name, n):
+    '''
+    This function splits a database into n partitions.
+    A text database is split into byte ranges that start
+    and stop on line boundaries, and a binary database
+    into ranges of rows of its mapped store.
+
+    ARGUMENTS
+        file_name (str): The name of the transaction database file.
+        n (int): The number of partitions.
+
+    RETURNS
+        (list[tuple[int, int]]): The (start, stop) byte or row range of each non-empty partition.
+    '''
+    if not is_binary(file_name):
+        return partition_file(file_name, n)
+    rows = len(TransactionStore.from_binary(file_name))
+    bounds = [rows * i // n for i in range(n + 1)]
+    return [(start, stop) for (start, stop) in zip(bounds, bounds[1:]) if start < stop]
+
+def read_partition(file_name, start, stop):
+    '''
+    ARGUMENTS
+        file_name (str): The name of the transaction database file.
+        start (int): File byte index, or row of a binary database, to start reading.
+        stop (int): File byte index, or row of a binary database, to stop reading.
+
+    RETURNS
+        (TransactionStore): The transactions of the partition.
+    '''
+    if is_binary(file_name):
+        store = TransactionStore.from_binary(file_name)
+        base = store.offsets[start]
+        offsets = array('Q', (offset - base for offset in store.offsets[start:stop + 1]))
+        return TransactionStore(store.tids[start:stop], store.items[base:store.offsets[stop]], offsets)
+    with open(file_name, 'rb') as f:
+        f.seek(start)
+        return TransactionStore.from_lines(f.read(stop - start).decode().splitlines())
+
+def mine_partition(file_name, start, stop, min_supp):
+    '''
+    This function performs the first phase of SON on
+    one partition, mining it with apriori at the minimum
+    support threshold scaled to the partition's size.
+
+    ARGUMENTS
+        file_name (str): The name of the transaction database file.
+        start (int): File byte index, or row of a binary database, to start reading.
+        stop (int): File byte index, or row of a binary database, to stop reading.
+        min_supp (float): Relative minimum support threshold.
+
+    RETURNS
+        (list[list[int]]): The sorted items of each locally frequent itemset.
+    '''
+    store = read_partition(file_name, start, stop)
+    epsilon = min_supp * len(store)
+    l = first_scan(store, epsilon)
+    local = [[item] for item in l]
+    k = 2
+    while l:
+        candidates, _ = apriori_gen(l, k)
+        if not candidates:
+            break
+        l = later_scan(store, candidates, epsilon)
+        local.extend(sorted(itemset) for itemset in l)
+        k += 1
+    return local
+
+def count_partition(file_name, start, stop, candidates):
+    '''
+    This function performs the second phase of SON on
+    one partition, counting every candidate exactly.
+
+    ARGUMENTS
+        file_name (str): The name of the transaction database file.
+        start (int): File byte index, or row of a binary database, to start reading.
+        stop (int): File byte index, or row of a binary database, to stop reading.
+        candidates (list[list[int]]): The sorted items of each candidate.
+
+    RETURNS
+        (list[int]): The count of each candidate in the partition, in order.
+    '''
+    store = read_partition(file_name, start, stop)
+    singles = Counter()
+    tries = {}
+    for candidate in candidates:
+        if len(candidate) > 1:
+            tries.setdefault(len(candidate), {})[frozenset(candidate)] = 0
+    tries = [CandidateTrie(level) for level in tries.values()]
+    for t_id, t_n, t_set in store:
+        singles.update(t_set)
+        for trie in tries:
+            trie.count(t_set)
+    counts = {}
+    for trie in tries:
+        counts.update(trie.counts)
+    return [singles[c[0]] if len(c) == 1 else counts[frozenset(c)] for c in candidates]
+
+TASKS = {'mine':mine_partition, 'count':count_partition}
+
+def run_task(name, args):
+    '''
+    ARGUMENTS
+        name (str): The name of the task in TASKS.
+        args (list): The arguments of the task.
+
+    RETURNS
+        The result of the task.
+    '''
+    return TASKS[name](*args)
+
+class PoolExecutor:
+    '''
+    An executor that runs SON tasks in a local pool
+    of processes.
+    '''
+
+    def __init__(self, processors):
+        '''
+        ARGUMENTS
+            processors (int): The number of processes in the pool.
+        '''
+        self.processors = processors
+
+    def map(self, name, args_list):
+        '''
+        ARGUMENTS
+            name (str): The name of the task in TASKS.
+            args_list (list[list]): The arguments of each task.
+
+        RETURNS
+            (list): The result of each task, in order.
+        '''
+        with Pool(self.processors) as p:
+            return p.starmap(run_task, [(name, args) for args in args_list])
+
+class SubprocessExecutor:
+    '''
+    An executor that runs every SON task in a new worker
+    process, started by a command prefix such as
+    'ssh node1'. The task is sent as JSON on the worker's
+    standard input and its result is read back as JSON
+    from the worker's standard output. An empty prefix
+    starts the worker on the local host, which is how the
+    multi-host mode is tested without a cluster.
+
+    Each host runs one task at a time, and every host must
+    see the transaction database under the same path.
+    '''
+
+    def __init__(self, hosts, python=sys.executable, script=os.path.abspath(__file__)):
+        '''
+        ARGUMENTS
+            hosts (list[str]): The command prefix of each host, or 'local'.
+            python (str): The Python interpreter on the hosts. (Default=sys.executable)
+            script (str): The path of this script on the hosts. (Default=this file)
+        '''
+        self.hosts = [[] if host == 'local' else shlex.split(host) for host in hosts]
+        self.command = [python, script, '--worker']
+
+    def run(self, free, name, args):
+        host = free.get()
+        try:
+            task = json.dumps({'name':name, 'args':args})
+            done = subprocess.run(host + self.command, input=task, capture_output=True, text=True)
+        finally:
+            free.put(host)
+        if done.returncode != 0:
+            raise RuntimeError(f'SON worker {shlex.join(host + self.command)} failed:\n{done.stderr}')
+        return json.loads(done.stdout)
+
+    def map(self, name, args_list):
+        '''
+        ARGUMENTS
+            name (str): The name of the task in TASKS.
+            args_list (list[list]): The arguments of each task.
+
+        RETURNS
+            (list): The result of each task, in order.
+        '''
+        free = Queue()
+        for host in self.hosts:
+            free.put(host)
+        with ThreadPoolExecutor(len(self.hosts)) as threads:
+            return list(threads.map(lambda args: self.run(free, name, args), args_list))
+
+def son(file_name, epsilon, executor, partitions):
+    '''
+    This function performs the SON frequent pattern mining
+    algorithm. Phase one mines every partition locally at a
+    scaled threshold in parallel. Phase two counts the union
+    of the locally frequent itemsets over every partition in
+    parallel to get their exact supports. The database is
+    read exactly twice however long the patterns are.
+
+    ARGUMENTS
+        file_name (str): The input data file name of transactions.
+        epsilon (float/int): Absolute minimum support threshold.
+        executor (PoolExecutor/SubprocessExecutor): Runs the tasks of each phase.
+        partitions (int): The number of partitions of the database.
+
+    RETURNS
+        L (dict[int:dict[frozenset[int]:int]]): Dictionary of all frequent patterns found by the algorithm.
+    '''
+    ranges = partition(file_name, partitions)
+    min_supp = epsilon / get_db_size(file_name)
+    print(ctime(), f'Phase 1: mining {len(ranges)} partition(s) locally.')
+    local = executor.map('mine', [[file_name, start, stop, min_supp] for (start, stop) in ranges])
+    candidates = sorted({tuple(itemset) for itemsets in local for itemset in itemsets}, key=lambda c: (len(c), c))
+    candidates = [list(c) for c in candidates]
+    print(ctime(), f'SON found {len(candidates)} locally frequent candidate(s).\n')
+    print(ctime(), 'Phase 2: counting the candidates over every partition.')
+    counts = executor.map('count', [[file_name, start, stop, candidates] for (start, stop) in ranges])
+    L = {1:{}}
+    for candidate, support in zip(candidates, map(sum, zip(*counts))):
+        if support >= epsilon:
+            if len(candidate) == 1:
+                L[1][candidate[0]] = support
+            else:
+                L.setdefault(len(candidate), {})[frozenset(candidate)] = support
+    print(ctime(), f"SON found {sum(len(l) for l in L.values())} frequent pattern(s).\n")
+    return L
+
+if '__main__' == __name__:
+    if sys.argv[1:] == ['--worker']:
+        task = json.load(sys.stdin)
+        json.dump(run_task(task['name'], task['args']), sys.stdout)
+        sys.exit()
+
+    # Prepare command line parser
+    parser = argparse.ArgumentParser()
+    parser.description = '''A CLI that performs the two-phase partitioned SON frequent pattern learning algorithm.
+    This program expects an input text file with a particular format.
+    The first line of the input file should be the number of transactions in the transaction database.
+    All subsequent lines are expected to have a tab-delimited format where the first column is the transaction ID,
+    the second column is the number of items in the transaction, and the third column is a space-delimited set of items.
+    Failure to format the input file correctly may result in errors or unexpected behaviour.'''
+    required = parser.add_argument_group('required arguments')
+    required.add_argument("-i", "--in_file", type=str, required=True, help="Input data file.")
+    parser.add_argument("-o", "--out_file", type=str, default="MiningResults.txt", help="Output results file. (default='MiningResults.txt')")
+    parser.add_argument("-f", "--format", type=str, choices=FORMATS, default='text', help="Output results format. (default='text')")
+    parser.add_argument("--min_conf", type=float, default=None, help="Minimum confidence of the association rules generated from the results, or unset to skip them. (default=None)")
+    parser.add_argument("--rules_file", type=str, default="AssociationRules.txt", help="Output association rules file. (default='AssociationRules.txt')")
+    parser.add_argument("-m", "--min_supp", type=float, default=0.5, help="Minimum support threshold as a float between 0 and 1. (default=0.5)")
+    parser.add_argument("-p", "--processors", type=int, default=len(os.sched_getaffinity(0)), help="The number of processors to be used in the local pool. (default=len(os.sched_getaffinity(0)))")
+    parser.add_argument("-n", "--partitions", type=int, default=None, help="The number of partitions of the input. (default=the number of processors or hosts)")
+    parser.add_argument("--hosts", type=str, nargs='+', default=None, help="Command prefixes, such as 'ssh node1', that start a worker on each host. Use 'local' for a subprocess on this host. (default=use the local pool)")
+    args = parser.parse_args()
+
+    # Check validity of CLI arguments
+    assert 0 <= args.min_supp <= 1
+    assert args.min_conf is None or 0 <= args.min_conf <= 1
+    epsilon = args.min_supp * get_db_size(args.in_file)
+    if args.hosts:
+        executor = SubprocessExecutor(args.hosts)
+        partitions = args.partitions or len(args.hosts)
+    else:
+        executor = PoolExecutor(args.processors)
+        partitions = args.partitions or args.processors
+    print(ctime(), 'Starting\n')
+    rules = son(args.in_file, epsilon, executor, partitions)
+    print(ctime(), 'Writing rules to file...')
+    write_rules(args.out_file, rules, args.format)
+    if args.min_conf is not None:
+        mine_rules(args.out_file, args.rules_file, args.min_conf)
+    print(ctime(), 'Finished\n')
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+#-*- coding:utf-8 - *-
+
+"""
+This CLI tool mines a transaction database at several minimum support thresholds from a single run of the 'apriori' frequent patten mining algorithm.
+
+GNU General Public License v3.0
+Permissions of this strong copyleft license are conditioned on making available complete source code of licensed works and modifications,
+which include larger works using a licensed work, under the same license.
+Copyright and license notices must be preserved.
+Contributors provide an express grant of patent rights.
+
+Reference Materials:
+[1] Agrawal, R. and Srikant, R. (1994) Fast Algorithms for Mining Association Rules.
+[2] Aggarwal, C. C. and Yu, P. S. (2001) A New Approach to Online Generation of Association Rules.
+"""
+
+import argparse
+from time import ctime
+
+from apriori import apriori, get_db_size
+from result_writer import FORMATS, iter_results, open_writer
+
+__author__ = 'Galen Seilis'
+__copyright__ = 'Copyright 2020, Assignment 1, CPSC-673-A1'
+__credits__ = ['Galen Seilis', 'Fan Jiang (Instructor)']
+__license__ = 'GNU General Public License v3.0'
+__version__ = '0.1.0'
+__maintainer__ = 'Galen Seilis'
+__email__ = 'seilis@unbc.ca'
+__status__ = 'School Project'
+
+DEFAULT_CACHE_SIZE = 2**20 # patterns
+
+class LatticeCache:
+    '''
+    A cache of the frequent itemset lattice, with the
+    support of each pattern, for answering several
+    thresholds from one mining run.
+
+    Only patterns frequent at the floor threshold are
+    kept. When the cache grows past its size cap, the
+    floor is raised to the next threshold and every
+    pattern below it is evicted. Thresholds left under
+    the floor are said to be spilled and must be answered
+    from elsewhere.
+
+    The cache also acts as a ResultWriter for apriori,
+    passing every level on to the writer of the lowest
+    threshold as it is cached.
+
+    ATTRIBUTES
+        thresholds (list[float]): The absolute thresholds the cache may answer, in ascending order.
+        floor (int): The position in thresholds of the lowest threshold still cached.
+        max_size (int): The largest number of patterns to keep.
+        levels (dict[int:dict[frozenset[int]/int:int]]): The cached patterns of each size.
+        size (int): The number of patterns cached.
+        writer (ResultWriter): The writer of the lowest threshold.
+    '''
+
+    def __init__(self, thresholds, max_size, writer):
+        '''
+        ARGUMENTS
+            thresholds (list[float]): The absolute thresholds the cache may answer.
+            max_size (int): The largest number of patterns to keep.
+            writer (ResultWriter): The writer of the lowest threshold.
+        '''
+        self.thresholds = sorted(thresholds)
+        self.floor = 0
+        self.max_size = max_size
+        self.levels = {}
+        self.size = 0
+        self.writer = writer
+
+    def spilled(self, epsilon):
+        '''
+        ARGUMENTS
+            epsilon (float/int): An absolute minimum support threshold.
+
+        RETURNS
+            (bool): Whether the threshold is below the cached patterns.
+        '''
+        return self.floor >= len(self.thresholds) or epsilon < self.thresholds[self.floor]
+
+    def write_level(self, k, level):
+        '''
+        This method writes a level of patterns mined at
+        the lowest threshold and caches those above the
+        floor, evicting patterns if the cache is full.
+
+        ARGUMENTS
+            k (int): The size of the patterns.
+            level (dict[frozenset[int]/int:int]): A count table of each frequent pattern of size k.
+
+        RETURNS
+            None
+        '''
+        self.writer.write_level(k, level)
+        if self.floor >= len(self.thresholds):
+            return
+        epsilon = self.thresholds[self.floor]
+        cached = {itemset:support for (itemset, support) in level.items() if support >= epsilon}
+        self.levels[k] = cached
+        self.size += len(cached)
+        while self.size > self.max_size and self.floor < len(self.thresholds):
+            self.floor += 1
+            if self.floor == len(self.thresholds):
+                self.levels = {}
+                self.size = 0
+                print(ctime(), 'Evicted the whole cache; every threshold will be read back from the lowest results.')
+                break
+            epsilon = self.thresholds[self.floor]
+            self.levels = {k:{i:s for (i, s) in l.items() if s >= epsilon} for (k, l) in self.levels.items()}
+            self.size = sum(len(l) for l in self.levels.values())
+            print(ctime(), f'Cache full; raised its floor to a support of {epsilon}, keeping {self.size} pattern(s).')
+
+    def query(self, epsilon):
+        '''
+        ARGUMENTS
+            epsilon (float/int): An absolute minimum support threshold that is not spilled.
+
+        RETURNS
+            (generator): The (k, level) of each size of pattern frequent at the threshold.
+        '''
+        for k, level in self.levels.items():
+            yield k, {itemset:support for (itemset, support) in level.items() if support >= epsilon}
+
+def read_back(file_name, epsilon):
+    '''
+    This generator streams the patterns of the results of
+    the lowest threshold that are frequent at a higher one,
+    grouped by level.
+
+    ARGUMENTS
+        file_name (str): The results file of the lowest threshold.
+        epsilon (float/int): An absolute minimum support threshold.
+
+    RETURNS
+        generator
+
+    YIELDS
+        (int, dict[frozenset[int]/int:int]): The size and the patterns of each level.
+    '''
+    k, level = None, {}
+    for items, support in iter_results(file_name):
+        if len(items) != k:
+            if level:
+                yield k, level
+            k, level = len(items), {}
+        if support >= epsilon:
+            level[items[0] if k == 1 else frozenset(items)] = support
+    if level:
+        yield k, level
+
+def sweep(file_name, min_supps, out_file, fmt='text', max_size=DEFAULT_CACHE_SIZE, in_memory=False):
+    '''
+    This function mines a database once at the lowest of
+    several relative thresholds, caching the lattice, and
+    writes the patterns of every threshold to its own file.
+    Higher thresholds are filtered from the cache, or from
+    the results of the lowest threshold when the cache had
+    to evict them.
+
+    ARGUMENTS
+        file_name (str): The input data file name of transactions.
+        min_supps (list[float]): The relative minimum support thresholds.
+        out_file (str): The output file name, with '{min_supp}' standing for the threshold.
+        fmt (str): 'text', 'jsonl', or 'binary'. (Default='text')
+        max_size (int): The largest number of patterns to cache. (Default=2**20)
+        in_memory (bool): Parse the database once into a TransactionStore. (Default=False)
+
+    RETURNS
+        (dict[float:str]): The results file of each threshold.
+    '''
+    n = get_db_size(file_name)
+    min_supps = sorted(set(min_supps))
+    files = {m:out_file.format(min_supp=m) for m in min_supps}
+    lowest = min_supps[0]
+    print(ctime(), f'Mining once at min_supp={lowest} for {len(min_supps)} threshold(s).\n')
+    with open_writer(files[lowest], fmt) as writer:
+        cache = LatticeCache([m * n for m in min_supps[1:]], max_size, writer)
+        apriori(file_name, lowest * n, in_memory, writer=cache)
+    print(ctime(), f'Wrote {writer.count} pattern(s) at min_supp={lowest} to {files[lowest]}.')
+    for m in min_supps[1:]:
+        epsilon = m * n
+        spilled = cache.spilled(epsilon)
+        with open_writer(files[m], fmt) as out:
+            for k, level in (read_back(files[lowest], epsilon) if spilled else cache.query(epsilon)):
+                out.write_level(k, level)
+        print(ctime(), f"Wrote {out.count} pattern(s) at min_supp={m} to {files[m]} from the {'lowest results' if spilled else 'cache'}.")
+    return files
+
+if '__main__' == __name__:
+    # Prepare command line parser
+    parser = argparse.ArgumentParser()
+    parser.description = '''A CLI that performs the Apriori frequent pattern learning algorithm at several minimum support thresholds.
+    The input is mined once at the lowest threshold, and the patterns of every higher threshold are filtered from a cache of the result.
+    This program expects an input text file with a particular format.
+    The first line of the input file should be the number of transactions in the transaction database.
+    All subsequent lines are expected to have a tab-delimited format where the first column is the transaction ID,
+    the second column is the number of items in the transaction, and the third column is a space-delimited set of items.
+    Failure to format the input file correctly may result in errors or unexpected behaviour.'''
+    required = parser.add_argument_group('required arguments')
+    required.add_argument("-i", "--in_file", type=str, required=True, help="Input data file.")
+    required.add_argument("-m", "--min_supp", type=float, nargs='+', required=True, help="Minimum support thresholds as floats between 0 and 1.")
+    parser.add_argument("-o", "--out_file", type=str, default="MiningResults_{min_supp}.txt", help="Output results file, where {min_supp} is replaced by each threshold. (default='MiningResults_{min_supp}.txt')")
+    parser.add_argument("-f", "--format", type=str, choices=FORMATS, default='text', help="Output results format. (default='text')")
+    parser.add_argument("--cache_size", type=int, default=DEFAULT_CACHE_SIZE, help="The largest number of patterns to cache before evicting the least frequent. (default=1048576)")
+    parser.add_argument("--in_memory", "--in-memory", action="store_true", help="Parse the input once and keep it in memory between scans. (default=False)")
+    args = parser.parse_args()
+
+    # Check validity of CLI arguments
+    assert all(0 <= m <= 1 for m in args.min_supp)
+    assert '{min_supp}' in args.out_file or len(set(args.min_supp)) == 1
+    print(ctime(), 'Starting\n')
+    sweep(args.in_file, args.min_supp, args.out_file, args.format, args.cache_size, args.in_memory)
+    print(ctime(), 'Finished\n')
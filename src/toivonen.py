@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+#-*- coding:utf-8 - *-
+
+"""
+This CLI tool performs Toivonen's sampling frequent patten mining algorithm, verifying a mined sample with one full pass.
+
+GNU General Public License v3.0
+Permissions of this strong copyleft license are conditioned on making available complete source code of licensed works and modifications,
+which include larger works using a licensed work, under the same license.
+Copyright and license notices must be preserved.
+Contributors provide an express grant of patent rights.
+
+Reference Materials:
+[1] Toivonen, H. (1996) Sampling Large Databases for Association Rules.
+[2] Vitter, J. S. (1985) Random Sampling with a Reservoir.
+[3] Hoeffding, W. (1963) Probability Inequalities for Sums of Bounded Random Variables.
+"""
+
+import argparse
+from array import array
+from collections import Counter
+import math
+import random
+from time import ctime
+
+from apriori import apriori, scan_db
+from itemsets import CandidateTrie, apriori_gen
+from result_writer import FORMATS, open_writer
+from rules import mine_rules
+from transaction_store import TransactionStore
+
+__author__ = 'Galen Seilis'
+__copyright__ = 'Copyright 2020, Assignment 1, CPSC-673-A1'
+__credits__ = ['Galen Seilis', 'Fan Jiang (Instructor)']
+__license__ = 'GNU General Public License v3.0'
+__version__ = '0.1.0'
+__maintainer__ = 'Galen Seilis'
+__email__ = 'seilis@unbc.ca'
+__status__ = 'School Project'
+
+DEFAULT_SAMPLE_SIZE = 10000
+DEFAULT_DELTA = 0.05
+
+def reservoir_sample(file_name, size, seed=0):
+    '''
+    This function draws a uniform random sample of the
+    transactions in one pass with a reservoir, without
+    knowing the size of the database in advance.
+
+    ARGUMENTS
+        file_name (str): The name of the transaction database file.
+        size (int): The number of transactions to sample.
+        seed (int): The seed of the random number generator. (Default=0)
+
+    RETURNS
+        sample (TransactionStore): The sampled transactions.
+        n (int): The number of transactions in the database.
+    '''
+    rng = random.Random(seed)
+    reservoir = []
+    n = 0
+    for t_id, t_n, t_set in scan_db(file_name):
+        if n < size:
+            reservoir.append((t_id, t_set))
+        else:
+            j = rng.randrange(n + 1)
+            if j < size:
+                reservoir[j] = (t_id, t_set)
+        n += 1
+    tids, items, offsets = array('q'), array('I'), array('Q', [0])
+    for t_id, t_set in reservoir:
+        tids.append(t_id)
+        items.extend(sorted(t_set))
+        offsets.append(len(items))
+    return TransactionStore(tids, items, offsets), n
+
+def error_bound(size, delta=DEFAULT_DELTA):
+    '''
+    This function bounds the difference between the
+    relative support of an itemset in a sample and in
+    the whole database with the Hoeffding inequality.
+
+    ARGUMENTS
+        size (int): The number of sampled transactions.
+        delta (float): The probability of the bound failing for a given itemset. (Default=0.05)
+
+    RETURNS
+        (float): The largest relative support error, with probability at least 1 - delta.
+    '''
+    return math.sqrt(math.log(2 / delta) / (2 * size))
+
+def lowered_threshold(min_supp, size, delta=DEFAULT_DELTA):
+    '''
+    This function lowers the threshold of the sample with
+    the one-sided Chernoff bound, so that an itemset with
+    a relative support of min_supp in the database falls
+    below the lowered threshold in the sample with a
+    probability of at most delta.
+
+    ARGUMENTS
+        min_supp (float): Relative minimum support threshold.
+        size (int): The number of sampled transactions.
+        delta (float): The probability of a frequent itemset falling below the lowered threshold. (Default=0.05)
+
+    RETURNS
+        (float): The lowered relative threshold, which is not positive when the sample is too small.
+    '''
+    return min_supp * (1 - math.sqrt(2 * math.log(1 / delta) / (min_supp * size)))
+
+def negative_border(S):
+    '''
+    This function finds the itemsets of size 2 or more
+    of the negative border of the patterns mined from a
+    sample: those not in S whose every subset is.
+
+    Every item not in S is also in the negative border.
+    Items are all counted by the verification pass, so
+    they are left out here.
+
+    ARGUMENTS
+        S (dict[int:dict[frozenset[int]/int:int]]): Dictionary of the patterns frequent in the sample.
+
+    RETURNS
+        (dict[int:set[frozenset[int]]]): The itemsets of the negative border of each size.
+    '''
+    border = {}
+    k = 2
+    while S.get(k-1):
+        candidates, _ = apriori_gen(S[k-1], k)
+        missing = {c for c in candidates if c not in S.get(k, {})}
+        if missing:
+            border[k] = missing
+        k += 1
+    return border
+
+def count_pass(file_name, itemsets):
+    '''
+    This function counts every item and the given
+    itemsets of every size in one pass over the database.
+
+    ARGUMENTS
+        file_name (str): The name of the transaction database file.
+        itemsets (dict[int:set[frozenset[int]]]): The itemsets of each size of 2 or more to count.
+
+    RETURNS
+        items (Counter): The count of each item.
+        counts (dict[int:dict[frozenset[int]:int]]): The count of each given itemset by size.
+    '''
+    tries = {k:CandidateTrie(c) for (k, c) in itemsets.items() if c}
+    items = Counter()
+    for t_id, t_n, t_set in scan_db(file_name):
+        items.update(t_set)
+        t_set = sorted(t_set)
+        for trie in tries.values():
+            trie.count(t_set)
+    return items, {k:trie.counts for (k, trie) in tries.items()}
+
+def border_passes(file_name, L, counts, items, epsilon):
+    '''
+    This function completes a result whose negative
+    border held frequent itemsets. Each pass counts the
+    uncounted itemsets of the negative border of the
+    itemsets verified frequent so far, so no itemset is
+    counted unless all of its subsets are frequent.
+    Any missing frequent itemset has a smallest missing
+    subset on that border, so the result is exact once
+    a pass finds nothing new. There are at most as many
+    passes as the longest frequent itemset has items.
+
+    ARGUMENTS
+        file_name (str): The name of the transaction database file.
+        L (dict[int:dict[frozenset[int]/int:int]]): Dictionary of the patterns verified frequent so far.
+        counts (dict[int:dict[frozenset[int]:int]]): The count of each itemset counted so far by size, to add to.
+        items (Counter): The count of each item.
+        epsilon (float/int): Absolute minimum support threshold.
+
+    RETURNS
+        L (dict[int:dict[frozenset[int]/int:int]]): Dictionary of all frequent patterns.
+        passes (int): The number of passes made.
+    '''
+    passes = 0
+    while True:
+        pending = {}
+        for k, border in negative_border(L).items():
+            new = {c for c in border if c not in counts.get(k, {})}
+            if new:
+                pending[k] = new
+        if not pending:
+            return L, passes
+        passes += 1
+        print(ctime(), f"Pass {passes + 1} counts {sum(len(p) for p in pending.values())} itemset(s) of the negative border of the verified patterns.")
+        _, more = count_pass(file_name, pending)
+        for k, level in more.items():
+            counts.setdefault(k, {}).update(level)
+        L = frequent_levels(items, counts, epsilon)
+
+def frequent_levels(items, counts, epsilon):
+    '''
+    ARGUMENTS
+        items (Counter): The count of each item.
+        counts (dict[int:dict[frozenset[int]:int]]): The count of each itemset by size.
+        epsilon (float/int): Absolute minimum support threshold.
+
+    RETURNS
+        L (dict[int:dict[frozenset[int]/int:int]]): Dictionary of the frequent patterns of each size.
+    '''
+    L = {1:{k:v for (k,v) in items.items() if v >= epsilon}}
+    for k in sorted(counts):
+        level = {c:v for (c,v) in counts[k].items() if v >= epsilon}
+        if level:
+            L[k] = level
+    return L
+
+def toivonen(file_name, min_supp, sample_size=DEFAULT_SAMPLE_SIZE, delta=DEFAULT_DELTA, lowered=None, seed=0, second_pass=False):
+    '''
+    This function performs Toivonen's sampling algorithm.
+
+    A reservoir sample is mined with Apriori at a lowered
+    threshold, so that an itemset frequent in the whole
+    database is very likely to be frequent in the sample.
+    One full pass then counts the patterns of the sample
+    and their negative border. If no itemset of the
+    negative border is frequent, no frequent itemset can
+    have been missed and the result is exact. Otherwise a
+    frequent itemset may be missing, and border_passes
+    counts the negative border of the verified patterns
+    until the result is exact.
+
+    ARGUMENTS
+        file_name (str): The input data file name of transactions.
+        min_supp (float): Relative minimum support threshold.
+        sample_size (int): The number of transactions to sample. (Default=10000)
+        delta (float): The chance of an itemset's sample support falling below the lowered threshold. (Default=0.05)
+        lowered (float): The relative threshold of the sample. (Default=lowered_threshold)
+        seed (int): The seed of the sample. (Default=0)
+        second_pass (bool): Make further passes over the negative border when the first pass finds misses. (Default=False)
+
+    RETURNS
+        L (dict[int:dict[frozenset[int]/int:int]]): Dictionary of all frequent patterns found by the algorithm.
+        exact (bool): Whether the result is guaranteed to hold every frequent pattern.
+    '''
+    print(ctime(), f'Sampling {sample_size} transactions.')
+    sample, n = reservoir_sample(file_name, sample_size, seed)
+    if lowered is None:
+        lowered = min_supp if len(sample) == n else lowered_threshold(min_supp, len(sample), delta)
+    if lowered <= 0:
+        raise ValueError(f'The sample of {len(sample)} transactions is too small to lower min_supp={min_supp}; sample more or give the lowered threshold.')
+    print(ctime(), f'Mining {len(sample)} of {n} transactions at a lowered min_supp of {lowered:.6f}.\n')
+    S = apriori(sample, lowered * len(sample))
+    border = negative_border(S)
+    itemsets = {k:set(S.get(k, {})) | border.get(k, set()) for k in set(S) | set(border) if k > 1}
+    print(ctime(), f"Verifying {sum(len(l) for l in S.values())} sampled pattern(s) and a negative border of {sum(len(b) for b in border.values())} itemset(s) in one pass.")
+    epsilon = min_supp * n
+    items, counts = count_pass(file_name, itemsets)
+    L = frequent_levels(items, counts, epsilon)
+    misses = [i for i in L[1] if i not in S[1]]
+    misses += [c for (k, b) in border.items() for c in b if c in L.get(k, {})]
+    if not misses:
+        print(ctime(), 'No itemset of the negative border is frequent, so the result is exact.\n')
+        return L, True
+    print(ctime(), f'{len(misses)} itemset(s) of the negative border are frequent, so frequent itemsets may be missing.')
+    if not second_pass:
+        print(ctime(), 'More passes are needed for an exact result.\n')
+        return L, False
+    L, passes = border_passes(file_name, L, counts, items, epsilon)
+    print(ctime(), f'{passes} more pass(es) made the result exact.\n')
+    return L, True
+
+def approximate(file_name, min_supp, sample_size=DEFAULT_SAMPLE_SIZE, delta=DEFAULT_DELTA, seed=0):
+    '''
+    This function mines a reservoir sample at the given
+    threshold without reading the database again. The
+    supports of the sample are scaled to the size of the
+    database, and each relative support is within the
+    error bound of the truth with probability 1 - delta.
+
+    ARGUMENTS
+        file_name (str): The input data file name of transactions.
+        min_supp (float): Relative minimum support threshold.
+        sample_size (int): The number of transactions to sample. (Default=10000)
+        delta (float): The chance of a pattern's support missing its bound. (Default=0.05)
+        seed (int): The seed of the sample. (Default=0)
+
+    RETURNS
+        L (dict[int:dict[frozenset[int]/int:int]]): Dictionary of the patterns frequent in the sample, with estimated supports.
+        bound (float): The relative support error bound.
+    '''
+    print(ctime(), f'Sampling {sample_size} transactions.')
+    sample, n = reservoir_sample(file_name, sample_size, seed)
+    bound = 0.0 if len(sample) == n else error_bound(len(sample), delta)
+    print(ctime(), f'Mining {len(sample)} of {n} transactions at min_supp={min_supp}.\n')
+    S = apriori(sample, min_supp * len(sample))
+    scale = n / max(len(sample), 1)
+    L = {k:{c:round(v * scale) for (c, v) in level.items()} for (k, level) in S.items()}
+    print(ctime(), f'Each support is within {bound:.6f} ({bound * n:.0f} transactions) of the truth with probability {1 - delta}.\n')
+    return L, bound
+
+if '__main__' == __name__:
+    # Prepare command line parser
+    parser = argparse.ArgumentParser()
+    parser.description = '''A CLI that performs Toivonen's sampling frequent pattern learning algorithm.
+    A reservoir sample of the transactions is mined at a lowered threshold, and one full pass counts the patterns of the sample
+    and their negative border. The log reports whether the result is guaranteed exact or more passes are needed.
+    With --approximate, the sample is mined at the threshold itself and no full pass is made, and the supports are estimated within an error bound.
+    This program expects an input text file with a particular format.
+    The first line of the input file should be the number of transactions in the transaction database.
+    All subsequent lines are expected to have a tab-delimited format where the first column is the transaction ID,
+    the second column is the number of items in the transaction, and the third column is a space-delimited set of items.
+    Failure to format the input file correctly may result in errors or unexpected behaviour.'''
+    required = parser.add_argument_group('required arguments')
+    required.add_argument("-i", "--in_file", type=str, required=True, help="Input data file.")
+    parser.add_argument("-o", "--out_file", type=str, default="MiningResults.txt", help="Output results file. (default='MiningResults.txt')")
+    parser.add_argument("-f", "--format", type=str, choices=FORMATS, default='text', help="Output results format. (default='text')")
+    parser.add_argument("--min_conf", type=float, default=None, help="Minimum confidence of the association rules generated from the results, or unset to skip them. (default=None)")
+    parser.add_argument("--rules_file", type=str, default="AssociationRules.txt", help="Output association rules file. (default='AssociationRules.txt')")
+    parser.add_argument("-m", "--min_supp", type=float, default=0.5, help="Minimum support threshold as a float between 0 and 1. (default=0.5)")
+    parser.add_argument("-s", "--sample_size", type=int, default=DEFAULT_SAMPLE_SIZE, help="Number of transactions to sample. (default=10000)")
+    parser.add_argument("--delta", type=float, default=DEFAULT_DELTA, help="Chance of a pattern's sample support missing its error bound. (default=0.05)")
+    parser.add_argument("--lowered", type=float, default=None, help="Minimum support threshold of the sample. (default=lowered by a Chernoff bound at --delta)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the sample. (default=0)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--second_pass", action="store_true", help="Make further passes over the negative border when the first finds frequent itemsets in it. (default=False)")
+    mode.add_argument("--approximate", action="store_true", help="Only mine the sample, estimating the supports within an error bound. (default=False)")
+    args = parser.parse_args()
+
+    # Check validity of CLI arguments
+    assert 0 <= args.min_supp <= 1
+    assert args.min_conf is None or 0 <= args.min_conf <= 1
+    assert 0 < args.delta < 1
+    assert args.sample_size > 0
+    assert args.lowered is None or 0 < args.lowered <= args.min_supp
+    print(ctime(), 'Starting\n')
+    if args.approximate:
+        rules, bound = approximate(args.in_file, args.min_supp, args.sample_size, args.delta, args.seed)
+    else:
+        rules, exact = toivonen(args.in_file, args.min_supp, args.sample_size, args.delta, args.lowered, args.seed, args.second_pass)
+    print(ctime(), 'Writing rules to file...')
+    with open_writer(args.out_file, args.format) as writer:
+        for k in sorted(rules):
+            writer.write_level(k, rules[k])
+    print(f'|FPs| = {writer.count}\n')
+    if args.min_conf is not None:
+        mine_rules(args.out_file, args.rules_file, args.min_conf)
+    print(ctime(), 'Finished\n')
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+#-*- coding:utf-8 - *-
+
+"""
+This module holds a memory-mapped random-access reader of a transaction database for the 'apriori' frequent patten mining scripts.
+
+GNU General Public License v3.0
+Permissions of this strong copyleft license are conditioned on making available complete source code of licensed works and modifications,
+which include larger works using a licensed work, under the same license.
+Copyright and license notices must be preserved.
+Contributors provide an express grant of patent rights.
+
+Reference Materials:
+[1] https://docs.python.org/3/library/mmap.html
+[2] https://docs.python.org/3/library/array.html
+"""
+
+from array import array
+import mmap
+import os
+import struct
+
+__author__ = 'Galen Seilis'
+__copyright__ = 'Copyright 2020, Assignment 1, CPSC-673-A1'
+__credits__ = ['Galen Seilis', 'Fan Jiang (Instructor)']
+__license__ = 'GNU General Public License v3.0'
+__version__ = '0.1.0'
+__maintainer__ = 'Galen Seilis'
+__email__ = 'seilis@unbc.ca'
+__status__ = 'School Project'
+
+INDEX_SUFFIX = '.idx'
+INDEX_MAGIC = b'RMTIDX01'
+INDEX_HEADER = struct.Struct('<8sQqQ') # magic, file size, file mtime_ns, transactions
+
+class TransactionReader:
+    '''
+    A random-access reader of a transaction database
+    backed by a single memory map of the file.
+
+    The (start, stop) byte range of every transaction is
+    kept in a sidecar index file next to the database so
+    that later runs on the same file do not rebuild it.
+    The index is rebuilt whenever the size or modification
+    time of the database no longer matches the index.
+
+    Only the file name is pickled, so a reader can be
+    handed to worker processes which map the file again.
+
+    ATTRIBUTES
+        file_name (str): The name of the transaction database file.
+        index_name (str): The name of the sidecar index file.
+    '''
+
+    def __init__(self, file_name):
+        '''
+        ARGUMENTS
+            file_name (str): The name of the transaction database file.
+        '''
+        self.file_name = file_name
+        self.index_name = file_name + INDEX_SUFFIX
+        self._file = open(file_name, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __getstate__(self):
+        return self.file_name
+
+    def __setstate__(self, file_name):
+        self.__init__(file_name)
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def read(self, start, stop):
+        '''
+        This method reads a specific transaction from the
+        memory map without any further system calls.
+
+        ARGUMENTS
+            start (int): File byte index to start reading.
+            stop (int): File byte index to stop reading.
+
+        RETURNS
+            line (str): String representation of transaction.
+        '''
+        return self._map[start:stop].decode()
+
+    def offsets(self):
+        '''
+        This method returns the byte range of every
+        transaction, loading it from the sidecar index
+        when it is still valid and building and saving
+        it otherwise.
+
+        RETURNS
+            (dict[int:tuple[int, int]]): The (start, stop) byte range of each transaction by id.
+        '''
+        tids, bounds = self._load_index()
+        if tids is None:
+            tids, bounds = self._build_index()
+            self._save_index(tids, bounds)
+        return {t_id:(bounds[2*i], bounds[2*i + 1]) for (i, t_id) in enumerate(tids)}
+
+    def save_offsets(self, transactions):
+        '''
+        This method saves byte ranges found by another
+        scan of the database, such as a parallel first scan,
+        as the sidecar index when the index is stale.
+
+        ARGUMENTS
+            transactions (dict[int:tuple[int, int]]): The (start, stop) byte range of each transaction by id.
+
+        RETURNS
+            None
+        '''
+        if self._load_index()[0] is not None:
+            return
+        bounds = array('Q')
+        for start, stop in transactions.values():
+            bounds.append(start)
+            bounds.append(stop)
+        self._save_index(array('q', transactions), bounds)
+
+    def _build_index(self):
+        tids = array('q')
+        bounds = array('Q')
+        mm = self._map
+        size = len(mm)
+        start = mm.find(b'\n') + 1 if size else 0 # Skip the header line.
+        while 0 < start < size:
+            stop = mm.find(b'\n', start)
+            if stop == -1:
+                stop = size
+            line = mm[start:stop].rstrip()
+            if line:
+                tids.append(int(line[:line.index(b'\t')]))
+                bounds.append(start)
+                bounds.append(start + len(line))
+            start = stop + 1
+        return tids, bounds
+
+    def _stat(self):
+        stat = os.stat(self.file_name)
+        return stat.st_size, stat.st_mtime_ns
+
+    def _load_index(self):
+        try:
+            with open(self.index_name, 'rb') as f:
+                magic, size, mtime_ns, n = INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))
+                if magic != INDEX_MAGIC or (size, mtime_ns) != self._stat():
+                    return None, None
+                tids = array('q')
+                bounds = array('Q')
+                tids.fromfile(f, n)
+                bounds.fromfile(f, 2 * n)
+                return tids, bounds
+        except (OSError, EOFError, struct.error):
+            return None, None
+
+    def _save_index(self, tids, bounds):
+        try:
+            with open(self.index_name, 'wb') as f:
+                f.write(INDEX_HEADER.pack(INDEX_MAGIC, *self._stat(), len(tids)))
+                tids.tofile(f)
+                bounds.tofile(f)
+        except OSError:
+            pass # A read-only directory only costs rebuilding the index next run.
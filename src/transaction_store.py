@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+#-*- coding:utf-8 - *-
+
+"""
+This module holds a compact in-memory copy of a transaction database for the 'apriori' frequent patten mining scripts.
+
+GNU General Public License v3.0
+Permissions of this strong copyleft license are conditioned on making available complete source code of licensed works and modifications,
+which include larger works using a licensed work, under the same license.
+Copyright and license notices must be preserved.
+Contributors provide an express grant of patent rights.
+
+Reference Materials:
+[1] https://docs.python.org/3/library/array.html
+[2] https://en.wikipedia.org/wiki/Sparse_matrix#Compressed_sparse_row_(CSR,_CRS_or_Yale_format)
+[3] https://docs.python.org/3/library/mmap.html
+"""
+
+from array import array
+from collections import Counter
+import mmap
+import struct
+import sys
+
+__author__ = 'Galen Seilis'
+__copyright__ = 'Copyright 2020, Assignment 1, CPSC-673-A1'
+__credits__ = ['Galen Seilis', 'Fan Jiang (Instructor)']
+__license__ = 'GNU General Public License v3.0'
+__version__ = '0.1.0'
+__maintainer__ = 'Galen Seilis'
+__email__ = 'seilis@unbc.ca'
+__status__ = 'School Project'
+
+BINARY_MAGIC = b'FPCSR001'
+BINARY_HEADER = struct.Struct('<8s8sQQQ') # magic, byte order, transactions, items, distinct items
+
+def is_binary(file_name):
+    '''
+    This function checks whether a file is in the
+    binary format written by TransactionStore.to_binary.
+
+    ARGUMENTS
+        file_name (str): The name of the transaction database file.
+
+    RETURNS
+        (bool): Whether the file starts with the binary format magic.
+    '''
+    with open(file_name, 'rb') as f:
+        return f.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+def _padding(n):
+    return -n % 8
+
+class TransactionStore:
+    '''
+    A transaction database held in memory in a
+    compressed sparse row (CSR) layout.
+
+    The items of every transaction are sorted and
+    concatenated into one flat array, and the items
+    of the i-th transaction are found between
+    offsets[i] and offsets[i+1].
+
+    ATTRIBUTES
+        tids (array[int]): The transaction identifiers.
+        items (array[int]): The sorted items of all transactions.
+        offsets (array[int]): The start of each transaction in items, plus the end.
+        frequencies (dict[int:int]): The count of each item, when loaded from the binary format.
+        source (str): The binary file the arrays are mapped from, if any.
+    '''
+
+    def __init__(self, tids, items, offsets, frequencies=None, source=None):
+        '''
+        ARGUMENTS
+            tids (array[int]): The transaction identifiers.
+            items (array[int]): The sorted items of all transactions.
+            offsets (array[int]): The start of each transaction in items, plus the end.
+            frequencies (dict[int:int]): The count of each item. (Default=None)
+            source (str): The binary file the arrays are mapped from. (Default=None)
+        '''
+        self.tids = tids
+        self.items = items
+        self.offsets = offsets
+        self.frequencies = frequencies
+        self.source = source
+
+    def __reduce__(self):
+        # A mapped store is sent to other processes as its file name.
+        if self.source is not None:
+            return (TransactionStore.from_binary, (self.source,))
+        return (TransactionStore, (self.tids, self.items, self.offsets, self.frequencies))
+
+    @classmethod
+    def from_binary(cls, file_name):
+        '''
+        This method maps a file written by to_binary
+        without copying or parsing it. The arrays of
+        the store are memoryviews over the mapping, so
+        numpy.frombuffer can wrap them without a copy
+        as well.
+
+        ARGUMENTS
+            file_name (str): The name of the binary transaction database file.
+
+        RETURNS
+            (TransactionStore): The mapped transaction database.
+        '''
+        with open(file_name, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, byteorder, n, n_items, n_distinct = BINARY_HEADER.unpack_from(mm)
+        if magic != BINARY_MAGIC:
+            raise ValueError(f'{file_name} is not a binary transaction database.')
+        if byteorder.rstrip(b'\0').decode() != sys.byteorder:
+            raise ValueError(f'{file_name} was written on a {byteorder.decode()}-endian machine.')
+        view = memoryview(mm)
+        sections = []
+        position = BINARY_HEADER.size
+        for typecode, length in (('q', n), ('Q', n + 1), ('I', n_items), ('I', n_distinct), ('Q', n_distinct)):
+            size = struct.calcsize(typecode) * length
+            sections.append(view[position:position + size].cast(typecode))
+            position += size + _padding(size)
+        tids, offsets, items, freq_items, freq_counts = sections
+        frequencies = dict(zip(freq_items, freq_counts))
+        return cls(tids, items, offsets, frequencies, source=file_name)
+
+    def to_binary(self, file_name):
+        '''
+        This method writes the store in the binary
+        format read by from_binary, along with a table
+        of the count of every item.
+
+        ARGUMENTS
+            file_name (str): The name of the binary file to write.
+
+        RETURNS
+            None
+        '''
+        frequencies = self.frequencies
+        if frequencies is None:
+            frequencies = Counter(self.items)
+        freq_items = array('I', sorted(frequencies))
+        freq_counts = array('Q', (frequencies[i] for i in freq_items))
+        with open(file_name, 'wb') as f:
+            f.write(BINARY_HEADER.pack(BINARY_MAGIC, sys.byteorder.encode(), len(self), len(self.items), len(freq_items)))
+            for section in (self.tids, self.offsets, self.items, freq_items, freq_counts):
+                data = section.tobytes()
+                f.write(data)
+                f.write(bytes(_padding(len(data))))
+
+    def to_text(self, file_name):
+        '''
+        This method writes the store in the text format
+        expected by the frequent pattern mining scripts.
+
+        ARGUMENTS
+            file_name (str): The name of the text file to write.
+
+        RETURNS
+            None
+        '''
+        with open(file_name, 'w') as f:
+            f.write(f'{len(self)}\n')
+            for t_id, t_n, t_set in self:
+                f.write(f"{t_id}\t{t_n}\t{' '.join(map(str, t_set))}\n")
+
+    @classmethod
+    def from_file(cls, file_name):
+        '''
+        This method builds the store from a transaction
+        database file in a single pass.
+
+        ARGUMENTS
+            file_name (str): The name of the transaction database file.
+
+        RETURNS
+            (TransactionStore): The parsed transaction database.
+        '''
+        with open(file_name) as f:
+            f.readline()
+            return cls.from_lines(f)
+
+    @classmethod
+    def from_lines(cls, lines):
+        '''
+        This method builds the store from the transaction
+        lines of a database, without its header line.
+
+        ARGUMENTS
+            lines (iterable[str]): Lines from the transaction database.
+
+        RETURNS
+            (TransactionStore): The parsed transactions.
+        '''
+        tids = array('q')
+        items = array('I')
+        offsets = array('Q', [0])
+        for line in lines:
+            line = line.rstrip()
+            if not line:
+                continue
+            t_id, t_n, t_set = line.split('\t')
+            tids.append(int(t_id))
+            items.extend(sorted({int(i) for i in t_set.split(' ')}))
+            offsets.append(len(items))
+        return cls(tids, items, offsets)
+
+    def __len__(self):
+        return len(self.tids)
+
+    def __getitem__(self, row):
+        '''
+        ARGUMENTS
+            row (int): The position of the transaction in the store.
+
+        RETURNS
+            t_id (int): The transaction identifier.
+            t_n (int): The number of items in the transaction.
+            t_set (array[int]): The sorted items in the transaction.
+        '''
+        start, stop = self.offsets[row], self.offsets[row + 1]
+        return self.tids[row], stop - start, self.items[start:stop]
+
+    def __iter__(self):
+        for row in range(len(self.tids)):
+            yield self[row]
+
+    @property
+    def nbytes(self):
+        '''
+        RETURNS
+            (int): The number of bytes held by the arrays of the store.
+        '''
+        return sum(a.itemsize * len(a) for a in (self.tids, self.items, self.offsets))
@@ -0,0 +1,31 @@
+import os
+import sys
+
+import pytest
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC)
+
+from quest_gen import write_dataset
+
+DATA_FILE = os.path.join(SRC, '..', 'data', 'data.txt')
+
+@pytest.fixture(scope='session')
+def quest_file(tmp_path_factory):
+    '''
+    RETURNS
+        (str): A small T8I3D2K database from the Quest style generator.
+    '''
+    file_name = str(tmp_path_factory.mktemp('quest') / 'T8I3D2K.txt')
+    write_dataset(file_name, T=8, I=3, D=2000)
+    return file_name
+
+@pytest.fixture(scope='session')
+def large_quest_file(tmp_path_factory):
+    '''
+    RETURNS
+        (str): A T10I4D10K database from the Quest style generator.
+    '''
+    file_name = str(tmp_path_factory.mktemp('quest') / 'T10I4D10K.txt')
+    write_dataset(file_name, T=10, I=4, D=10000)
+    return file_name
@@ -0,0 +1,21 @@
+import auto
+
+def test_pair_density_matches_pairs(quest_file):
+    stats, counts = auto.scan_profile(quest_file)
+    pairs = set()
+    for t_id, t_n, t_set in auto.apriori.scan_db(quest_file):
+        items = sorted(t_set)
+        pairs.update((a, b) for (i, a) in enumerate(items) for b in items[i+1:])
+    assert stats['pair_density'] == len(pairs) / (len(counts) * (len(counts) - 1) // 2)
+
+def test_item_cap_falls_back_to_rule(quest_file, monkeypatch):
+    monkeypatch.setattr(auto, 'MAX_PROFILE_ITEMS', 100)
+    stats = auto.profile(quest_file, 0.01)
+    assert stats['items'] > 100 and stats['pair_density'] is None
+    rows = [(engine, dataset, {**stats, 'pair_density':0.1}, 1.0) for engine in auto.ENGINES for dataset in ['a', 'b', 'c']]
+    model = auto.CostModel().fit(rows)
+    assert set(model.weights) == set(auto.ENGINES)
+    assert all(model.predict(engine, stats) is None for engine in auto.ENGINES)
+    choice, reasons = auto.choose(stats, model, 0, 2)
+    assert choice['method'] == 'rule'
+    assert 'pair density' in reasons[0]
@@ -0,0 +1,32 @@
+from collections import Counter
+import os
+
+import apriori
+import convert
+from transaction_store import TransactionStore, is_binary
+
+from conftest import DATA_FILE
+
+def transactions(file_name):
+    return [(t_id, t_n, frozenset(t_set)) for (t_id, t_n, t_set) in apriori.scan_db(file_name)]
+
+def test_text_to_binary_and_back(quest_file, tmp_path):
+    for source in [DATA_FILE, quest_file]:
+        name = os.path.splitext(os.path.basename(source))[0]
+        binary_file, text_file = str(tmp_path / f'{name}.bin'), str(tmp_path / f'{name}.txt')
+        convert.convert(source, binary_file)
+        assert is_binary(binary_file) and not is_binary(source)
+        assert transactions(binary_file) == transactions(source)
+        assert apriori.get_db_size(binary_file) == apriori.get_db_size(source)
+        convert.convert(binary_file, text_file)
+        assert not is_binary(text_file)
+        assert transactions(text_file) == transactions(source)
+
+def test_store_matches_text(quest_file, tmp_path):
+    binary_file = str(tmp_path / 'T8I3D2K.bin')
+    store = TransactionStore.from_file(quest_file)
+    store.to_binary(binary_file)
+    mapped = TransactionStore.from_binary(binary_file)
+    assert len(mapped) == len(store)
+    assert list(mapped) == list(store)
+    assert mapped.frequencies == dict(Counter(store.items))
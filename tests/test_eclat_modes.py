@@ -0,0 +1,30 @@
+import pytest
+
+import eclat
+
+from conftest import DATA_FILE
+
+def supports(L):
+    return {(frozenset([i]) if isinstance(i, int) else i):v for level in L.values() for (i, v) in level.items()}
+
+def closed(index):
+    return {s:v for (s, v) in index.items() if not any(s < t and v == u for (t, u) in index.items())}
+
+def maximal(index):
+    return {s:v for (s, v) in index.items() if not any(s < t for t in index)}
+
+@pytest.fixture(params=[(None, 2), ('quest_file', 20), ('quest_file', 40), ('large_quest_file', 50)], ids=['data.txt-2', 'T8I3D2K-20', 'T8I3D2K-40', 'T10I4D10K-50'])
+def case(request):
+    fixture, epsilon = request.param
+    file_name = DATA_FILE if fixture is None else request.getfixturevalue(fixture)
+    return file_name, epsilon
+
+def test_closed_matches_filtered_all(case):
+    file_name, epsilon = case
+    expected = closed(supports(eclat.eclat(file_name, epsilon, 'all')))
+    assert supports(eclat.eclat(file_name, epsilon, 'closed')) == expected
+
+def test_maximal_matches_filtered_all(case):
+    file_name, epsilon = case
+    expected = maximal(supports(eclat.eclat(file_name, epsilon, 'all')))
+    assert supports(eclat.eclat(file_name, epsilon, 'maximal')) == expected
@@ -0,0 +1,85 @@
+import pytest
+
+import apriori
+import eclat
+import fpgrowth
+from itemsets import apriori_gen
+import p_rmtid_apriori
+import rmtid_apriori
+import son
+from transaction_reader import TransactionReader
+
+from conftest import DATA_FILE
+
+# (dataset fixture, absolute minimum support) of each case
+CASES = [(None, 2), ('quest_file', 20), ('quest_file', 40)]
+
+@pytest.fixture(params=CASES, ids=['data.txt-2', 'T8I3D2K-20', 'T8I3D2K-40'])
+def case(request):
+    fixture, epsilon = request.param
+    file_name = DATA_FILE if fixture is None else request.getfixturevalue(fixture)
+    return file_name, epsilon
+
+def levels(L):
+    return {k:dict(level) for (k, level) in L.items() if level}
+
+def candidate_levels(file_name, epsilon):
+    '''
+    RETURNS
+        (list[tuple[int, dict]]): The candidates of each size of 2 or more, generated from the reference counts.
+    '''
+    out = []
+    l = apriori.first_scan(file_name, epsilon)
+    k = 2
+    while l:
+        candidates, _ = apriori_gen(l, k)
+        if not candidates:
+            break
+        out.append((k, candidates))
+        l = apriori.naive_later_scan(file_name, dict(candidates), epsilon)
+        k += 1
+    return out
+
+def test_apriori_scans_match_naive(case):
+    file_name, epsilon = case
+    for k, candidates in candidate_levels(file_name, epsilon):
+        expected = apriori.naive_later_scan(file_name, dict(candidates), epsilon)
+        assert apriori.later_scan(file_name, dict(candidates), epsilon) == expected
+        if k == 2:
+            assert apriori.pair_scan(file_name, dict(candidates), epsilon) == expected
+
+def test_rmtid_scans_match_naive(case):
+    file_name, epsilon = case
+    reader = TransactionReader(file_name)
+    _, transactions = rmtid_apriori.first_scan(reader, epsilon)
+    for k, candidates in candidate_levels(file_name, epsilon):
+        expected = rmtid_apriori.naive_later_scan(reader, dict(candidates), transactions, epsilon)
+        assert rmtid_apriori.later_scan(reader, dict(candidates), transactions, epsilon) == expected
+        if k == 2:
+            assert rmtid_apriori.pair_scan(reader, dict(candidates), transactions, epsilon) == expected
+
+def test_numpy_backend_matches_naive(case):
+    pytest.importorskip('numpy')
+    from incidence import IncidenceMatrix
+    file_name, epsilon = case
+    matrix = IncidenceMatrix(apriori.scan_db(file_name), apriori.get_db_size(file_name), apriori.first_scan(file_name, epsilon))
+    for k, candidates in candidate_levels(file_name, epsilon):
+        counts, _ = matrix.count(dict(candidates), epsilon)
+        assert counts == apriori.naive_later_scan(file_name, dict(candidates), epsilon)
+
+def test_engines_match_apriori(case):
+    file_name, epsilon = case
+    expected = levels(apriori.apriori(file_name, epsilon, backend='trie'))
+    assert levels(apriori.apriori(file_name, epsilon, in_memory=True, backend='trie')) == expected
+    assert levels(rmtid_apriori.apriori(file_name, epsilon, backend='trie')) == expected
+    assert levels(p_rmtid_apriori.apriori(file_name, epsilon, processors=2)) == expected
+    assert levels(eclat.eclat(file_name, epsilon)) == expected
+    assert levels(fpgrowth.fpgrowth(file_name, epsilon)) == expected
+    assert levels(son.son(file_name, epsilon, son.PoolExecutor(2), 3)) == expected
+
+def test_numpy_engine_matches_apriori(case):
+    pytest.importorskip('numpy')
+    file_name, epsilon = case
+    expected = levels(apriori.apriori(file_name, epsilon, backend='trie'))
+    assert levels(apriori.apriori(file_name, epsilon, backend='numpy')) == expected
+    assert levels(rmtid_apriori.apriori(file_name, epsilon, backend='numpy')) == expected
@@ -0,0 +1,48 @@
+import pytest
+
+import apriori
+import incremental
+
+# Number of transactions in each delta of the 2000 transaction fixture
+SPLITS = [800, 700, 500]
+
+def levels(L):
+    return {k:dict(level) for (k, level) in L.items() if level}
+
+def flatten(L):
+    return {(frozenset([i]) if isinstance(i, int) else i):v for level in L.values() for (i, v) in level.items()}
+
+def write_db(file_name, lines):
+    with open(file_name, 'w') as f:
+        f.write(f'{len(lines)}\n')
+        f.writelines(lines)
+
+def split(file_name, directory):
+    '''
+    RETURNS
+        (list[tuple[str, str]]): The file of each delta of file_name, and of every transaction up to the end of that delta.
+    '''
+    with open(file_name) as f:
+        lines = f.readlines()[1:]
+    assert len(lines) == sum(SPLITS)
+    out = []
+    start = 0
+    for i, n in enumerate(SPLITS):
+        delta, prefix = str(directory / f'delta{i}.txt'), str(directory / f'prefix{i}.txt')
+        write_db(delta, lines[start:start+n])
+        write_db(prefix, lines[:start+n])
+        out.append((delta, prefix))
+        start += n
+    return out
+
+@pytest.mark.parametrize('min_supp', [0.01, 0.02])
+def test_updates_match_apriori(quest_file, tmp_path, min_supp):
+    state_file = str(tmp_path / 'state.json')
+    for delta, prefix in split(quest_file, tmp_path):
+        L = incremental.incremental(delta, state_file, min_supp)
+        state = incremental.load_state(state_file)
+        epsilon = min_supp * state['n_transactions']
+        assert {c:v for (c, v) in state['counts'].items() if v >= epsilon} == flatten(L)
+        assert levels(L) == levels(apriori.apriori(prefix, epsilon, backend='trie'))
+    assert state['n_transactions'] == apriori.get_db_size(quest_file)
+    assert levels(L) == levels(apriori.apriori(quest_file, epsilon, backend='trie'))
@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+import apriori
+from result_writer import FORMATS, iter_results, open_writer, read_results
+
+from conftest import DATA_FILE
+
+def levels(L):
+    return {k:dict(level) for (k, level) in L.items() if level}
+
+@pytest.fixture(params=[(None, 2), ('quest_file', 20)], ids=['data.txt-2', 'T8I3D2K-20'])
+def patterns(request):
+    fixture, epsilon = request.param
+    file_name = DATA_FILE if fixture is None else request.getfixturevalue(fixture)
+    return levels(apriori.apriori(file_name, epsilon, backend='trie'))
+
+@pytest.mark.parametrize('fmt', FORMATS)
+def test_write_then_read(patterns, tmp_path, fmt):
+    file_name = str(tmp_path / f'results.{fmt}')
+    with open_writer(file_name, fmt) as writer:
+        for k, level in patterns.items():
+            writer.write_level(k, level)
+    assert writer.count == sum(len(level) for level in patterns.values())
+    assert levels(read_results(file_name)) == patterns
+    assert [len(items) for (items, support) in iter_results(file_name)] == [k for (k, level) in patterns.items() for _ in level]
+    assert os.listdir(tmp_path) == [os.path.basename(file_name)]
+
+def test_text_header_is_not_padded(patterns, tmp_path):
+    file_name = str(tmp_path / 'results.txt')
+    apriori.write_rules(file_name, patterns, 'text')
+    with open(file_name) as f:
+        lines = f.read().split('\n')
+    assert lines[0] == f'|FPs| = {sum(len(level) for level in patterns.values())}'
+    assert lines[-1] == ''
+    assert len(lines) == sum(len(level) for level in patterns.values()) + 2
+    assert not os.path.exists(file_name + '.tmp')
@@ -0,0 +1,47 @@
+from itertools import combinations
+
+import pytest
+
+import apriori
+import eclat
+from rules import ClosedIndex, generate_rules
+
+from conftest import DATA_FILE
+
+def supports(L):
+    return {(frozenset([i]) if isinstance(i, int) else i):v for level in L.values() for (i, v) in level.items()}
+
+def brute_force_rules(L, min_conf):
+    '''
+    RETURNS
+        (set[tuple[frozenset[int], frozenset[int], int, float]]): Every rule X -> Y of L meeting min_conf.
+    '''
+    index = supports(L)
+    rules = set()
+    for itemset, support in index.items():
+        for r in range(1, len(itemset)):
+            for antecedent in map(frozenset, combinations(itemset, r)):
+                confidence = support / index[antecedent]
+                if confidence >= min_conf:
+                    rules.add((antecedent, itemset - antecedent, support, confidence))
+    return rules
+
+@pytest.fixture(params=[(None, 2), ('quest_file', 20)], ids=['data.txt-2', 'T8I3D2K-20'])
+def case(request):
+    fixture, epsilon = request.param
+    file_name = DATA_FILE if fixture is None else request.getfixturevalue(fixture)
+    return file_name, epsilon
+
+@pytest.mark.parametrize('min_conf', [0.0, 0.5, 0.9])
+def test_rules_match_brute_force(case, min_conf):
+    file_name, epsilon = case
+    L = apriori.apriori(file_name, epsilon, backend='trie')
+    rules = list(generate_rules(L, min_conf))
+    assert len(rules) == len(set(rules))
+    assert set(rules) == brute_force_rules(L, min_conf)
+
+def test_closed_index_recovers_supports(case):
+    file_name, epsilon = case
+    expected = supports(apriori.apriori(file_name, epsilon, backend='trie'))
+    index = ClosedIndex(eclat.eclat(file_name, epsilon, 'closed'))
+    assert {itemset:index[itemset] for itemset in expected} == expected
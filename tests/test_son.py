@@ -0,0 +1,31 @@
+import pytest
+
+import apriori
+import son
+from transaction_store import TransactionStore
+
+from conftest import DATA_FILE
+
+EXECUTORS = {'pool':lambda: son.PoolExecutor(2), 'subprocess':lambda: son.SubprocessExecutor(['local', 'local'])}
+
+def levels(L):
+    return {k:dict(level) for (k, level) in L.items() if level}
+
+@pytest.fixture(params=[(None, 2), ('quest_file', 20)], ids=['data.txt-2', 'T8I3D2K-20'])
+def case(request):
+    fixture, epsilon = request.param
+    file_name = DATA_FILE if fixture is None else request.getfixturevalue(fixture)
+    return file_name, epsilon
+
+@pytest.mark.parametrize('executor', EXECUTORS)
+def test_son_matches_apriori(case, executor):
+    file_name, epsilon = case
+    expected = levels(apriori.apriori(file_name, epsilon, backend='trie'))
+    assert levels(son.son(file_name, epsilon, EXECUTORS[executor](), 3)) == expected
+
+@pytest.mark.parametrize('executor', EXECUTORS)
+def test_son_matches_apriori_on_binary(quest_file, tmp_path, executor):
+    binary_file = str(tmp_path / 'T8I3D2K.bin')
+    TransactionStore.from_file(quest_file).to_binary(binary_file)
+    expected = levels(apriori.apriori(quest_file, 20, backend='trie'))
+    assert levels(son.son(binary_file, 20, EXECUTORS[executor](), 3)) == expected
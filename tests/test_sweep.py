@@ -0,0 +1,20 @@
+import pytest
+
+import apriori
+from result_writer import FORMATS, read_results
+import sweep
+
+MIN_SUPPS = [0.01, 0.015, 0.02, 0.03]
+
+def levels(L):
+    return {k:dict(level) for (k, level) in L.items() if level}
+
+# max_size caches every threshold, spills the lower ones, or spills them all
+@pytest.mark.parametrize('max_size', [2**20, 100, 0])
+@pytest.mark.parametrize('fmt', FORMATS)
+def test_sweep_matches_independent_runs(quest_file, tmp_path, fmt, max_size):
+    n = apriori.get_db_size(quest_file)
+    files = sweep.sweep(quest_file, MIN_SUPPS, str(tmp_path / 'sweep_{min_supp}.out'), fmt, max_size)
+    assert sorted(files) == MIN_SUPPS
+    for m, file_name in files.items():
+        assert levels(read_results(file_name)) == levels(apriori.apriori(quest_file, m * n, backend='trie'))
@@ -0,0 +1,30 @@
+import time
+
+from apriori import apriori, top_k
+
+from conftest import DATA_FILE
+
+def reference(file_name, epsilon, min_length):
+    L = apriori(file_name, epsilon)
+    return {k:level for (k, level) in L.items() if k >= min_length and level}
+
+def test_top_k_matches_apriori_at_final_threshold(quest_file):
+    for n_top, min_length in [(10, 1), (10, 2), (5, 4)]:
+        L, epsilon = top_k(quest_file, n_top, min_length)
+        assert L == reference(quest_file, epsilon, min_length)
+        supports = [v for level in L.values() for v in level.values()]
+        assert len(supports) >= n_top
+        assert sum(1 for v in supports if v > epsilon) < n_top
+
+def test_top_k_lowers_threshold_when_estimate_is_too_high():
+    L, epsilon = top_k(DATA_FILE, 7, 2)
+    assert L == reference(DATA_FILE, epsilon, 2)
+    assert sum(len(level) for level in L.values()) >= 7
+
+def test_top_k_min_length_above_two_finishes(large_quest_file):
+    begin = time.perf_counter()
+    L, epsilon = top_k(large_quest_file, 20, 3)
+    assert time.perf_counter() - begin < 60
+    assert epsilon > 1
+    assert min(L) >= 3
+    assert sum(len(level) for level in L.values()) >= 20
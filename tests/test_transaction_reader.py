@@ -0,0 +1,59 @@
+import os
+import shutil
+
+import apriori
+from transaction_reader import TransactionReader
+
+from conftest import DATA_FILE
+
+def read_all(reader):
+    return {t_id:apriori.clean_line(reader.read(start, stop)) for (t_id, (start, stop)) in reader.offsets().items()}
+
+def expected(file_name):
+    return {t_id:(t_id, t_n, t_set) for (t_id, t_n, t_set) in apriori.scan_db(file_name)}
+
+def test_offsets_match_scan_db(quest_file, tmp_path):
+    for source in [DATA_FILE, quest_file]:
+        file_name = str(tmp_path / os.path.basename(source))
+        shutil.copyfile(source, file_name)
+        reader = TransactionReader(file_name)
+        assert read_all(reader) == expected(file_name)
+        assert os.path.exists(reader.index_name)
+        reader.close()
+        # A second reader loads the saved index rather than building it.
+        reader = TransactionReader(file_name)
+        assert reader._load_index()[0] is not None
+        assert read_all(reader) == expected(file_name)
+        reader.close()
+
+def test_stale_index_is_rebuilt(tmp_path):
+    file_name = str(tmp_path / 'data.txt')
+    shutil.copyfile(DATA_FILE, file_name)
+    reader = TransactionReader(file_name)
+    reader.offsets()
+    reader.close()
+
+    # Appending a transaction changes the size of the file.
+    with open(DATA_FILE, newline='') as f:
+        lines = f.readlines()
+    lines[0] = f'{len(lines)}\r\n'
+    lines.append(f'{len(lines)}\t2\t1 5\r\n')
+    with open(file_name, 'w', newline='') as f:
+        f.writelines(lines)
+    reader = TransactionReader(file_name)
+    assert reader._load_index()[0] is None
+    assert read_all(reader) == expected(file_name)
+    assert len(reader.offsets()) == len(lines) - 1
+    reader.close()
+
+    # Rewriting a transaction in place only changes the modification time.
+    stat = os.stat(file_name)
+    lines[-1] = lines[-1].replace('1 5', '2 4')
+    with open(file_name, 'w', newline='') as f:
+        f.writelines(lines)
+    os.utime(file_name, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert os.stat(file_name).st_size == stat.st_size
+    reader = TransactionReader(file_name)
+    assert reader._load_index()[0] is None
+    assert read_all(reader) == expected(file_name)
+    reader.close()